@@ -13,6 +13,8 @@ import os
 import shutil
 from pathlib import Path
 
+from feature_matcher import project_point
+
 # Windows API用のインポート (プラットフォーム依存)
 if sys.platform == 'win32':
     try:
@@ -241,6 +243,7 @@ class ActionManager:
 
             click_offset_x_scaled = 0.0
             click_offset_y_scaled = 0.0
+            homography = match_info.get('homography')
             
             if settings.get('point_click') and settings.get('click_position'):
                 click_pos_in_template = settings['click_position']
@@ -269,9 +272,16 @@ class ActionManager:
                 match_height_scaled = match_rect_in_rec_area[3] - match_rect_in_rec_area[1]
                 click_offset_x_scaled = match_width_scaled / 2
                 click_offset_y_scaled = match_height_scaled / 2
+                homography = None
 
-            click_x_in_rec_area_scaled = match_rect_in_rec_area[0] + click_offset_x_scaled
-            click_y_in_rec_area_scaled = match_rect_in_rec_area[1] + click_offset_y_scaled
+            if homography is not None and scale:
+                # ★★★ (追加) 特徴点照合: テンプレート内のクリック位置を推定した変換で写す（回転・倍率の違いに追従） ★★★
+                click_x_in_rec_area_scaled, click_y_in_rec_area_scaled = project_point(
+                    homography, click_offset_x_scaled / scale, click_offset_y_scaled / scale
+                )
+            else:
+                click_x_in_rec_area_scaled = match_rect_in_rec_area[0] + click_offset_x_scaled
+                click_y_in_rec_area_scaled = match_rect_in_rec_area[1] + click_offset_y_scaled
             
             click_x_float = rec_area_offset_x + (click_x_in_rec_area_scaled / effective_capture_scale)
             click_y_float = rec_area_offset_y + (click_y_in_rec_area_scaled / effective_capture_scale)
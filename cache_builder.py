@@ -36,6 +36,7 @@ class CacheBuilder:
                     core.backup_template_cache,
                     core.priority_timers,
                     core.folder_children_map,
+                    core.template_cache_views,
                 ) = core.template_manager.build_cache(
                     core.app_config,
                     core.current_window_scale,
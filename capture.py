@@ -10,8 +10,15 @@ import mss
 import cv2
 import numpy as np
 import threading
+import time
 from pathlib import Path
 from PySide6.QtCore import QObject
+from tracing import TRACE, trace
+from capture_producer import FrameProducer
+from capture_health import (
+    CAPTURE_SLOW_COOLDOWN_SEC, CAPTURE_SLOW_MIN_SAMPLES, DUPLICATE_FRAME_TOLERANCE,
+    CaptureHealth, FrameInfo, frame_digest, frame_thumbnail, parts_digest,
+)
 
 try:
     OPENCL_AVAILABLE = cv2.ocl.haveOpenCL()
@@ -19,6 +26,7 @@ except Exception:
     OPENCL_AVAILABLE = False
 
 DXCAM_AVAILABLE = False
+XSHM_AVAILABLE = False
 if sys.platform == 'win32':
     try:
         import dxcam
@@ -37,6 +45,62 @@ else:
     except ImportError:
         _MSS_DISPLAY = None
     # --- ▲▲▲ 修正完了 ▲▲▲ ---
+    # ★★★ (追加) X11 ネイティブキャプチャ (MIT-SHM / XComposite) ★★★
+    try:
+        from capture_x11 import XSHM_AVAILABLE, XShmCapture, X11CaptureError
+    except ImportError:
+        XSHM_AVAILABLE = False
+
+# XComposite によるウィンドウ単位キャプチャ（xshm 使用時のみ。隠れたウィンドウも取得できる）
+XCOMPOSITE_WINDOW_CAPTURE = os.environ.get("IMECK_XCOMPOSITE", "0") == "1"
+
+
+def merge_rects(rects, gap: int = 0):
+    """
+    重なる（または gap px 以内で隣接する）矩形 (x1, y1, x2, y2) を結合し、
+    外接矩形のリストを返します。空の矩形は除外します。
+    """
+    boxes = [list(r) for r in rects if r[2] > r[0] and r[3] > r[1]]
+    merged = True
+    while merged:
+        merged = False
+        out = []
+        for b in boxes:
+            for o in out:
+                if b[0] <= o[2] + gap and o[0] <= b[2] + gap and b[1] <= o[3] + gap and o[1] <= b[3] + gap:
+                    o[0], o[1] = min(o[0], b[0]), min(o[1], b[1])
+                    o[2], o[3] = max(o[2], b[2]), max(o[3], b[3])
+                    merged = True
+                    break
+            else:
+                out.append(b)
+        boxes = out
+    return [tuple(b) for b in boxes]
+
+
+class RegionParts:
+    """
+    部分キャプチャの結果。全体サイズの画像は作らず、取得した矩形ごとの画像を保持する。
+    parts: [((x1, y1, x2, y2), 画像), ...]（region 内の相対座標・元解像度）
+    size : region の (幅, 高さ)
+    """
+    __slots__ = ("parts", "size")
+
+    def __init__(self, parts, size):
+        self.parts = parts
+        self.size = size
+
+    @property
+    def shape(self):
+        return (self.size[1], self.size[0], 3)
+
+    def to_canvas(self):
+        """region と同じサイズの黒画像に貼り合わせます（全体の画像が必要な場合のみ使う）。"""
+        width, height = self.size
+        canvas = np.zeros((height, width, 3), dtype=np.uint8)
+        for (x1, y1, x2, y2), part in self.parts:
+            canvas[y1:y2, x1:x2] = part
+        return canvas
 
 
 class CaptureManager(QObject):
@@ -62,6 +126,24 @@ class CaptureManager(QObject):
         
         self.dxcam_error_count = 0
         self.DXCAM_ERROR_THRESHOLD = 5 
+
+        # X11 ネイティブキャプチャ（Linux）
+        self.xshm_sct = None
+        self.xshm_error_count = 0
+        self.target_window = None
+
+        # キャプチャ専用スレッド（監視中のみ動作）
+        self.producer = None
+
+        # フレーム情報と稼働状況の統計
+        self.health = CaptureHealth()
+        self.last_frame_info = None
+        self._last_digest = None
+        # 遅延のため一時的に MSS へ切り替えている場合の
+        # (設定上のバックエンド, 切り替え前の平均取得時間ms, 切り替えた時刻, 速さを確認済みか)
+        self._slow_fallback = None
+        # MSS の方が速くなかった時刻（しばらくは再び試さない）
+        self._mss_trial_failed_at = None
         
         is_dxcam_preferred = False
         if DXCAM_AVAILABLE:
@@ -143,13 +225,72 @@ class CaptureManager(QObject):
                     pass # キャッシュが存在しない
     # --- ▲▲▲ 修正完了 ▲▲▲ ---
 
+    def start_producer(self, region_provider, target_fps: float = None):
+        """
+        キャプチャ専用スレッドを開始します。region_provider は現在の取得範囲を返す関数。
+        CAPTURE_PRODUCER=0 の場合は開始せず、従来どおり呼び出し側で capture_frame を行う。
+        """
+        if os.environ.get("CAPTURE_PRODUCER", "1") != "1":
+            return None
+        if self.producer is not None and self.producer.is_running:
+            self.producer.region_provider = region_provider
+            return self.producer
+        self.producer = FrameProducer(self, region_provider, target_fps)
+        self.producer.start()
+        return self.producer
+
+    def stop_producer(self):
+        producer, self.producer = self.producer, None
+        if producer is not None:
+            producer.stop()
+
+    def get_latest_frame(self, region=None):
+        """キャプチャ専用スレッドの最新フレーム（CapturedFrame）を返します。動作していなければ None。"""
+        producer = self.producer
+        if producer is None or not producer.is_running:
+            return None
+        return producer.latest(region)
+
+    def set_target_window(self, window_id):
+        """
+        キャプチャ対象のウィンドウID（Linux では X のウィンドウID）を設定します。
+        xshm かつ IMECK_XCOMPOSITE=1 のときは、そのウィンドウの内容を直接取得します。
+        """
+        with self.lock:
+            if window_id == self.target_window:
+                return
+            self.target_window = window_id
+            self._apply_xshm_target_window()
+
+    def _apply_xshm_target_window(self):
+        if self.xshm_sct is None or not XCOMPOSITE_WINDOW_CAPTURE:
+            return
+        try:
+            self.xshm_sct.set_target_window(self.target_window)
+        except Exception as e:
+            # ウィンドウ単位で取れない場合は画面全体からの切り出しに戻す
+            self.logger.log(f"[WARN] XComposite window capture unavailable: {e}")
+            try:
+                self.xshm_sct.set_target_window(None)
+            except Exception:
+                pass
+
     def set_capture_method(self, method: str):
         with self.lock:
-            requested_method = 'dxcam' if (method == 'dxcam' and DXCAM_AVAILABLE) else 'mss'
+            if method == 'dxcam' and DXCAM_AVAILABLE:
+                requested_method = 'dxcam'
+            elif method == 'xshm' and XSHM_AVAILABLE:
+                requested_method = 'xshm'
+            else:
+                requested_method = 'mss'
             
             if requested_method == self.current_method:
                 return 
 
+            # 明示的な切り替え（設定変更・エラー時のフォールバック）は、遅延による一時切り替えより優先する
+            self._slow_fallback = None
+            if self.current_method is not None:
+                self.health.record_reinit()
             self.cleanup() 
 
             self.current_method = requested_method
@@ -184,6 +325,19 @@ class CaptureManager(QObject):
                     self.current_method = 'mss' 
                     self.is_dxcam_ready = False
                     self.dxcam_sct = None
+
+            if self.current_method == 'xshm':
+                try:
+                    self.xshm_sct = XShmCapture()
+                    self.xshm_sct.grab((0, 0, 1, 1))
+                    self.xshm_error_count = 0
+                    self._apply_xshm_target_window()
+                except Exception as e:
+                    self.logger.log(f"[WARN] XShm capture init failed, falling back to MSS: {e}")
+                    if self.xshm_sct is not None:
+                        self.xshm_sct.close()
+                    self.xshm_sct = None
+                    self.current_method = 'mss'
             
             if self.current_method == 'mss':
                 try:
@@ -205,17 +359,124 @@ class CaptureManager(QObject):
         with self.lock:
             current_method_name = self.current_method
             self.logger.log("log_reinitializing_capture_backend", current_method_name)
+            self.health.record_reinit()
             
             if current_method_name == 'mss':
                 self.mss_reinit_required = True
                 self._cleanup_mss_thread_local("main_thread")
 
-            elif current_method_name == 'dxcam':
+            elif current_method_name in ('dxcam', 'xshm'):
                 self.cleanup() 
                 self.current_method = None
-                self.set_capture_method('dxcam')
+                self.set_capture_method(current_method_name)
+
+    def capture_frame(self, region: tuple = None, sub_regions=None) -> np.ndarray:
+        """
+        region (x1, y1, x2, y2) を画面座標でキャプチャします。
+        sub_regions を指定した場合は、region 内の相対矩形だけを取得し、
+        region と同じサイズの黒画像に貼り合わせて返します（座標系は全体キャプチャと同じ）。
+        取得情報は last_frame_info に残ります。
+        """
+        image = self.capture_frame_with_info(region, sub_regions)[0]
+        return image.to_canvas() if isinstance(image, RegionParts) else image
 
-    def capture_frame(self, region: tuple = None) -> np.ndarray:
+    def capture_frame_with_info(self, region: tuple = None, sub_regions=None):
+        """
+        (画像, FrameInfo) を返します。失敗時は (None, None)。
+        sub_regions を指定した場合の画像は RegionParts（貼り合わせは行わない）。
+        """
+        with self.lock:
+            backend = self.current_method
+            start = time.perf_counter()
+            if sub_regions and region:
+                image = self._capture_sub_regions(region, sub_regions)
+            else:
+                image = self._grab(region)
+            grab_ms = (time.perf_counter() - start) * 1000.0
+
+            if image is None:
+                self.health.record_failure(grab_ms)
+                return None, None
+
+            h, w = image.shape[:2]
+            if region:
+                actual_region = (region[0], region[1], region[0] + w, region[1] + h)
+                size_mismatch = (w, h) != (region[2] - region[0], region[3] - region[1])
+            else:
+                actual_region = (0, 0, w, h)
+                size_mismatch = False
+            partial = isinstance(image, RegionParts)
+            digest = parts_digest(image.parts) if partial else frame_digest(image)
+            info = FrameInfo(time.monotonic(), grab_ms, backend, actual_region,
+                             duplicate=digest == self._last_digest, size_mismatch=size_mismatch,
+                             thumbnail=frame_thumbnail(image) if DUPLICATE_FRAME_TOLERANCE > 0 and not partial else None,
+                             digest=digest)
+            self._last_digest = digest
+            self.last_frame_info = info
+            self.health.record_frame(info)
+
+            # ★★★ (改善) エラー回数だけでなく、実測の取得時間が遅い状態が続いた場合もバックエンドを見直す ★★★
+            if self._slow_fallback is not None:
+                self._update_slow_fallback()
+            elif self.health.is_slow():
+                self._handle_slow_capture()
+            return image, info
+
+    def _handle_slow_capture(self):
+        mean_ms = self.health.mean_grab_ms()
+        self.logger.log(f"[WARN] Capture is slow on {self.current_method}: mean {mean_ms:.1f} ms per frame.")
+        if self.current_method in ('dxcam', 'xshm'):
+            # 広い範囲では MSS の方が遅いことも多いため、まず試しに切り替え、実測で速い場合だけ使い続ける
+            failed_at = self._mss_trial_failed_at
+            if failed_at is not None and time.monotonic() - failed_at < CAPTURE_SLOW_COOLDOWN_SEC * 10:
+                self.health.record_reinit()  # 直前の試行で MSS が速くなかった。統計をやり直すだけにする
+                return
+            configured = self.current_method
+            self.set_capture_method('mss')
+            if self.current_method != 'mss':
+                return
+            self._slow_fallback = (configured, mean_ms, time.monotonic(), False)
+            self.logger.log(f"[INFO] Trying mss in place of {configured} to compare capture times.")
+        elif self.current_method == 'mss':
+            self.mss_reinit_required = True
+            self.health.record_reinit()
+
+    def _update_slow_fallback(self):
+        """
+        遅延による一時切り替え中に呼び出します。
+        試行中は MSS の実測平均が十分にたまった時点で比較し、速くなければすぐ戻す。
+        速ければクールダウン後に設定上のバックエンドを再び試す。
+        """
+        configured, configured_ms, since, confirmed = self._slow_fallback
+        if not confirmed:
+            if self.health.sample_count() < CAPTURE_SLOW_MIN_SAMPLES:
+                return
+            mss_ms = self.health.mean_grab_ms()
+            if mss_ms >= configured_ms * 0.8:
+                self.logger.log(
+                    f"[INFO] mss is not faster ({mss_ms:.1f} ms vs {configured_ms:.1f} ms per frame). Returning to {configured}."
+                )
+                self._mss_trial_failed_at = time.monotonic()
+                self.set_capture_method(configured)
+                return
+            self._slow_fallback = (configured, configured_ms, time.monotonic(), True)
+            self.logger.log(
+                f"[WARN] Capture backend temporarily switched from {configured} to mss "
+                f"({configured_ms:.1f} ms -> {mss_ms:.1f} ms per frame). The app setting is still '{configured}'; "
+                f"{configured} will be retried in {CAPTURE_SLOW_COOLDOWN_SEC:.0f} s."
+            )
+            return
+        if time.monotonic() - since < CAPTURE_SLOW_COOLDOWN_SEC:
+            return
+        self.logger.log(f"[INFO] Retrying the configured capture backend: {configured}")
+        self.set_capture_method(configured)
+
+    def get_health_stats(self) -> dict:
+        fallback = self._slow_fallback
+        return dict(self.health.snapshot(), backend=self.current_method,
+                    configured_backend=fallback[0] if fallback else self.current_method)
+
+    def _grab(self, region):
         with self.lock:
             try:
                 if self.current_method == 'dxcam' and self.is_dxcam_ready:
@@ -308,8 +569,8 @@ class CaptureManager(QObject):
                             if expected_width != actual_width or expected_height != actual_height:
                                 self.logger.log(f"[DXCam Size Mismatch] region={region} expected={expected_width}x{expected_height} actual={actual_width}x{actual_height}")
                             # ★★★ 原因特定: DXCamのregion解釈を確認するため、target_hwndとregionをログ出力 ★★★
-                            if os.environ.get("DEBUG_OCR_COORDS", "0") == "1":
-                                self.logger.log(f"[DXCam Region Debug] region={region} target_hwnd={target_hwnd_info} expected_size={expected_width}x{expected_height} actual_size={actual_width}x{actual_height}")
+                            if TRACE.capture:
+                                trace("capture", "dxcam_region", region=region, target_hwnd=target_hwnd_info, expected_size=(expected_width, expected_height), actual_size=(actual_width, actual_height))
                         result = cv2.cvtColor(frame, cv2.COLOR_RGB2BGR)
                         # ★★★ デバッグ: DXCamとMSSでキャプチャされた画像の内容を比較するため、画像を保存 ★★★
                         if os.environ.get("DEBUG_SAVE_CAPTURE_FRAME", "0") == "1":
@@ -325,6 +586,25 @@ class CaptureManager(QObject):
                                 pass
                         return result
 
+                if self.current_method == 'xshm':
+                    if self.xshm_sct is None:
+                        return None
+                    if region is None:
+                        width, height = self.xshm_sct.root_size()
+                        region = (0, 0, width, height)
+                    try:
+                        frame = self.xshm_sct.grab(region)
+                    except X11CaptureError as e:
+                        self.logger.log("log_capture_error", self.current_method, region, str(e))
+                        self.xshm_error_count += 1
+                        if self.xshm_error_count >= self.DXCAM_ERROR_THRESHOLD:
+                            self.logger.log("[WARN] XShm capture keeps failing. Switching to MSS.")
+                            self.set_capture_method('mss')
+                        return None
+                    self.xshm_error_count = 0
+                    # 共有メモリは次の取得で上書きされるため、変換で新しい配列にする
+                    return cv2.cvtColor(frame, cv2.COLOR_BGRA2BGR)
+
                 if self.current_method == 'mss':
                     
                     # --- ▼▼▼ 修正: JIT初期化と再初期化フラグのチェック ▼▼▼ ---
@@ -402,10 +682,33 @@ class CaptureManager(QObject):
                 elif self.current_method == 'mss':
                      self.logger.log("log_mss_reinit_on_error")
                      self.mss_reinit_required = True
+                     self.health.record_reinit()
                 return None
             
             return None
             
+    def _capture_sub_regions(self, region, sub_regions):
+        width, height = region[2] - region[0], region[3] - region[1]
+        if width <= 0 or height <= 0:
+            return None
+        # 全体サイズの画像には貼り合わせない（縮小・グレー化・ダイジェストを取得した矩形の分だけで済ませる）
+        parts = []
+        with self.lock:
+            for x1, y1, x2, y2 in merge_rects(sub_regions):
+                x1, y1 = max(0, int(x1)), max(0, int(y1))
+                x2, y2 = min(width, int(x2)), min(height, int(y2))
+                if x2 <= x1 or y2 <= y1:
+                    continue
+                part = self._grab((region[0] + x1, region[1] + y1, region[0] + x2, region[1] + y2))
+                if part is None:
+                    return None
+                ph, pw = min(part.shape[0], y2 - y1), min(part.shape[1], x2 - x1)
+                parts.append(((x1, y1, x1 + pw, y1 + ph), part[:ph, :pw]))
+        if not parts:
+            # 有効な矩形が無い場合は全体を取得する
+            return self._grab(region)
+        return RegionParts(parts, (width, height))
+
     def cleanup(self):
         with self.lock:
             if self.dxcam_sct and DXCAM_AVAILABLE:
@@ -417,6 +720,13 @@ class CaptureManager(QObject):
             self.dxcam_sct = None
             self.is_dxcam_ready = False
 
+            if self.xshm_sct is not None:
+                try:
+                    self.xshm_sct.close()
+                except Exception as e:
+                    self.logger.log(f"[WARN] XShm cleanup error: {e}")
+            self.xshm_sct = None
+
             # --- ▼▼▼ 修正: メインスレッドのMSSインスタンスのみクリーンアップ ▼▼▼ ---
             self._cleanup_mss_thread_local("main_thread_cleanup")
             # --- ▲▲▲ 修正完了 ▲▲▲ ---
@@ -0,0 +1,177 @@
+# capture_health.py
+# ★★★ (追加) フレームごとのキャプチャ情報と、バックエンドの稼働状況の集計 ★★★
+"""
+キャプチャのメタデータと健全性の統計。
+
+- FrameInfo      : 1回の取得結果（取得時刻・所要時間・バックエンド・実際の範囲・前フレームと同一か）
+                   と、同一フレーム判定用の全画素チェックサム（digest）・許容差判定用の間引きサンプル（thumbnail。
+                   DUPLICATE_FRAME_TOLERANCE > 0 の場合のみ作成）
+- CaptureHealth  : 直近 HEALTH_WINDOW 回分の移動統計（失敗率・平均取得時間・同一フレーム率）と
+                   累計（取得数・失敗数・再初期化数・サイズ不一致数）
+
+CaptureManager は平均取得時間がしきい値を超え続けた場合に、エラー回数とは別に
+バックエンドの切り替え（dxcam/xshm → mss）や MSS の再初期化を行う。
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+import time
+import zlib
+from collections import deque
+
+import numpy as np
+
+
+def _env_float(name, default):
+    try:
+        return max(0.0, float(os.environ.get(name, str(default))))
+    except ValueError:
+        return default
+
+
+# 移動統計に使う直近の取得回数
+HEALTH_WINDOW = 120
+# 平均取得時間がこの値（ms）を超えたら遅いとみなす
+CAPTURE_SLOW_MS = _env_float("CAPTURE_SLOW_MS", 60.0)
+# 遅延判定に必要な最小サンプル数
+CAPTURE_SLOW_MIN_SAMPLES = 30
+# 遅延による切り替え・再初期化の最小間隔（秒）
+CAPTURE_SLOW_COOLDOWN_SEC = _env_float("CAPTURE_SLOW_COOLDOWN_SEC", 30.0)
+# 同一フレーム判定のサンプリング間隔（px）
+THUMBNAIL_STRIDE = 17
+# 同一フレームとみなす間引き画素の平均絶対差。0 は全画素の完全一致のみ（thumbnail を作らない）
+DUPLICATE_FRAME_TOLERANCE = _env_float("DUPLICATE_FRAME_TOLERANCE", 0.0)
+
+
+class FrameInfo:
+    __slots__ = ("timestamp", "grab_ms", "backend", "region", "duplicate", "size_mismatch", "thumbnail", "digest")
+
+    def __init__(self, timestamp, grab_ms, backend, region, duplicate=False, size_mismatch=False, thumbnail=None, digest=None):
+        self.timestamp = timestamp  # time.monotonic()
+        self.grab_ms = grab_ms
+        self.backend = backend
+        # 実際に得られた画像サイズから求めた範囲 (x1, y1, x2, y2)
+        self.region = region
+        # 前回のフレームと内容が同じ（画面が更新されていない）
+        self.duplicate = duplicate
+        # 要求した範囲と取得サイズが異なる
+        self.size_mismatch = size_mismatch
+        # 一定間隔で間引いた画素（許容差つきの比較 frames_similar 用）
+        self.thumbnail = thumbnail
+        # 全画素のチェックサム（完全一致の判定用）
+        self.digest = digest
+
+
+def frame_digest(image) -> tuple:
+    """
+    全画素の CRC32 と形状。完全一致の判定はこちらで行う
+    （間引きサンプルでは、小さなボタンの出現や数字1桁の変化を見逃すため）。
+    毎回の取得で計算するため、暗号学的ハッシュより数倍速い CRC32 を使う（1080p で約 2ms）。
+    """
+    image = np.ascontiguousarray(image)
+    return image.shape, zlib.crc32(image.data)
+
+
+def parts_digest(parts) -> tuple:
+    """部分キャプチャ（[(矩形, 画像), ...]）の frame_digest。取得した矩形の画素だけを対象にする。"""
+    crc = 0
+    for _rect, image in parts:
+        crc = zlib.crc32(np.ascontiguousarray(image).data, crc)
+    return tuple(rect for rect, _image in parts), crc
+
+
+def frame_thumbnail(image):
+    """THUMBNAIL_STRIDE 間隔で間引いた画素のコピー（1080p で約 20KB）。"""
+    return np.ascontiguousarray(image[::THUMBNAIL_STRIDE, ::THUMBNAIL_STRIDE])
+
+
+def frames_similar(a, b, tolerance: float = 0.0) -> bool:
+    """
+    2つの thumbnail が同一（tolerance=0）またはほぼ同一かを判定します。
+    tolerance は画素値の平均絶対差の上限。
+    間引いた画素だけの比較なので、サンプル間の小さな変化は検出できない（完全一致は frame_digest を使う）。
+    """
+    if a is None or b is None or a.shape != b.shape:
+        return False
+    if tolerance <= 0:
+        return np.array_equal(a, b)
+    return float(np.mean(np.abs(a.astype(np.int16) - b.astype(np.int16)))) <= tolerance
+
+
+class CaptureHealth:
+    def __init__(self, window: int = HEALTH_WINDOW):
+        self._lock = threading.Lock()
+        self._samples = deque(maxlen=window)  # (grab_ms, failed, duplicate)
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._samples.clear()
+            self.frames = 0
+            self.failures = 0
+            self.duplicates = 0
+            self.size_mismatches = 0
+            self.reinits = 0
+            self.last_action_time = 0.0
+
+    def record_frame(self, info: FrameInfo):
+        with self._lock:
+            self.frames += 1
+            self.duplicates += int(info.duplicate)
+            self.size_mismatches += int(info.size_mismatch)
+            self._samples.append((info.grab_ms, False, info.duplicate))
+
+    def record_failure(self, grab_ms: float):
+        with self._lock:
+            self.failures += 1
+            self._samples.append((grab_ms, True, False))
+
+    def record_reinit(self):
+        with self._lock:
+            self.reinits += 1
+            # 新しいバックエンドの統計で判断し直す
+            self._samples.clear()
+            self.last_action_time = time.monotonic()
+
+    def sample_count(self) -> int:
+        """移動統計に含まれる成功した取得の数。"""
+        with self._lock:
+            return sum(1 for _ms, failed, _dup in self._samples if not failed)
+
+    def mean_grab_ms(self) -> float:
+        with self._lock:
+            ok = [ms for ms, failed, _dup in self._samples if not failed]
+        return sum(ok) / len(ok) if ok else 0.0
+
+    def failure_rate(self) -> float:
+        with self._lock:
+            n = len(self._samples)
+            return sum(1 for _ms, failed, _dup in self._samples if failed) / n if n else 0.0
+
+    def duplicate_rate(self) -> float:
+        with self._lock:
+            ok = [dup for _ms, failed, dup in self._samples if not failed]
+        return sum(ok) / len(ok) if ok else 0.0
+
+    def is_slow(self) -> bool:
+        """平均取得時間がしきい値を超えており、前回の対処から十分時間が経っているか。"""
+        with self._lock:
+            ok = [ms for ms, failed, _dup in self._samples if not failed]
+            recent_action = time.monotonic() - self.last_action_time < CAPTURE_SLOW_COOLDOWN_SEC
+        if recent_action or len(ok) < CAPTURE_SLOW_MIN_SAMPLES:
+            return False
+        return sum(ok) / len(ok) > CAPTURE_SLOW_MS
+
+    def snapshot(self) -> dict:
+        return {
+            'frames': self.frames,
+            'failures': self.failures,
+            'reinits': self.reinits,
+            'duplicates': self.duplicates,
+            'size_mismatches': self.size_mismatches,
+            'mean_grab_ms': round(self.mean_grab_ms(), 3),
+            'failure_rate': round(self.failure_rate(), 4),
+            'duplicate_rate': round(self.duplicate_rate(), 4),
+        }
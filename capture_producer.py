@@ -0,0 +1,201 @@
+# capture_producer.py
+# ★★★ (追加) キャプチャを専用スレッドで行い、最新フレームを受け渡す（マッチングとキャプチャを並行化） ★★★
+"""
+キャプチャ専用スレッド。
+
+CaptureManager.capture_frame を目標レートで呼び続け、最新フレームを
+連番 (seq) とタイムスタンプ付きで公開する。
+
+- 監視ループは wait_for_frame(after_seq) で「前回処理したものより新しいフレーム」を受け取る
+  （既にあれば待たずに返る）。キャプチャの遅延がマッチングの遅延に加算されない
+- 認識範囲プレビューなど他の利用者は latest() を読むだけで、追加のキャプチャを行わない
+- 直近 BUFFER_COUNT 枚だけ保持する（リングバッファ）。フレームは公開後に書き換えないため、
+  利用者は受け取った配列をそのまま読み取りに使える
+- 利用者がしばらく要求しない間（エコモード待機など）は取得を休止し、無駄なキャプチャをしない
+- 取得レートは監視ループの処理間隔に合わせて set_target_fps() で変更する
+  （CAPTURE_PRODUCER_FPS は上限。軽量モードやエコモードでは処理しないフレームを取得しない）
+- sub_region_provider を設定すると、認識範囲のうち指定された部分矩形だけを取得する
+  （取得した矩形は CapturedFrame.boxes に記録。None は全体。部分取得時の image は capture.RegionParts）
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+import time
+
+
+class CapturedFrame:
+    __slots__ = ("image", "seq", "timestamp", "region", "grab_ms", "boxes", "info")
+
+    def __init__(self, image, seq, timestamp, region, grab_ms, boxes=None, info=None):
+        self.image = image
+        self.seq = seq
+        self.timestamp = timestamp  # time.monotonic()
+        self.region = region
+        self.grab_ms = grab_ms
+        # 部分キャプチャ時の取得矩形（region 内の相対座標）。None は全体
+        self.boxes = boxes
+        # CaptureManager が記録した取得情報（capture_health.FrameInfo）
+        self.info = info
+
+    @property
+    def started(self) -> float:
+        """取得を開始した時刻（time.monotonic()）。"""
+        return self.timestamp - self.grab_ms / 1000.0
+
+
+class FrameProducer:
+    BUFFER_COUNT = 3
+    # 最後の要求からこの秒数を過ぎたら取得を休止する
+    IDLE_AFTER_SEC = 1.0
+    MIN_FPS = 0.5
+
+    def __init__(self, capture_manager, region_provider, target_fps: float = None):
+        self.capture_manager = capture_manager
+        self.region_provider = region_provider
+        # 部分キャプチャの矩形リストを返す関数（None を返せば全体を取得）
+        self.sub_region_provider = None
+        try:
+            self.max_fps = max(self.MIN_FPS, float(os.environ.get("CAPTURE_PRODUCER_FPS", "30")))
+        except ValueError:
+            self.max_fps = 30.0
+        self.target_fps = self.max_fps
+        if target_fps is not None:
+            self.set_target_fps(target_fps)
+
+        self._slots = [None] * self.BUFFER_COUNT
+        self._latest = None
+        self._seq = 0
+        self._cond = threading.Condition()
+        self._last_demand = time.monotonic()
+        self._stop_event = threading.Event()
+        self._thread = None
+        self.stats = {'produced': 0, 'failures': 0, 'unconsumed': 0}
+        self._consumed_seq = 0
+
+    @property
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        if self.is_running:
+            return
+        self._stop_event.clear()
+        self._last_demand = time.monotonic()
+        self._thread = threading.Thread(target=self._run, name="CaptureProducer", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 1.0):
+        self._stop_event.set()
+        with self._cond:
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout=timeout)
+        self._thread = None
+        with self._cond:
+            self._slots = [None] * self.BUFFER_COUNT
+            self._latest = None
+
+    def set_target_fps(self, fps: float):
+        """取得レートを変更します（max_fps が上限）。待機中の取得スレッドにもすぐ反映する。"""
+        fps = min(self.max_fps, max(self.MIN_FPS, float(fps)))
+        if fps == self.target_fps:
+            return
+        self.target_fps = fps
+        with self._cond:
+            self._cond.notify_all()
+
+    # ------------------------------------------------------------------
+    # 利用者側
+    # ------------------------------------------------------------------
+    def latest(self, region=None):
+        """最新フレームを返します。region を指定した場合、範囲が異なれば None。"""
+        self._last_demand = time.monotonic()
+        frame = self._latest
+        if frame is None or (region is not None and tuple(frame.region or ()) != tuple(region)):
+            return None
+        return frame
+
+    def wait_for_frame(self, after_seq: int = 0, timeout: float = 0.2, region=None, min_start: float = None):
+        """
+        seq が after_seq より新しいフレームを返します。既にあれば即座に返り、
+        無ければ timeout 秒まで待ちます（タイムアウト時は None）。
+        min_start (time.monotonic()) を指定した場合、それより前に取得を開始したフレームは返さない
+        （クリック直後に、クリック前の画面を処理しないため）。
+        """
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            self._last_demand = time.monotonic()
+            # 休止中なら取得を再開させる
+            self._cond.notify_all()
+            while True:
+                frame = self._latest
+                if (frame is not None and frame.seq > after_seq
+                        and (region is None or tuple(frame.region or ()) == tuple(region))
+                        and (min_start is None or frame.started >= min_start)):
+                    self._consumed_seq = frame.seq
+                    return frame
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or self._stop_event.is_set():
+                    return None
+                self._cond.wait(remaining)
+
+    def get_stats(self) -> dict:
+        return dict(self.stats, seq=self._seq, running=self.is_running, target_fps=self.target_fps)
+
+    # ------------------------------------------------------------------
+    # 取得スレッド
+    # ------------------------------------------------------------------
+    def _run(self):
+        last_grab = 0.0
+        while not self._stop_event.is_set():
+            now = time.monotonic()
+            # 休止の判定はレートに合わせて延ばす（低レート時は要求の間隔自体が長いため）
+            if now - self._last_demand > max(self.IDLE_AFTER_SEC, 2.0 / self.target_fps):
+                # 要求が来るまで休止（wait_for_frame が起こす）
+                with self._cond:
+                    self._cond.wait(0.5)
+                continue
+
+            # 次の取得時刻は毎回現在のレートから求める（set_target_fps / wait_for_frame で起こされる）
+            due = last_grab + 1.0 / self.target_fps
+            if now < due:
+                with self._cond:
+                    self._cond.wait(due - now)
+                continue
+            last_grab = now
+
+            region = self.region_provider()
+            if not region:
+                self._stop_event.wait(0.1)
+                continue
+
+            boxes = None
+            if self.sub_region_provider is not None:
+                try:
+                    boxes = self.sub_region_provider()
+                except Exception:
+                    boxes = None
+
+            start = time.perf_counter()
+            try:
+                image, info = self.capture_manager.capture_frame_with_info(region, boxes)
+            except Exception:
+                image, info = None, None
+            grab_ms = (time.perf_counter() - start) * 1000.0
+            if image is None:
+                self.stats['failures'] += 1
+                continue
+            self._publish(image, tuple(region), grab_ms, boxes, info)
+
+    def _publish(self, image, region, grab_ms, boxes=None, info=None):
+        with self._cond:
+            if self._latest is not None and self._latest.seq > self._consumed_seq:
+                self.stats['unconsumed'] += 1
+            self._seq += 1
+            frame = CapturedFrame(image, self._seq, time.monotonic(), region, grab_ms, boxes, info)
+            self._slots[self._seq % self.BUFFER_COUNT] = frame
+            self._latest = frame
+            self.stats['produced'] += 1
+            self._cond.notify_all()
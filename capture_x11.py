@@ -0,0 +1,461 @@
+# capture_x11.py
+# ★★★ (追加) Linux(X11) 用ネイティブキャプチャ: MIT-SHM 共有メモリを使い回し、XComposite でウィンドウ単位の取得に対応 ★★★
+"""
+X11 ネイティブキャプチャバックエンド（ctypes で libX11 / libXext / libXcomposite を直接呼び出す）。
+
+- XShmGetImage で共有メモリセグメントに直接書き込むため、取得ごとの画像オブジェクト生成がない
+  （セグメントは取得サイズが変わったときだけ作り直す）
+- set_target_window(xid) を指定すると XComposite でウィンドウの内容を取得する
+  （他のウィンドウに隠れていても取得できる。コンポジットマネージャが無くても自動リダイレクトで動作）
+- X のエラーはプロセスを終了させず、例外 (X11CaptureError) として呼び出し側に返す
+- XWindowTracker はウィンドウの ConfigureNotify を受け取り、移動・リサイズ時だけ位置を取り直す
+
+Xlib の Display はスレッドセーフではないため、呼び出しは CaptureManager.lock の内側で行うこと。
+
+動作確認（Xvfb 上でも可）:
+  xvfb-run -s "-screen 0 1280x720x24" python capture_x11.py --frames 100
+  python capture_x11.py --window 0x3a00007 --region 0,0,640,480
+"""
+
+from __future__ import annotations
+
+import ctypes
+import ctypes.util
+import os
+import sys
+import threading
+import time
+from ctypes import POINTER, byref, c_char_p, c_int, c_size_t, c_ubyte, c_ulong, c_long, c_void_p
+
+import numpy as np
+
+ZPIXMAP = 2
+ALL_PLANES = ~0 & 0xFFFFFFFFFFFFFFFF
+IPC_PRIVATE = 0
+IPC_CREAT = 0o1000
+IPC_RMID = 0
+COMPOSITE_REDIRECT_AUTOMATIC = 0
+STRUCTURE_NOTIFY_MASK = 1 << 17
+DESTROY_NOTIFY = 17
+CONFIGURE_NOTIFY = 22
+
+
+class X11CaptureError(RuntimeError):
+    pass
+
+
+class XShmSegmentInfo(ctypes.Structure):
+    _fields_ = [("shmseg", c_ulong), ("shmid", c_int), ("shmaddr", c_void_p), ("readOnly", c_int)]
+
+
+class XImage(ctypes.Structure):
+    # 先頭のフィールドのみ定義（関数テーブル以降は参照しない）
+    _fields_ = [
+        ("width", c_int), ("height", c_int), ("xoffset", c_int), ("format", c_int),
+        ("data", c_void_p), ("byte_order", c_int), ("bitmap_unit", c_int),
+        ("bitmap_bit_order", c_int), ("bitmap_pad", c_int), ("depth", c_int),
+        ("bytes_per_line", c_int), ("bits_per_pixel", c_int),
+        ("red_mask", c_ulong), ("green_mask", c_ulong), ("blue_mask", c_ulong),
+        ("obdata", c_void_p),
+    ]
+
+
+class XWindowAttributes(ctypes.Structure):
+    _fields_ = [
+        ("x", c_int), ("y", c_int), ("width", c_int), ("height", c_int), ("border_width", c_int),
+        ("depth", c_int), ("visual", c_void_p), ("root", c_ulong), ("class_", c_int),
+        ("bit_gravity", c_int), ("win_gravity", c_int), ("backing_store", c_int),
+        ("backing_planes", c_ulong), ("backing_pixel", c_ulong), ("save_under", c_int),
+        ("colormap", c_ulong), ("map_installed", c_int), ("map_state", c_int),
+        ("all_event_masks", c_long), ("your_event_mask", c_long),
+        ("do_not_propagate_mask", c_long), ("override_redirect", c_int), ("screen", c_void_p),
+    ]
+
+
+class XErrorEvent(ctypes.Structure):
+    _fields_ = [
+        ("type", c_int), ("display", c_void_p), ("resourceid", c_ulong), ("serial", c_ulong),
+        ("error_code", ctypes.c_ubyte), ("request_code", ctypes.c_ubyte), ("minor_code", ctypes.c_ubyte),
+    ]
+
+
+def _load_libraries():
+    if not sys.platform.startswith("linux"):
+        return None
+    names = {key: ctypes.util.find_library(key) for key in ("X11", "Xext", "Xcomposite", "c")}
+    if not names["X11"] or not names["Xext"] or not names["c"]:
+        return None
+    try:
+        libs = {key: ctypes.CDLL(path) for key, path in names.items() if path}
+    except OSError:
+        return None
+
+    x11, xext, libc = libs["X11"], libs["Xext"], libs["c"]
+    x11.XOpenDisplay.argtypes = [c_char_p]
+    x11.XOpenDisplay.restype = c_void_p
+    x11.XCloseDisplay.argtypes = [c_void_p]
+    x11.XDefaultScreen.argtypes = [c_void_p]
+    x11.XDefaultScreen.restype = c_int
+    x11.XRootWindow.argtypes = [c_void_p, c_int]
+    x11.XRootWindow.restype = c_ulong
+    x11.XDefaultVisual.argtypes = [c_void_p, c_int]
+    x11.XDefaultVisual.restype = c_void_p
+    x11.XDefaultDepth.argtypes = [c_void_p, c_int]
+    x11.XDefaultDepth.restype = c_int
+    x11.XSync.argtypes = [c_void_p, c_int]
+    x11.XDestroyImage.argtypes = [POINTER(XImage)]
+    x11.XFreePixmap.argtypes = [c_void_p, c_ulong]
+    x11.XGetWindowAttributes.argtypes = [c_void_p, c_ulong, POINTER(XWindowAttributes)]
+    x11.XGetWindowAttributes.restype = c_int
+    x11.XTranslateCoordinates.argtypes = [c_void_p, c_ulong, c_ulong, c_int, c_int, POINTER(c_int), POINTER(c_int), POINTER(c_ulong)]
+    x11.XTranslateCoordinates.restype = c_int
+    x11.XSelectInput.argtypes = [c_void_p, c_ulong, c_long]
+    x11.XPending.argtypes = [c_void_p]
+    x11.XPending.restype = c_int
+    x11.XNextEvent.argtypes = [c_void_p, c_void_p]
+
+    xext.XShmQueryExtension.argtypes = [c_void_p]
+    xext.XShmQueryExtension.restype = c_int
+    xext.XShmCreateImage.argtypes = [c_void_p, c_void_p, ctypes.c_uint, c_int, c_char_p, POINTER(XShmSegmentInfo), ctypes.c_uint, ctypes.c_uint]
+    xext.XShmCreateImage.restype = POINTER(XImage)
+    xext.XShmAttach.argtypes = [c_void_p, POINTER(XShmSegmentInfo)]
+    xext.XShmDetach.argtypes = [c_void_p, POINTER(XShmSegmentInfo)]
+    xext.XShmGetImage.argtypes = [c_void_p, c_ulong, POINTER(XImage), c_int, c_int, c_ulong]
+    xext.XShmGetImage.restype = c_int
+
+    libc.shmget.argtypes = [c_int, c_size_t, c_int]
+    libc.shmget.restype = c_int
+    libc.shmat.argtypes = [c_int, c_void_p, c_int]
+    libc.shmat.restype = c_void_p
+    libc.shmdt.argtypes = [c_void_p]
+    libc.shmctl.argtypes = [c_int, c_int, c_void_p]
+
+    xcomp = libs.get("Xcomposite")
+    if xcomp is not None:
+        xcomp.XCompositeQueryExtension.argtypes = [c_void_p, POINTER(c_int), POINTER(c_int)]
+        xcomp.XCompositeQueryExtension.restype = c_int
+        xcomp.XCompositeRedirectWindow.argtypes = [c_void_p, c_ulong, c_int]
+        xcomp.XCompositeUnredirectWindow.argtypes = [c_void_p, c_ulong, c_int]
+        xcomp.XCompositeNameWindowPixmap.argtypes = [c_void_p, c_ulong]
+        xcomp.XCompositeNameWindowPixmap.restype = c_ulong
+    return x11, xext, xcomp, libc
+
+
+_LIBS = _load_libraries()
+# Wayland セッションでは X11 ルートウィンドウが実画面を表さないため対象外
+XSHM_AVAILABLE = bool(_LIBS and os.environ.get("DISPLAY") and os.environ.get("XDG_SESSION_TYPE", "x11").lower() != "wayland")
+
+# X のエラーはスレッドごとに記録し、呼び出し直後に確認する
+_x_errors = threading.local()
+_X_ERROR_HANDLER_TYPE = ctypes.CFUNCTYPE(c_int, c_void_p, POINTER(XErrorEvent))
+
+
+@_X_ERROR_HANDLER_TYPE
+def _x_error_handler(_display, event):
+    _x_errors.last = (event.contents.error_code, event.contents.request_code, event.contents.minor_code)
+    return 0
+
+
+if _LIBS:
+    _LIBS[0].XSetErrorHandler.argtypes = [_X_ERROR_HANDLER_TYPE]
+    _LIBS[0].XSetErrorHandler.restype = c_void_p
+
+
+class XShmCapture:
+    """
+    MIT-SHM によるキャプチャ。grab() は共有メモリ上の BGRA ビューを返す（次の grab で上書きされる）。
+    """
+
+    def __init__(self, display_name: str = None):
+        if not _LIBS:
+            raise X11CaptureError("libX11/libXext not available")
+        self._x11, self._xext, self._xcomp, self._libc = _LIBS
+        # 既定のエラーハンドラはプロセスを終了させるため差し替える（mss も同様の処理をする）
+        self._x11.XSetErrorHandler(_x_error_handler)
+        self._dpy = self._x11.XOpenDisplay(display_name.encode() if display_name else None)
+        if not self._dpy:
+            raise X11CaptureError(f"Cannot open display {display_name or os.environ.get('DISPLAY')}")
+        if not self._xext.XShmQueryExtension(self._dpy):
+            self._x11.XCloseDisplay(self._dpy)
+            self._dpy = None
+            raise X11CaptureError("MIT-SHM extension not available")
+        screen = self._x11.XDefaultScreen(self._dpy)
+        self._root = self._x11.XRootWindow(self._dpy, screen)
+        self._visual = self._x11.XDefaultVisual(self._dpy, screen)
+        self._depth = self._x11.XDefaultDepth(self._dpy, screen)
+
+        self._image = None
+        self._shminfo = None
+        self._image_size = (0, 0)
+        self._frame_view = None
+
+        self._target_window = None
+        self._window_pixmap = 0
+        self._window_size = (0, 0)
+        self.segment_allocations = 0
+
+    # ------------------------------------------------------------------
+    # 共有メモリセグメント
+    # ------------------------------------------------------------------
+    def _destroy_image(self, image):
+        # XDestroyImage は data / obdata を free するため、共有メモリと Python 側の shminfo を外してから破棄する
+        image.contents.data = None
+        image.contents.obdata = None
+        self._x11.XDestroyImage(image)
+
+    def _check_x_error(self, what: str):
+        self._x11.XSync(self._dpy, 0)
+        err = getattr(_x_errors, "last", None)
+        if err is not None:
+            _x_errors.last = None
+            raise X11CaptureError(f"{what} failed (X error code={err[0]} request={err[1]}.{err[2]})")
+
+    def _ensure_segment(self, width: int, height: int):
+        if self._image is not None and self._image_size == (width, height):
+            return
+        self._release_segment()
+        shminfo = XShmSegmentInfo()
+        image = self._xext.XShmCreateImage(self._dpy, self._visual, self._depth, ZPIXMAP, None, byref(shminfo), width, height)
+        if not image:
+            raise X11CaptureError("XShmCreateImage failed")
+        if image.contents.bits_per_pixel != 32:
+            self._destroy_image(image)
+            raise X11CaptureError(f"Unsupported pixel format: {image.contents.bits_per_pixel} bpp")
+        size = image.contents.bytes_per_line * height
+        shminfo.shmid = self._libc.shmget(IPC_PRIVATE, size, IPC_CREAT | 0o600)
+        if shminfo.shmid < 0:
+            self._destroy_image(image)
+            raise X11CaptureError("shmget failed")
+        addr = self._libc.shmat(shminfo.shmid, None, 0)
+        if addr is None or addr == ctypes.c_void_p(-1).value:
+            self._libc.shmctl(shminfo.shmid, IPC_RMID, None)
+            self._destroy_image(image)
+            raise X11CaptureError("shmat failed")
+        shminfo.shmaddr = addr
+        shminfo.readOnly = 0
+        image.contents.data = addr
+        self._xext.XShmAttach(self._dpy, byref(shminfo))
+        try:
+            self._check_x_error("XShmAttach")
+        except X11CaptureError:
+            # アタッチに失敗した場合はマッピングと XImage をここで解放する（まだ self._image に登録していない）
+            self._libc.shmdt(addr)
+            self._destroy_image(image)
+            raise
+        finally:
+            # アタッチ後に削除予約しておけば、プロセス異常終了時もセグメントが残らない
+            self._libc.shmctl(shminfo.shmid, IPC_RMID, None)
+
+        self._image, self._shminfo, self._image_size = image, shminfo, (width, height)
+        bpl = image.contents.bytes_per_line
+        buf = (c_ubyte * size).from_address(addr)
+        self._frame_view = np.frombuffer(buf, dtype=np.uint8).reshape(height, bpl // 4, 4)[:, :width]
+        self.segment_allocations += 1
+
+    def _release_segment(self):
+        if self._image is None:
+            return
+        try:
+            self._xext.XShmDetach(self._dpy, byref(self._shminfo))
+            self._x11.XSync(self._dpy, 0)
+        finally:
+            self._frame_view = None
+            self._libc.shmdt(self._shminfo.shmaddr)
+            self._destroy_image(self._image)
+            self._image, self._shminfo, self._image_size = None, None, (0, 0)
+
+    # ------------------------------------------------------------------
+    # ウィンドウ単位のキャプチャ (XComposite)
+    # ------------------------------------------------------------------
+    @property
+    def composite_available(self) -> bool:
+        if self._xcomp is None:
+            return False
+        ev, err = c_int(), c_int()
+        return bool(self._xcomp.XCompositeQueryExtension(self._dpy, byref(ev), byref(err)))
+
+    def set_target_window(self, window_id):
+        """ウィンドウIDを指定すると、以降の grab はそのウィンドウの内容から切り出します（None で画面全体）。"""
+        window_id = int(window_id) if window_id else None
+        if window_id == self._target_window:
+            return
+        self._release_window()
+        if window_id is None:
+            return
+        if not self.composite_available:
+            raise X11CaptureError("XComposite extension not available")
+        self._xcomp.XCompositeRedirectWindow(self._dpy, window_id, COMPOSITE_REDIRECT_AUTOMATIC)
+        self._check_x_error("XCompositeRedirectWindow")
+        self._target_window = window_id
+
+    def _release_window(self):
+        if self._window_pixmap:
+            self._x11.XFreePixmap(self._dpy, self._window_pixmap)
+            self._window_pixmap = 0
+        if self._target_window is not None and self._xcomp is not None:
+            self._xcomp.XCompositeUnredirectWindow(self._dpy, self._target_window, COMPOSITE_REDIRECT_AUTOMATIC)
+            self._x11.XSync(self._dpy, 0)
+            _x_errors.last = None
+        self._target_window = None
+        self._window_size = (0, 0)
+
+    def _window_drawable(self):
+        """(pixmap, ウィンドウ左上のルート座標, ボーダー幅) を返します。リサイズ時は pixmap を取り直します。"""
+        attrs = XWindowAttributes()
+        if not self._x11.XGetWindowAttributes(self._dpy, self._target_window, byref(attrs)):
+            raise X11CaptureError("Target window is gone")
+        size = (attrs.width, attrs.height)
+        if not self._window_pixmap or size != self._window_size:
+            if self._window_pixmap:
+                self._x11.XFreePixmap(self._dpy, self._window_pixmap)
+            self._window_pixmap = self._xcomp.XCompositeNameWindowPixmap(self._dpy, self._target_window)
+            self._check_x_error("XCompositeNameWindowPixmap")
+            self._window_size = size
+        x, y, child = c_int(), c_int(), c_ulong()
+        self._x11.XTranslateCoordinates(self._dpy, self._target_window, self._root, 0, 0, byref(x), byref(y), byref(child))
+        return self._window_pixmap, (x.value, y.value), attrs.border_width
+
+    # ------------------------------------------------------------------
+    # 取得
+    # ------------------------------------------------------------------
+    def grab(self, region: tuple) -> np.ndarray:
+        """
+        region (left, top, right, bottom) をルート座標で指定して取得します。
+        Returns: BGRA の np.ndarray ビュー（共有メモリ上。保持する場合はコピーすること）
+        """
+        left, top, right, bottom = (int(v) for v in region)
+        width, height = right - left, bottom - top
+        if width <= 0 or height <= 0:
+            raise X11CaptureError(f"Invalid region {region}")
+
+        drawable, x, y = self._root, left, top
+        if self._target_window is not None:
+            drawable, (win_x, win_y), border = self._window_drawable()
+            x, y = left - win_x + border, top - win_y + border
+
+        self._ensure_segment(width, height)
+        ok = self._xext.XShmGetImage(self._dpy, drawable, self._image, x, y, ALL_PLANES)
+        if not ok:
+            self._check_x_error("XShmGetImage")
+            raise X11CaptureError("XShmGetImage failed")
+        return self._frame_view
+
+    def root_size(self) -> tuple:
+        attrs = XWindowAttributes()
+        self._x11.XGetWindowAttributes(self._dpy, self._root, byref(attrs))
+        return attrs.width, attrs.height
+
+    def close(self):
+        if not self._dpy:
+            return
+        try:
+            self._release_window()
+            self._release_segment()
+        finally:
+            self._x11.XCloseDisplay(self._dpy)
+            self._dpy = None
+
+    def __del__(self):
+        try:
+            self.close()
+        except Exception:
+            pass
+
+
+class XWindowTracker:
+    """
+    ウィンドウの位置・サイズを ConfigureNotify イベントで追跡します（専用の Display 接続を使う）。
+    イベントが来たときだけルート座標を取り直すため、poll() は通常 XPending の確認のみで終わる。
+    """
+
+    def __init__(self, window_id: int, display_name: str = None):
+        if not _LIBS:
+            raise X11CaptureError("libX11 not available")
+        self._x11 = _LIBS[0]
+        self._x11.XSetErrorHandler(_x_error_handler)
+        self._dpy = self._x11.XOpenDisplay(display_name.encode() if display_name else None)
+        if not self._dpy:
+            raise X11CaptureError(f"Cannot open display {display_name or os.environ.get('DISPLAY')}")
+        self._root = self._x11.XRootWindow(self._dpy, self._x11.XDefaultScreen(self._dpy))
+        self.window_id = int(window_id)
+        # XEvent は最大 24 long の共用体
+        self._event = (c_long * 24)()
+        self._x11.XSelectInput(self._dpy, self.window_id, STRUCTURE_NOTIFY_MASK)
+        self._x11.XSync(self._dpy, 0)
+        if getattr(_x_errors, "last", None) is not None:
+            _x_errors.last = None
+            self.close()
+            raise X11CaptureError(f"Cannot watch window {window_id}")
+        self.alive = True
+
+    def geometry(self):
+        """(left, top, width, height) をルート座標で返します。ウィンドウが無ければ None。"""
+        attrs = XWindowAttributes()
+        if not self._x11.XGetWindowAttributes(self._dpy, self.window_id, byref(attrs)):
+            _x_errors.last = None
+            return None
+        x, y, child = c_int(), c_int(), c_ulong()
+        self._x11.XTranslateCoordinates(self._dpy, self.window_id, self._root, 0, 0, byref(x), byref(y), byref(child))
+        return x.value, y.value, attrs.width, attrs.height
+
+    def poll(self) -> bool:
+        """溜まっているイベントを読み捨て、移動・リサイズ・破棄があれば True を返します。"""
+        changed = False
+        while self._dpy and self._x11.XPending(self._dpy):
+            self._x11.XNextEvent(self._dpy, self._event)
+            event_type = ctypes.cast(self._event, POINTER(c_int)).contents.value
+            if event_type == CONFIGURE_NOTIFY:
+                changed = True
+            elif event_type == DESTROY_NOTIFY:
+                self.alive = False
+                changed = True
+        return changed
+
+    def close(self):
+        if self._dpy:
+            self._x11.XCloseDisplay(self._dpy)
+            self._dpy = None
+
+    def __del__(self):
+        try:
+            self.close()
+        except Exception:
+            pass
+
+
+def _main(argv):
+    import argparse
+    parser = argparse.ArgumentParser(description="XShm capture self-check")
+    parser.add_argument("--frames", type=int, default=50)
+    parser.add_argument("--region", help="left,top,right,bottom (default: whole screen)")
+    parser.add_argument("--window", help="X window id (decimal or 0x...) to capture via XComposite")
+    args = parser.parse_args(argv)
+
+    if not XSHM_AVAILABLE:
+        print("XShm capture is not available (no X11 display or libraries).")
+        return 1
+    cap = XShmCapture()
+    try:
+        if args.window:
+            cap.set_target_window(int(args.window, 0))
+        if args.region:
+            region = tuple(int(v) for v in args.region.split(","))
+        else:
+            w, h = cap.root_size()
+            region = (0, 0, w, h)
+        times = []
+        for _ in range(args.frames):
+            start = time.perf_counter()
+            frame = cap.grab(region)
+            times.append((time.perf_counter() - start) * 1000.0)
+        times.sort()
+        print(f"region={region} shape={frame.shape} frames={len(times)} "
+              f"mean={sum(times) / len(times):.3f}ms p95={times[int(0.95 * (len(times) - 1))]:.3f}ms "
+              f"segments_allocated={cap.segment_allocations}")
+    finally:
+        cap.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(_main(sys.argv[1:]))
@@ -1,12 +1,14 @@
 # config.py
 # ★★★ (修正) クリーンアップ時に、移動した画像のJSONを自動追従(レスキュー)させるロジックを追加 ★★★
 # ★★★ (拡張) 隠しライフサイクル管理機能用の設定ロードを追加 ★★★
+# ★★★ (改善) 孤立JSONクリーンアップをバックグラウンド・増分処理に変更 ★★★
 
 import json
 import shutil
 from pathlib import Path
 import os
 import threading
+import time
 from settings_model import normalize_image_item_settings
 
 class ConfigManager:
@@ -24,94 +26,253 @@ class ConfigManager:
         self.item_json_locks = {}
         self.item_json_locks_lock = threading.Lock()
 
-        # 初期化時にクリーンアップとレスキューを実行
-        self._cleanup_orphaned_json_files()
+        # 孤立JSONのクリーンアップ（バックグラウンド実行）
+        # 起動時に全走査を同期実行すると、大きなライブラリ/ネットワークHOMEで起動が数秒遅れるため、
+        # start_background_cleanup() でワーカースレッドに逃がし、ディレクトリ単位で間引きながら進める。
+        # 状態ファイルは走査対象外の隠しディレクトリに置く（base_dir に書き込むと base_dir 自身の mtime が
+        # 毎回変わり、トップレベルのフォルダが常に「変更あり」として再走査されてしまうため）
+        self.cleanup_state_path = self.base_dir / self.CLEANUP_STATE_DIRNAME / self.CLEANUP_STATE_FILENAME
+        self._cleanup_thread = None
+        self._cleanup_stop_event = threading.Event()
+        self.last_cleanup_report = None
+
+    # --- 孤立JSONクリーンアップ設定 ---
+    CLEANUP_STATE_DIRNAME = ".imeck15"
+    CLEANUP_STATE_FILENAME = "_cleanup_state.json"
+    CLEANUP_BATCH_SIZE = 20          # このディレクトリ数ごとに休止してI/Oを譲る
+    CLEANUP_THROTTLE_SEC = 0.05      # 休止時間(秒)
+    CLEANUP_START_DELAY_SEC = 3.0    # 起動直後のI/O競合を避けるための開始遅延(秒)
+    IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.bmp')
+
+    def start_background_cleanup(self, start_delay: float = None):
+        """
+        孤立JSONのクリーンアップをデーモンスレッドで開始します。
+        既に実行中の場合は何もしません。
+        """
+        if self._cleanup_thread and self._cleanup_thread.is_alive():
+            return
+        delay = self.CLEANUP_START_DELAY_SEC if start_delay is None else max(0.0, float(start_delay))
+        self._cleanup_stop_event.clear()
+        self._cleanup_thread = threading.Thread(
+            target=self._run_background_cleanup, args=(delay,), name="OrphanedJsonCleanup", daemon=True
+        )
+        self._cleanup_thread.start()
+
+    def stop_background_cleanup(self, timeout: float = 1.0):
+        """実行中のクリーンアップを中断します（進捗は状態ファイルに保存済みのため、次回起動時に再開されます）。"""
+        self._cleanup_stop_event.set()
+        if self._cleanup_thread and self._cleanup_thread.is_alive():
+            self._cleanup_thread.join(timeout=timeout)
+
+    def _run_background_cleanup(self, start_delay: float):
+        if start_delay > 0 and self._cleanup_stop_event.wait(start_delay):
+            return
+        try:
+            self.last_cleanup_report = self._cleanup_orphaned_json_files()
+        except Exception as e:
+            self.logger.log("log_cleanup_error_general", str(e))
+
+    def _load_cleanup_state(self) -> dict:
+        if not self.cleanup_state_path.exists():
+            return {}
+        try:
+            with open(self.cleanup_state_path, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+            return state if isinstance(state, dict) else {}
+        except Exception:
+            return {}
 
-    def _cleanup_orphaned_json_files(self):
+    def _save_cleanup_state(self, state: dict):
+        try:
+            self.cleanup_state_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.cleanup_state_path.with_suffix('.tmp')
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(state, f, indent=2, ensure_ascii=False)
+            os.replace(tmp_path, self.cleanup_state_path)
+        except Exception as e:
+            self.logger.log(f"[WARN] Failed to save cleanup state: {e}")
+
+    def _scan_settings_index(self) -> dict:
         """
-        孤立した設定JSONファイルを処理します。
-        画像がOS上で移動されていた場合、JSONを追従して移動させます。
-        画像が完全に削除されていた場合のみ、JSONを削除します。
+        ライブラリを1回だけ走査して、ディレクトリ単位の設定インデックスを作成します。
+        戻り値: {dir_path(str): {'mtime': float, 'images': {stem: Path}, 'jsons': [Path]}}
+        （旧実装は画像用・JSON用の rglob を2回走らせていた）
         """
-        protected_files = [
+        protected_files = {
             self.app_config_path.name,
             self.window_scales_path.name,
             self.image_order_filename,
             self.folder_config_filename,
-            self.sub_order_filename
-        ]
-        
-        image_extensions = {'.png', '.jpg', '.jpeg', '.bmp'}
+            self.sub_order_filename,
+            self.CLEANUP_STATE_FILENAME,
+        }
+        index = {}
+        for dir_path, dir_names, file_names in os.walk(self.base_dir):
+            if self._cleanup_stop_event.is_set():
+                break
+            # tessdata 等の非ライブラリディレクトリや隠しディレクトリは対象外
+            dir_names[:] = [d for d in dir_names if not d.startswith('.') and d != 'tessdata']
+            try:
+                mtime = os.stat(dir_path).st_mtime
+            except OSError:
+                continue
+            images = {}
+            jsons = []
+            for name in file_names:
+                stem, ext = os.path.splitext(name)
+                ext = ext.lower()
+                if ext in self.IMAGE_EXTENSIONS:
+                    images[stem] = Path(dir_path) / name
+                elif ext == '.json' and name not in protected_files:
+                    jsons.append(Path(dir_path) / name)
+            index[dir_path] = {'mtime': mtime, 'images': images, 'jsons': jsons}
+        return index
+
+    def _cleanup_orphaned_json_files(self) -> dict:
+        """
+        孤立した設定JSONファイルを処理します。
+        画像がOS上で移動されていた場合、JSONを追従して移動させます。
+        画像が完全に削除されていた場合のみ、JSONを削除します。
 
+        前回の実行以降に変更されていない（mtime が同じ）ディレクトリはスキップし、
+        処理済みディレクトリは逐次状態ファイルに記録するため、中断しても次回はその続きから再開します。
+        戻り値: 修復内容のレポート(dict)
+        """
         self.logger.log("log_cleanup_start")
-        cleaned_count = 0
-        rescued_count = 0
+        report = {
+            'started_at': time.time(),
+            'finished_at': None,
+            'completed': False,
+            'dirs_total': 0,
+            'dirs_checked': 0,
+            'dirs_skipped_unchanged': 0,
+            'rescued': [],   # [(from, to)]
+            'deleted': [],   # [path]
+            'errors': [],    # [(path, message)]
+        }
 
         try:
-            # 1. 現在存在するすべての画像のマップを作成 (ファイル名(拡張子なし) -> フルパス)
-            #    これにより、画像がどこへ移動していても見つけられるようにする
+            state = self._load_cleanup_state()
+            checked_mtimes = state.get('dir_mtimes', {}) if isinstance(state.get('dir_mtimes'), dict) else {}
+
+            index = self._scan_settings_index()
+            report['dirs_total'] = len(index)
+
+            # 画像の全体マップ (ファイル名(拡張子なし) -> フルパス) はインデックスから作る
+            # 同名のファイルが複数ある場合は、最後に見つかったものを優先する形になるが、通常の移動であれば問題ないレベル
             all_images_map = {}
-            for img_path in self.base_dir.rglob('*'):
-                if img_path.is_file() and img_path.suffix.lower() in image_extensions:
-                    # 同名のファイルが複数ある場合は、最後に見つかったものを優先する形になるが、
-                    # 通常の移動であれば問題ないレベル
-                    all_images_map[img_path.stem] = img_path
-
-            # 2. すべてのJSONファイルをチェック
-            for json_path in self.base_dir.rglob('*.json'):
-                if json_path.name in protected_files:
+            for entry in index.values():
+                all_images_map.update(entry['images'])
+
+            processed_since_save = 0
+            for dir_path, entry in index.items():
+                if self._cleanup_stop_event.is_set():
+                    break
+
+                # 前回チェック時から変化のないディレクトリはスキップ（増分処理）
+                if checked_mtimes.get(dir_path) == entry['mtime']:
+                    report['dirs_skipped_unchanged'] += 1
                     continue
 
-                base_name = json_path.stem
-                parent_dir = json_path.parent
-                
-                # まず、同じフォルダに画像があるかチェック (通常の状態)
-                has_pair_locally = False
-                for ext in image_extensions:
-                    if (parent_dir / (base_name + ext)).exists():
-                        has_pair_locally = True
+                for json_path in entry['jsons']:
+                    self._repair_orphaned_json(json_path, entry['images'], all_images_map, report)
+
+                # 処理後の mtime を記録（自分で移動/削除した場合も反映される）
+                try:
+                    checked_mtimes[dir_path] = os.stat(dir_path).st_mtime
+                except OSError:
+                    checked_mtimes.pop(dir_path, None)
+                report['dirs_checked'] += 1
+                processed_since_save += 1
+
+                # スロットリング: 一定数ごとに進捗を保存してI/Oを譲る
+                if processed_since_save >= self.CLEANUP_BATCH_SIZE:
+                    self._save_cleanup_state({'dir_mtimes': checked_mtimes})
+                    processed_since_save = 0
+                    if self._cleanup_stop_event.wait(self.CLEANUP_THROTTLE_SEC):
                         break
-                
-                if has_pair_locally:
-                    continue # 正常なので何もしない
-
-                # --- ここからレスキュー処理 ---
-                # 同じフォルダにない場合、別のフォルダに画像が移動していないか探す
-                if base_name in all_images_map:
-                    # 画像が見つかった！ JSONをそちらに移動する
-                    new_image_path = all_images_map[base_name]
-                    new_json_path = new_image_path.with_suffix('.json')
-                    
-                    try:
-                        # 移動先に既にJSONがない場合のみ移動
-                        if not new_json_path.exists():
-                            shutil.move(str(json_path), str(new_json_path))
-                            self.logger.log(f"[INFO] Rescued config JSON: Moved from '{json_path.parent.name}' to '{new_image_path.parent.name}'")
-                            rescued_count += 1
-                        else:
-                            # 移動先に既にJSONがあるなら、古い方は不要なので削除
-                            # (例: 画像を上書き移動した場合など)
-                            json_path.unlink()
-                            self.logger.log(f"[INFO] Deleted duplicate JSON: {json_path.name}")
-                            cleaned_count += 1
-                    except Exception as e:
-                        self.logger.log(f"[ERROR] Failed to move rescued JSON: {e}")
-                else:
-                    # 画像がどこにも見つからない -> 本当に削除されたファイル
-                    try:
-                        json_path.unlink()
-                        self.logger.log("log_cleanup_deleted", str(json_path))
-                        cleaned_count += 1
-                    except OSError as e:
-                        self.logger.log("log_cleanup_error_delete", str(json_path), str(e))
+
+            report['completed'] = not self._cleanup_stop_event.is_set()
+            if report['completed']:
+                # 消えたディレクトリの記録を掃除
+                checked_mtimes = {d: m for d, m in checked_mtimes.items() if d in index}
+            report['finished_at'] = time.time()
+            self._save_cleanup_state({
+                'dir_mtimes': checked_mtimes,
+                'last_report': {
+                    'finished_at': report['finished_at'],
+                    'completed': report['completed'],
+                    'dirs_checked': report['dirs_checked'],
+                    'dirs_skipped_unchanged': report['dirs_skipped_unchanged'],
+                    'rescued': [list(r) for r in report['rescued']],
+                    'deleted': report['deleted'],
+                },
+            })
 
         except Exception as e:
             self.logger.log("log_cleanup_error_general", str(e))
 
+        cleaned_count = len(report['deleted'])
+        rescued_count = len(report['rescued'])
+        elapsed = (report['finished_at'] or time.time()) - report['started_at']
         if cleaned_count > 0 or rescued_count > 0:
             self.logger.log(f"[INFO] Cleanup finished. Deleted: {cleaned_count}, Rescued: {rescued_count}")
         else:
             self.logger.log("log_cleanup_complete_none")
+        self.logger.log(
+            f"[DEBUG] Cleanup scanned {report['dirs_checked']}/{report['dirs_total']} dirs "
+            f"(unchanged: {report['dirs_skipped_unchanged']}, completed: {report['completed']}) in {elapsed:.2f}s"
+        )
+        return report
+
+    def _repair_orphaned_json(self, json_path: Path, local_images: dict, all_images_map: dict, report: dict):
+        """1件のJSONについて、画像ペアの確認 → レスキュー(移動) → 削除 を行います。"""
+        base_name = json_path.stem
+
+        # まず、同じフォルダに画像があるかチェック (通常の状態)
+        if base_name in local_images:
+            return
+
+        file_lock = self._get_item_json_lock(json_path)
+        with file_lock:
+            # 走査後にUI操作(移動/リネーム)でペアが揃った可能性があるため、ディスク上で再確認する
+            if not json_path.exists():
+                return
+            parent_dir = json_path.parent
+            for ext in self.IMAGE_EXTENSIONS:
+                if (parent_dir / (base_name + ext)).exists():
+                    return
+
+            # --- ここからレスキュー処理 ---
+            # 同じフォルダにない場合、別のフォルダに画像が移動していないか探す
+            new_image_path = all_images_map.get(base_name)
+            if new_image_path is not None and new_image_path.exists():
+                # 画像が見つかった！ JSONをそちらに移動する
+                new_json_path = new_image_path.with_suffix('.json')
+                try:
+                    # 移動先に既にJSONがない場合のみ移動
+                    if not new_json_path.exists():
+                        shutil.move(str(json_path), str(new_json_path))
+                        self.logger.log(f"[INFO] Rescued config JSON: Moved from '{json_path.parent.name}' to '{new_image_path.parent.name}'")
+                        report['rescued'].append((str(json_path), str(new_json_path)))
+                    else:
+                        # 移動先に既にJSONがあるなら、古い方は不要なので削除
+                        # (例: 画像を上書き移動した場合など)
+                        json_path.unlink()
+                        self.logger.log(f"[INFO] Deleted duplicate JSON: {json_path.name}")
+                        report['deleted'].append(str(json_path))
+                except Exception as e:
+                    self.logger.log(f"[ERROR] Failed to move rescued JSON: {e}")
+                    report['errors'].append((str(json_path), str(e)))
+            else:
+                # 画像がどこにも見つからない -> 本当に削除されたファイル
+                try:
+                    json_path.unlink()
+                    self.logger.log("log_cleanup_deleted", str(json_path))
+                    report['deleted'].append(str(json_path))
+                except OSError as e:
+                    self.logger.log("log_cleanup_error_delete", str(json_path), str(e))
+                    report['errors'].append((str(json_path), str(e)))
 
     def load_app_config(self) -> dict:
         default_config = {
@@ -133,7 +294,9 @@ class ConfigManager:
             },
             "screen_stability_check": {
                 "enabled": False,
-                "threshold": 8
+                "threshold": 8,
+                # 比較する領域: "top_left" / "center" / "click_target" / [x1, y1, x2, y2]
+                "regions": ["top_left", "click_target"]
             },
             "eco_mode": {
                 "enabled": True
@@ -338,7 +501,9 @@ class ConfigManager:
                     'threshold': 0.8,
                     'debounce_time': 0.0,
                     # 画像ごとのクリック種別（左/右）
-                    'right_click': False
+                    'right_click': False,
+                    # 画像ごとの照合方式（特徴点照合）
+                    'feature_match': False
                 }
             
             if not setting_path.exists():
@@ -556,7 +721,8 @@ class ConfigManager:
         try:
             all_items_on_disk = {
                 p for p in current_dir.iterdir() 
-                if p.is_dir() or (p.is_file() and p.suffix.lower() in ('.png', '.jpg', '.jpeg', '.bmp'))
+                # 隠しディレクトリ（クリーンアップの状態ファイル等のアプリ用データ）はツリーに出さない
+                if (p.is_dir() and not p.name.startswith('.')) or (p.is_file() and p.suffix.lower() in ('.png', '.jpg', '.jpeg', '.bmp'))
             }
         except (FileNotFoundError, PermissionError, OSError):
             # ディレクトリが削除された、またはアクセス権限がない場合は空リストを返す
@@ -34,7 +34,7 @@ from core_selection import SelectionHandler
 from custom_input_dialog import ask_string_custom
 from input_gestures import GlobalMouseGestureHandler
 from settings_model import normalize_image_item_settings
-from timer_schedule import build_timer_schedule_cache
+from timer_schedule import build_timer_schedule_cache, TimerScheduler
 from monitoring_controller import MonitoringController
 from cache_builder import CacheBuilder
 from quick_timer_manager import QuickTimerManager
@@ -167,7 +167,7 @@ class CoreEngine(QObject):
         self._move_error_message = None
         self._move_error_lock = threading.Lock()
         
-        self.timer_schedule_cache = {}
+        self.timer_schedule_cache = TimerScheduler()
         
         self.folder_cooldowns = {}
 
@@ -188,6 +188,8 @@ class CoreEngine(QObject):
 
         self.priority_timers = {}
         self.folder_children_map = {}
+        # 監視ループ用の絞り込み済みキャッシュ（TemplateManager.build_cache が作成）
+        self.template_cache_views = {}
         
         # OCR非同期処理用
         self.ocr_futures = {}
@@ -235,13 +237,15 @@ class CoreEngine(QObject):
         self.ECO_CHECK_INTERVAL = 1.0
         self.ECO_MODE_DELAY = 5.0
 
-        self.screen_stability_hashes = deque(maxlen=3)
+        # 画面安定性チェック用: 直近に処理したフレームの (縮小後グレー, {path: 検出矩形})
+        self.screen_stability_frames = deque(maxlen=3)
 
         # クイックタイマー予約（最大9件）
         self._quick_timer_manager = QuickTimerManager(self)
         # 互換性維持: monitoring_states 等が dict 参照しているため残す（中身は manager が所有）
         self.quick_timers = self._quick_timer_manager.timers
         self.latest_frame_for_hash = None
+        self.latest_gray_for_hash = None
 
         self.last_successful_click_time = 0
         self.is_eco_cooldown_active = False
@@ -313,8 +317,8 @@ class CoreEngine(QObject):
     def handle_save_captured_image(self, file_name: str, captured_image: np.ndarray):
         self.selection_handler.handle_save_captured_image(file_name, captured_image)
 
-    def check_screen_stability(self) -> bool:
-        return self.monitoring_processor.check_screen_stability()
+    def check_screen_stability(self, target_match=None) -> bool:
+        return self.monitoring_processor.check_screen_stability(target_match)
 
     def _check_and_activate_timer_priority_mode(self):
         current_time = time.time()
@@ -369,7 +373,7 @@ class CoreEngine(QObject):
            log_key in self._log_spam_filter and \
            current_time - self._last_log_time < 3.0:
             return
-        self.logger.log(log_key, *args)
+        self.logger.log(log_key, *args, force=force)
         self._last_log_message = log_key
         self._last_log_time = current_time
 
@@ -624,6 +628,7 @@ class CoreEngine(QObject):
         self.timer_session_active = False
         
         if self.capture_manager: self.capture_manager.cleanup()
+        if self.config_manager: self.config_manager.stop_background_cleanup()
         if hasattr(self, 'thread_pool') and self.thread_pool: self.thread_pool.shutdown(wait=False)
 
     def on_folder_settings_changed(self):
@@ -9,22 +9,64 @@ import numpy as np
 import psutil 
 from pathlib import Path
 import os
+import threading
 
-from matcher import _match_template_task, calculate_phash
+from capture import RegionParts, merge_rects
+from capture_health import DUPLICATE_FRAME_TOLERANCE, frames_similar
+from feature_matcher import compute_screen_features, match_features, translate_homography
+from frame_preprocess import preprocess_frame, preprocess_frame_umat, preprocess_parts
+from matcher import _match_template_task, calculate_dct_hash, hash_distance
 from monitoring_states import IdleState, CountdownState, PriorityState
+from ocr_scheduler import OCRScheduler
+from ocr_trend import get_trend_store
+from tracing import TRACE, trace
+from window_tracker import WindowGeometryTracker
+from motion_tracker import MotionTrackerStore
 
 try:
     from ocr_runtime import OCRRuntimeEvaluator
-    DEBUG_OCR_COORDS = os.environ.get("DEBUG_OCR_COORDS", "1") == "1"
     OCR_AVAILABLE = True
 except ImportError:
     OCR_AVAILABLE = False
-    DEBUG_OCR_COORDS = False
 
 # ログ出力量制御トグル（配布ビルドで無効化可）
-ENABLE_OCR_TRACE_LOG = os.environ.get("OCR_TRACE_LOG", "1") == "1"
+# NOTE: 座標・評価の詳細は tracing の "ocr" サブシステムで出力する（既定OFF、ログタブから切替）
 ENABLE_OCR_SKIP_LOG = os.environ.get("OCR_SKIP_LOG", "1") == "1"
 
+# ★★★ (追加) 部分キャプチャ: 直近に見つかったテンプレートの周辺だけを取得して照合する（既定OFF） ★★★
+# 一定間隔で全体を取得し、新しく現れたテンプレートはそこで検出する
+MULTI_REGION_CAPTURE = os.environ.get("MULTI_REGION_CAPTURE", "0") == "1"
+
+
+def _env_float(name, default):
+    try:
+        return max(0.0, float(os.environ.get(name, str(default))))
+    except ValueError:
+        return default
+
+
+# 全体キャプチャを行う間隔（秒）
+MULTI_REGION_FULL_SCAN_SEC = _env_float("MULTI_REGION_FULL_SCAN_SEC", 0.5)
+# 最後に見つかってからこの秒数を過ぎた位置は探索対象から外す
+MULTI_REGION_HINT_TTL_SEC = _env_float("MULTI_REGION_HINT_TTL_SEC", 5.0)
+# マッチ矩形の周囲に確保する探索マージン（縮小後px）
+MULTI_REGION_MARGIN = int(_env_float("MULTI_REGION_MARGIN", 48))
+# 部分矩形の合計がこの割合を超える場合は全体を取得する（分割取得の方が遅くなるため）
+MULTI_REGION_MAX_COVERAGE = 0.5
+# この距離（元解像度px）以内の矩形は1つにまとめて取得する
+MULTI_REGION_MERGE_GAP = 16
+
+# OpenCL 有効時に縮小・グレースケール化もデバイス上で行う（OPENCL_DEVICE_PREPROCESS=0 で従来どおりCPU）
+OPENCL_DEVICE_PREPROCESS = os.environ.get("OPENCL_DEVICE_PREPROCESS", "1") == "1"
+
+# ★★★ (追加) 前回処理したフレームと同一の画面では、テンプレートごとの照合結果を再利用する ★★★
+# 既定は全画素のチェックサムによる完全一致のみ。DUPLICATE_FRAME_TOLERANCE > 0（capture_health）の場合は
+# 間引き画素の平均絶対差で判定する（サンプル間の小さな変化は見逃すため注意）。MATCH_REUSE_ON_DUPLICATE=0 で無効
+MATCH_REUSE_ON_DUPLICATE = os.environ.get("MATCH_REUSE_ON_DUPLICATE", "1") == "1"
+
+# ★★★ (追加) 移動するターゲットの位置予測（既定OFF）: 予測窓を先に照合し、クリック位置を遅延ぶん補正する ★★★
+MOTION_PREDICTION = os.environ.get("MOTION_PREDICTION", "0") == "1"
+
 OPENCL_AVAILABLE = False
 try:
     if cv2.ocl.haveOpenCL():
@@ -32,7 +74,21 @@ try:
 except Exception:
     pass
 
+def _offset_match(match, offset):
+    """窓内で照合した結果の座標を、フレーム全体（縮小後）の座標に戻します。"""
+    ox, oy = offset
+    x, y = match['location']
+    match['location'] = (x + ox, y + oy)
+    x1, y1, x2, y2 = match['rect']
+    match['rect'] = (x1 + ox, y1 + oy, x2 + ox, y2 + oy)
+    if match.get('homography') is not None:
+        match['homography'] = translate_homography(match['homography'], ox, oy)
+
+
 class MonitoringProcessor:
+    # 監視ループ1周の最短間隔（finally と間引き時の sleep の合計）。処理レートの見積もりに使う
+    LOOP_INTERVAL_SEC = 0.02
+
     def __init__(self, core):
         self.core = core
         self.logger = core.logger
@@ -44,6 +100,274 @@ class MonitoringProcessor:
         except Exception:
             self.ocr_fail_cooldown_sec = 0.5
         self.ocr_fail_cooldowns = {}
+        # 数値が一定時間変化していない場合のクールダウン（値が安定している間は再OCRを間引く）
+        try:
+            self.ocr_stable_cooldown_sec = max(0.0, float(os.environ.get("OCR_STABLE_COOLDOWN_SEC", "1.5")))
+            self.ocr_stable_after_sec = max(0.0, float(os.environ.get("OCR_STABLE_AFTER_SEC", "2.0")))
+        except Exception:
+            self.ocr_stable_cooldown_sec = 1.5
+            self.ocr_stable_after_sec = 2.0
+        # OCRタスクの投入・重複排除・キャンセル（同一フレームの要求はまとめて実行）
+        self.ocr_scheduler = OCRScheduler(core, OCRRuntimeEvaluator.evaluate if OCR_AVAILABLE else None)
+        # キャプチャ専用スレッドから最後に受け取ったフレームの連番
+        self._last_frame_seq = 0
+        # 最後にクリックした時刻（time.monotonic()）。これより前に取得したフレームは使わない
+        self._last_click_time = 0.0
+        # キャプチャ専用スレッドに最後に設定した取得レート
+        self._producer_fps = None
+        # 部分キャプチャ用: {path: (探索窓(縮小後座標), 最終検出時刻)}
+        self._search_hints = {}
+        self._hint_lock = threading.Lock()
+        # ヒントが有効な条件 (認識範囲, キャプチャ縮小率, 縮小後フレームサイズ)
+        self._hint_basis = None
+        self._last_full_frame_time = 0.0
+        # 現フレームが部分キャプチャの場合の {path: 探索窓}。全体キャプチャなら None
+        self._frame_windows = None
+        # 同一フレームでの照合結果の再利用: {path: (キャッシュ項目, [(結果, テンプレート番号), ...])}
+        self._match_memo = {}
+        self._match_memo_key = None
+        self._memo_thumbnail = None
+        self._memo_digest = None
+        self._frame_is_duplicate = False
+        self.match_skip_stats = {'frames': 0, 'duplicate_frames': 0, 'reused': 0, 'matched': 0}
+        # ウィンドウ指定の認識範囲をウィンドウの移動・リサイズに追従させる
+        self._window_tracker = None
+        # (UMat, 読み戻したndarray)。フレームごとに置き換わる
+        self._host_bgr_cache = None
+        # (縮小後グレー, 画面の特徴点)。特徴点照合のアイテムがあるフレームで1回だけ計算する
+        self._screen_features_cache = None
+        # 移動ターゲットの追跡（時刻は処理中フレームのキャプチャ時刻 = time.monotonic()）
+        self.motion_tracks = MotionTrackerStore() if MOTION_PREDICTION else None
+        self._frame_time = time.monotonic()
+        self.motion_stats = {'predicted_hits': 0, 'predicted_misses': 0}
+
+    def mark_clicked(self):
+        """クリック直後に呼び出します。クリック前に取得を始めたフレームは、クリック後の画面を反映していないため処理しない。"""
+        self._last_click_time = time.monotonic()
+
+    def producer_target_fps(self, current_state=None) -> float:
+        """
+        監視ループが実際にフレームを処理する間隔に合わせたキャプチャレート。
+        間引き（effective_frame_skip_rate: 軽量モードのプリセットを含む）・カウントダウン・エコモードで
+        処理しないフレームをキャプチャ専用スレッドが取得しないようにする。
+        """
+        if isinstance(current_state, CountdownState):
+            return 1.0
+        if self.core.is_eco_cooldown_active:
+            return 1.0 / self.core.ECO_CHECK_INTERVAL
+        return 1.0 / (self.LOOP_INTERVAL_SEC * max(1, self.core.effective_frame_skip_rate))
+
+    def _update_producer_rate(self, current_state):
+        producer = self.core.capture_manager.producer
+        if producer is None:
+            return
+        fps = self.producer_target_fps(current_state)
+        if fps != self._producer_fps:
+            producer.set_target_fps(fps)
+            self._producer_fps = fps
+
+    def reset_frame_state(self):
+        """監視開始時にフレーム受け渡し・部分キャプチャの状態を初期化します。"""
+        self._last_frame_seq = 0
+        self._last_click_time = 0.0
+        self._producer_fps = None
+        with self._hint_lock:
+            self._search_hints.clear()
+            self._hint_basis = None
+        self._last_full_frame_time = 0.0
+        self._frame_windows = None
+        self._match_memo = {}
+        self._memo_thumbnail = None
+        self._memo_digest = None
+        self._frame_is_duplicate = False
+        self.match_skip_stats = {'frames': 0, 'duplicate_frames': 0, 'reused': 0, 'matched': 0}
+        if self.motion_tracks is not None:
+            self.motion_tracks.clear()
+        self.motion_stats = {'predicted_hits': 0, 'predicted_misses': 0}
+
+    def close_window_tracker(self):
+        tracker, self._window_tracker = self._window_tracker, None
+        if tracker is not None:
+            tracker.close()
+
+    def _track_window_geometry(self):
+        """
+        認識範囲がウィンドウ指定の場合、ウィンドウの移動・リサイズに合わせて認識範囲を更新します。
+        キャプチャバックエンドは作り直さず、次のフレームから新しい範囲で取得する。
+        リサイズ時はウィンドウスケールも計算し直す（_on_window_resized）。
+        """
+        hwnd = self.core.target_hwnd
+        tracker = self._window_tracker
+        if not hwnd or not self.core.recognition_area:
+            if tracker is not None:
+                self.close_window_tracker()
+            return
+        if tracker is None or tracker.window_id != hwnd:
+            self.close_window_tracker()
+            tracker = WindowGeometryTracker(hwnd)
+            tracker.last_rect = tuple(self.core.recognition_area)
+            self._window_tracker = tracker
+        if not tracker.supported:
+            return
+
+        new_rect = tracker.poll()
+        if tracker.is_gone:
+            self.logger.log("[WARN] Target window was closed. Recognition area is no longer tracked.", key="window_gone")
+            self.close_window_tracker()
+            self.core.target_hwnd = None
+            return
+        if new_rect is None:
+            return
+        old_rect = self.core.recognition_area
+        # 状態更新（GIL下での単純代入は原子的。キャプチャ専用スレッドは次の取得から新しい範囲を使う）
+        self.core.recognition_area = new_rect
+        old_size = (old_rect[2] - old_rect[0], old_rect[3] - old_rect[1])
+        new_size = (new_rect[2] - new_rect[0], new_rect[3] - new_rect[1])
+        if old_size != new_size:
+            self._on_window_resized(new_rect, old_size, new_size)
+        else:
+            self.logger.log(f"[INFO] Target window moved: {old_rect} -> {new_rect}", key="window_moved")
+        if TRACE.capture:
+            trace("capture", "window_geometry", window=hwnd, old=old_rect, new=new_rect)
+
+    def _on_window_resized(self, new_rect, old_size, new_size):
+        """
+        ウィンドウのリサイズに合わせてウィンドウスケールを計算し直します（復旧時の再ロックと同じ処理。
+        保存済みのベースサイズと auto_scale.use_window_scale の設定に従う）。
+        スケールが変わった場合はテンプレートキャッシュを作り直す（OCR の ROI・クリック位置も新しい倍率で計算される）。
+        """
+        title = self.core.environment_tracker.recognition_area_app_title
+        old_scale = self.core.current_window_scale
+        if title:
+            self.core._compute_and_apply_window_scale_no_prompt(title, new_rect)
+        new_scale = self.core.current_window_scale
+        self.logger.log(
+            f"[INFO] Target window resized {old_size} -> {new_size}. Window scale: {old_scale} -> {new_scale}",
+            key="window_resized",
+        )
+        if new_scale != old_scale:
+            self.core._cache_builder.request_rebuild(disable_tree=False)
+
+    def get_match_skip_rate(self) -> float:
+        """照合を再利用で済ませたテンプレートの割合。"""
+        stats = self.match_skip_stats
+        total = stats['reused'] + stats['matched']
+        return stats['reused'] / total if total else 0.0
+
+    def _update_duplicate_state(self, frame_info, boxes):
+        """前回処理したフレームと同一かを判定し、異なれば照合結果の再利用をリセットします。"""
+        thumbnail = frame_info.thumbnail if frame_info is not None else None
+        digest = frame_info.digest if frame_info is not None else None
+        self.match_skip_stats['frames'] += 1
+        if not MATCH_REUSE_ON_DUPLICATE:
+            duplicate = False
+        elif DUPLICATE_FRAME_TOLERANCE > 0:
+            duplicate = thumbnail is not None and frames_similar(thumbnail, self._memo_thumbnail, DUPLICATE_FRAME_TOLERANCE)
+        else:
+            duplicate = digest is not None and digest == self._memo_digest
+        if duplicate:
+            self.match_skip_stats['duplicate_frames'] += 1
+        else:
+            # 比較の基準は「結果を記録したフレーム」のまま動かさない（少しずつの変化を見逃さない）
+            self._match_memo = {}
+            self._memo_thumbnail = thumbnail
+            self._memo_digest = digest
+        self._frame_is_duplicate = duplicate
+
+    # ------------------------------------------------------------------
+    # 部分キャプチャ
+    # ------------------------------------------------------------------
+    def plan_capture_boxes(self):
+        """
+        次に取得する部分矩形（認識範囲内の相対座標・元解像度）を返します。
+        全体を取得すべき場合（定期スキャン、ヒント無し、クイックタイマー待機中など）は None。
+        キャプチャ専用スレッドから呼ばれる。
+        """
+        if not MULTI_REGION_CAPTURE:
+            return None
+        if time.time() - self._last_full_frame_time >= MULTI_REGION_FULL_SCAN_SEC:
+            return None
+        # クイックタイマーは登録位置の周辺を探すため、全体が必要
+        qt_mgr = getattr(self.core, "_quick_timer_manager", None)
+        if qt_mgr and qt_mgr.has_any():
+            return None
+
+        scale = self.core.effective_capture_scale or 1.0
+        with self._hint_lock:
+            basis = self._hint_basis
+            if basis is None or basis[:2] != (self.core.recognition_area, scale):
+                return None
+            now = time.time()
+            windows = [w for w, t in self._search_hints.values() if now - t <= MULTI_REGION_HINT_TTL_SEC]
+        if not windows:
+            return None
+
+        frame_h, frame_w = basis[2]
+        if self.core.app_config.get('screen_stability_check', {}).get('enabled', True):
+            # 安定性チェックの固定領域も取得しておく（黒のままだと判定が変わるため）
+            windows.extend(rect for _key, rect in self._get_stability_regions(basis[2]))
+
+        boxes = merge_rects(
+            [(int(x1 / scale), int(y1 / scale), int(np.ceil(x2 / scale)), int(np.ceil(y2 / scale))) for x1, y1, x2, y2 in windows],
+            MULTI_REGION_MERGE_GAP,
+        )
+        full_w, full_h = frame_w / scale, frame_h / scale
+        covered = sum((b[2] - b[0]) * (b[3] - b[1]) for b in boxes)
+        if covered > full_w * full_h * MULTI_REGION_MAX_COVERAGE:
+            return None
+        return boxes
+
+    def _windows_for_boxes(self, boxes):
+        """取得矩形に完全に含まれる探索窓だけを {path: 窓(縮小後座標)} で返します。"""
+        scale = self.core.effective_capture_scale or 1.0
+        scaled = [(b[0] * scale, b[1] * scale, b[2] * scale, b[3] * scale) for b in boxes]
+        with self._hint_lock:
+            hints = dict(self._search_hints)
+        windows = {}
+        for path, (win, _t) in hints.items():
+            for bx1, by1, bx2, by2 in scaled:
+                if win[0] >= bx1 - 1 and win[1] >= by1 - 1 and win[2] <= bx2 + 1 and win[3] <= by2 + 1:
+                    windows[path] = win
+                    break
+        return windows
+
+    def _record_search_hint(self, match, frame_shape, current_time):
+        """マッチ位置（とOCR読み取り範囲）にマージンを加えた探索窓を記録します。"""
+        x1, y1, x2, y2 = match['rect']
+        ocr_settings = match.get('settings', {}).get('ocr_settings')
+        if isinstance(ocr_settings, dict) and ocr_settings.get('enabled', False) and ocr_settings.get('roi'):
+            # OCRは同じフレームの ROI を読むため、その範囲も取得対象に含める
+            # （ocr_runtime と同じ計算: 縮小後座標では検出スケールを掛ければよい）
+            rx, ry, rw, rh = ocr_settings['roi']
+            item_settings = match['settings']
+            off_x = off_y = 0
+            if item_settings.get('roi_enabled', False):
+                rec_roi = item_settings.get('roi_rect_variable') if item_settings.get('roi_mode', 'fixed') == 'variable' else item_settings.get('roi_rect')
+                if rec_roi:
+                    off_x, off_y = max(0, rec_roi[0]), max(0, rec_roi[1])
+            s = match.get('scale', 1.0)
+            ox1, oy1 = x1 + (rx - off_x) * s, y1 + (ry - off_y) * s
+            x1, y1 = min(x1, ox1), min(y1, oy1)
+            x2, y2 = max(x2, ox1 + rw * s), max(y2, oy1 + rh * s)
+
+        h, w = frame_shape[:2]
+        m = MULTI_REGION_MARGIN
+        window = (max(0, int(x1) - m), max(0, int(y1) - m), min(w, int(np.ceil(x2)) + m), min(h, int(np.ceil(y2)) + m))
+        if window[2] <= window[0] or window[3] <= window[1]:
+            return
+        with self._hint_lock:
+            self._search_hints[match['path']] = (window, current_time)
+
+    def _update_hint_basis(self, frame_shape):
+        basis = (self.core.recognition_area, self.core.effective_capture_scale or 1.0, tuple(frame_shape[:2]))
+        with self._hint_lock:
+            if basis != self._hint_basis:
+                # 認識範囲・縮小率が変わったら位置情報は使えない
+                self._search_hints.clear()
+                self._hint_basis = basis
+                self._match_memo = {}
+                self._memo_thumbnail = None
+                self._memo_digest = None
 
     def monitoring_loop(self):
         last_match_time_map = {}
@@ -111,7 +435,14 @@ class MonitoringProcessor:
                     if isinstance(current_state, (IdleState, CountdownState, PriorityState)):
                         pre_matches = self._find_matches_for_eco_check(screen_data, current_state)
 
+                if pre_matches:
+                    self.ocr_scheduler.touch((m['path'] for m in pre_matches), current_time)
+
                 current_state.handle(current_time, screen_data, last_match_time_map, pre_matches=pre_matches)
+
+                # このフレームで発生したOCR要求を投入し、見失ったマッチのOCRを回収
+                self.ocr_scheduler.flush()
+                self.ocr_scheduler.sweep(current_time)
            
             except Exception as e:
                 if isinstance(e, AttributeError) and "'NoneType' object has no attribute 'handle'" in str(e):
@@ -157,6 +488,7 @@ class MonitoringProcessor:
                            (current_time - self.core.last_successful_click_time > self.core.ECO_MODE_DELAY))
         
         self.core.is_eco_cooldown_active = is_eco_eligible
+        self._update_producer_rate(current_state)
 
         if isinstance(current_state, CountdownState): time.sleep(1.0)
         elif self.core.is_eco_cooldown_active:
@@ -174,7 +506,41 @@ class MonitoringProcessor:
         return True, fps_last_time, frame_counter
 
     def _capture_and_process_image(self, current_state):
-        screen_bgr = self.core.capture_manager.capture_frame(region=self.core.recognition_area)
+        self._track_window_geometry()
+        # XComposite によるウィンドウ単位キャプチャ用（xshm 以外では保持のみ）
+        self.core.capture_manager.set_target_window(self.core.target_hwnd)
+        capture_start = time.perf_counter() if TRACE.capture else 0.0
+        # ★★★ (改善) キャプチャ専用スレッドが動いていれば、未処理の最新フレームを受け取る ★★★
+        frame = None
+        boxes = None
+        producer = self.core.capture_manager.producer
+        if producer is not None and producer.is_running:
+            frame = producer.wait_for_frame(
+                self._last_frame_seq, timeout=max(0.1, 3.0 / producer.target_fps), region=self.core.recognition_area,
+                min_start=self._last_click_time
+            )
+        if frame is not None:
+            self._last_frame_seq = frame.seq
+            screen_bgr = frame.image
+            boxes = frame.boxes
+            frame_info = frame.info
+        else:
+            boxes = self.plan_capture_boxes()
+            screen_bgr, frame_info = self.core.capture_manager.capture_frame_with_info(self.core.recognition_area, boxes)
+        if TRACE.capture:
+            trace(
+                "capture", "frame",
+                method=getattr(self.core.capture_manager, 'current_method', None),
+                ok=screen_bgr is not None,
+                ms=round((time.perf_counter() - capture_start) * 1000.0, 3),
+                shape=screen_bgr.shape[:2] if screen_bgr is not None else None,
+                region=self.core.recognition_area,
+                boxes=boxes,
+                grab_ms=round(frame_info.grab_ms, 3) if frame_info is not None else None,
+                duplicate=frame_info.duplicate if frame_info is not None else None,
+                seq=frame.seq if frame is not None else None,
+                age_ms=round((time.monotonic() - frame.timestamp) * 1000.0, 3) if frame is not None else None,
+            )
         if screen_bgr is None:
             self.core.consecutive_capture_failures += 1
             self.core._log("log_capture_failed")
@@ -186,22 +552,60 @@ class MonitoringProcessor:
             return None, None
 
         self.core.consecutive_capture_failures = 0
-        self.core.latest_high_res_frame = screen_bgr.copy() 
-        
-        if self.core.effective_capture_scale != 1.0:
-            screen_bgr = cv2.resize(screen_bgr, None, 
-                                    fx=self.core.effective_capture_scale, 
-                                    fy=self.core.effective_capture_scale, 
-                                    interpolation=cv2.INTER_AREA)
-
-        self.core.latest_frame_for_hash = screen_bgr.copy()
-        screen_gray = cv2.cvtColor(screen_bgr, cv2.COLOR_BGR2GRAY)
+        # ★★★ (改善) キャプチャ画像は毎回新しい配列で以降は読み取りのみのため、コピーせずに保持する ★★★
+        # 部分キャプチャ（RegionParts）は OCR で必要になった時だけ貼り合わせる（_high_res_frame）
+        self.core.latest_high_res_frame = screen_bgr
+        partial = isinstance(screen_bgr, RegionParts)
 
+        # 縮小とグレースケール化は必要なものだけを最小のパス数で作る（グレー照合時は縮小BGRを作らない）
+        use_gs = self.core.app_config.get('grayscale_matching', False)
         screen_bgr_umat, screen_gray_umat = None, None
-        if OPENCL_AVAILABLE and cv2.ocl.useOpenCL():
+        device_frame = False
+        if partial:
+            # 取得した矩形の分だけ縮小・変換する（照合は _frame_windows の窓ごとに CPU で行うため転送もしない）
+            scale = self.core.effective_capture_scale or 1.0
+            with self._hint_lock:
+                basis = self._hint_basis
+            out_shape = basis[2] if basis is not None and basis[:2] == (self.core.recognition_area, scale) else None
+            screen_bgr, screen_gray = preprocess_parts(screen_bgr.parts, screen_bgr.size, scale, out_shape, need_bgr=not use_gs)
+        elif OPENCL_AVAILABLE and OPENCL_DEVICE_PREPROCESS and cv2.ocl.useOpenCL():
+            # ★★★ (改善) 転送は元画像の1回のみ。縮小・変換はデバイス上で行い、ホストへはグレー画像だけを読み戻す ★★★
             try:
-                screen_bgr_umat = cv2.UMat(screen_bgr)
-                screen_gray_umat = cv2.UMat(screen_gray)
+                screen_bgr_umat, screen_gray_umat, screen_gray = preprocess_frame_umat(
+                    screen_bgr, self.core.effective_capture_scale, need_bgr=not use_gs
+                )
+                screen_bgr = None  # ホスト側のBGRは必要になった時だけ読み戻す（_host_bgr）
+                device_frame = True
+            except cv2.error as e:
+                self.logger.log("log_umat_convert_failed", str(e))
+                screen_bgr_umat, screen_gray_umat = None, None
+        if not device_frame and not partial:
+            screen_bgr, screen_gray = preprocess_frame(screen_bgr, self.core.effective_capture_scale, need_bgr=not use_gs)
+
+        # 部分キャプチャのフレームでは、取得済みの窓に収まるテンプレートだけを照合する
+        self._update_hint_basis(screen_gray.shape)
+        if boxes:
+            self._frame_windows = self._windows_for_boxes(boxes)
+        else:
+            self._frame_windows = None
+            self._last_full_frame_time = time.time()
+        self._update_duplicate_state(frame_info, boxes)
+        self._frame_time = frame_info.timestamp if frame_info is not None else time.monotonic()
+
+        self.core.latest_frame_for_hash = screen_bgr
+        # 画面安定性チェックはこのグレースケール画像をそのまま使う（毎フレーム新規配列のためコピー不要）
+        self.core.latest_gray_for_hash = screen_gray
+        if self.core.app_config.get('screen_stability_check', {}).get('enabled', True):
+            # 処理したフレームごとに記録する（クリック時だけ記録すると、対象が変わるたびに履歴待ちになる）
+            self.core.screen_stability_frames.append((screen_gray, {}))
+
+        if not device_frame and not partial and OPENCL_AVAILABLE and cv2.ocl.useOpenCL():
+            try:
+                # 照合に使う方だけを転送する
+                if use_gs:
+                    screen_gray_umat = cv2.UMat(screen_gray)
+                else:
+                    screen_bgr_umat = cv2.UMat(screen_bgr)
             except Exception as e:
                 self.logger.log("log_umat_convert_failed", str(e))
 
@@ -219,44 +623,193 @@ class MonitoringProcessor:
         return screen_data, None
 
     def _find_matches_for_eco_check(self, screen_data, current_state):
+        # ★★★ (改善) キャッシュ構築時に作成済みのビューを参照し、毎フレームの辞書生成をなくす ★★★
+        views = self.core.template_cache_views
+
         # PriorityStateの場合は、フォルダ内の画像のみを検索
         if isinstance(current_state, PriorityState):
-            from pathlib import Path
-            folder_path = current_state.folder_path
-            def filter_by_folder(cache):
-                return {p: d for p, d in cache.items() if d.get('folder_path') == folder_path}
-            
-            priority_normal_cache = filter_by_folder(self.core.normal_template_cache)
-            priority_backup_cache = filter_by_folder(self.core.backup_template_cache)
-            
-            normal_matches = self._find_best_match(*screen_data, priority_normal_cache)
-            backup_matches = self._find_best_match(*screen_data, priority_backup_cache)
+            normal_matches = self._find_best_match(*screen_data, current_state.priority_normal_cache)
+            backup_matches = self._find_best_match(*screen_data, current_state.priority_backup_cache)
             if backup_matches:
                 normal_matches.extend(backup_matches)
             
             return normal_matches
         
-        # IdleState/CountdownStateの場合は、通常のフィルタリング
-        def filter_cache_for_eco(cache): return {p: d for p, d in cache.items() if d.get('folder_mode') not in ['excluded', 'priority_timer']}
-        active_normal_cache = filter_cache_for_eco(self.core.normal_template_cache)
-        normal_matches = self._find_best_match(*screen_data, active_normal_cache)
+        # IdleState/CountdownStateの場合は、除外・優先タイマー以外を検索
+        normal_matches = self._find_best_match(*screen_data, views.get('active_normal', {}))
         if isinstance(current_state, IdleState):
-            active_backup_cache = filter_cache_for_eco(self.core.backup_template_cache)
-            backup_trigger_matches = self._find_best_match(*screen_data, active_backup_cache)
+            backup_trigger_matches = self._find_best_match(*screen_data, views.get('active_backup', {}))
             if backup_trigger_matches: normal_matches.extend(backup_trigger_matches)
         return normal_matches
 
-    def check_screen_stability(self) -> bool:
-        if not hasattr(self.core, 'latest_frame_for_hash') or self.core.latest_frame_for_hash is None: return False
-        h, w, _ = self.core.latest_frame_for_hash.shape
-        if h < 64 or w < 64: self.core._log("log_stability_check_skip_size", force=True); return True
-        roi = self.core.latest_frame_for_hash[0:64, 0:64]; current_hash = calculate_phash(roi)
-        if current_hash is None: return False
-        self.core.screen_stability_hashes.append(current_hash)
-        if len(self.core.screen_stability_hashes) < self.core.screen_stability_hashes.maxlen: self.core._log("log_stability_check_history_low", len(self.core.screen_stability_hashes), self.core.screen_stability_hashes.maxlen, force=True); return False
-        threshold = self.core.app_config.get('screen_stability_check', {}).get('threshold', 8); hash_diff = self.core.screen_stability_hashes[-1] - self.core.screen_stability_hashes[0]
-        self.core._log("log_stability_check_debug", str(self.core.screen_stability_hashes[-1]), str(self.core.screen_stability_hashes[0]), hash_diff, threshold, force=True)
-        return hash_diff <= threshold
+    STABILITY_REGION_SIZE = 64
+    DEFAULT_STABILITY_REGIONS = ("top_left", "click_target")
+
+    def _get_stability_regions(self, frame_shape, target_match=None):
+        """
+        安定性チェックの対象領域 [(key, (x1, y1, x2, y2)), ...] を返します（座標は縮小後フレーム基準）。
+        設定 screen_stability_check.regions で指定:
+          "top_left" / "center" : 64x64 の固定領域
+          "click_target"        : これからクリックするマッチ領域（過去のフレームでは同じアイテムの検出位置と比べる）
+          [x1, y1, x2, y2]      : 認識範囲内の任意矩形（元解像度の座標）
+        """
+        h, w = frame_shape[:2]
+        size = self.STABILITY_REGION_SIZE
+        conf = self.core.app_config.get('screen_stability_check', {})
+        specs = conf.get('regions') or self.DEFAULT_STABILITY_REGIONS
+        capture_scale = self.core.effective_capture_scale or 1.0
+
+        regions = []
+        for spec in specs:
+            rect = None
+            key = spec
+            if spec == "top_left":
+                rect = (0, 0, size, size)
+            elif spec == "center":
+                cx, cy = w // 2, h // 2
+                rect = (cx - size // 2, cy - size // 2, cx + size // 2, cy + size // 2)
+            elif spec == "click_target":
+                if target_match and target_match.get('rect'):
+                    rect = tuple(int(v) for v in target_match['rect'])
+                    # 位置はキーに含めない（移動・特徴点照合で矩形が毎フレーム変わっても履歴を使えるように）
+                    key = ("click_target", target_match.get('path'))
+            elif isinstance(spec, (list, tuple)) and len(spec) == 4:
+                rect = tuple(int(round(v * capture_scale)) for v in spec)
+                key = ("rect",) + tuple(spec)
+            if rect is None:
+                continue
+            x1, y1 = max(0, rect[0]), max(0, rect[1])
+            x2, y2 = min(w, rect[2]), min(h, rect[3])
+            # DCTハッシュが意味を持たない極小領域は除外
+            if x2 - x1 < 8 or y2 - y1 < 8:
+                continue
+            regions.append((key, (x1, y1, x2, y2)))
+        return regions
+
+    def _record_stability_rects(self, s_gray, found):
+        """このフレームで検出したアイテムの矩形を安定性チェックの履歴に記録します。"""
+        history = self.core.screen_stability_frames
+        if not history or history[-1][0] is not s_gray:
+            return
+        rects = history[-1][1]
+        for path, results in found.items():
+            best = max(results, key=lambda r: r[0]['confidence'])[0]
+            if best.get('rect'):
+                rects[path] = tuple(int(v) for v in best['rect'])
+
+    def check_screen_stability(self, target_match=None) -> bool:
+        gray = getattr(self.core, 'latest_gray_for_hash', None)
+        if gray is None: return False
+        h, w = gray.shape[:2]
+        if h < self.STABILITY_REGION_SIZE or w < self.STABILITY_REGION_SIZE: self.core._log("log_stability_check_skip_size", force=True); return True
+
+        regions = self._get_stability_regions(gray.shape, target_match)
+        if not regions: self.core._log("log_stability_check_skip_size", force=True); return True
+
+        # 履歴は処理したフレームごとに記録済み。最も古いフレームの同じ領域と比べる
+        history = self.core.screen_stability_frames
+        if len(history) < history.maxlen: self.core._log("log_stability_check_history_low", len(history), history.maxlen, force=True); return False
+        oldest_gray, oldest_rects = history[0]
+        if oldest_gray.shape != gray.shape:
+            # 認識範囲・縮小率が変わった直後は比べられない
+            self.core._log("log_stability_check_history_low", 0, history.maxlen, force=True)
+            return False
+
+        threshold = self.core.app_config.get('screen_stability_check', {}).get('threshold', 8)
+        worst = None
+        for key, (x1, y1, x2, y2) in regions:
+            ox1, oy1, ox2, oy2 = x1, y1, x2, y2
+            if isinstance(key, tuple) and key[0] == "click_target" and key[1] in oldest_rects:
+                # 対象が動いていても、その時点の対象自体の見た目と比べる
+                rx1, ry1, rx2, ry2 = oldest_rects[key[1]]
+                ox1, oy1, ox2, oy2 = max(0, rx1), max(0, ry1), min(w, rx2), min(h, ry2)
+            current_hash = calculate_dct_hash(gray[y1:y2, x1:x2])
+            oldest_hash = calculate_dct_hash(oldest_gray[oy1:oy2, ox1:ox2])
+            if current_hash is None or oldest_hash is None: return False
+            diff = hash_distance(current_hash, oldest_hash)
+            if worst is None or diff > worst[0]:
+                worst = (diff, current_hash, oldest_hash)
+
+        worst_diff, current_hash, oldest_hash = worst
+        self.core._log("log_stability_check_debug", f"{current_hash:016x}", f"{oldest_hash:016x}", worst_diff, threshold, force=True)
+        return worst_diff <= threshold
+
+    def _high_res_frame(self):
+        """OCR 用の元解像度フレーム。部分キャプチャの場合はここで初めて貼り合わせる（同じフレームでは1回だけ）。"""
+        frame = getattr(self.core, 'latest_high_res_frame', None)
+        if isinstance(frame, RegionParts):
+            frame = frame.to_canvas()
+            self.core.latest_high_res_frame = frame
+        return frame
+
+    def _host_bgr(self, bgr_umat):
+        """デバイス上の縮小後BGRをホストに読み戻します（同じフレームでは1回だけ）。"""
+        if bgr_umat is None:
+            return None
+        cached = self._host_bgr_cache
+        if cached is not None and cached[0] is bgr_umat:
+            return cached[1]
+        host = bgr_umat.get()
+        self._host_bgr_cache = (bgr_umat, host)
+        return host
+
+    def _frame_features(self, gray):
+        """フレーム全体の特徴点を返します（同じフレームでは1回だけ計算し、全アイテムで共有）。"""
+        cached = self._screen_features_cache
+        if cached is not None and cached[0] is gray:
+            return cached[1]
+        features = compute_screen_features(gray)
+        self._screen_features_cache = (gray, features)
+        return features
+
+    def _match_predicted_window(self, path, data, screen_image, s_shape, use_gs, use_cl, strict_color):
+        """
+        追跡中のアイテムを予測位置の周辺窓だけで照合します。
+        見つかれば (結果, テンプレート番号, data)、外れたら None（呼び出し側で全体を探索する）。
+        """
+        window = self.motion_tracks.search_window(path, self._frame_time, s_shape)
+        if window is None:
+            return None
+        x1, y1, x2, y2 = window
+        if isinstance(screen_image, cv2.UMat):
+            crop = cv2.UMat(screen_image, (y1, y2), (x1, x2))
+        else:
+            crop = screen_image[y1:y2, x1:x2]
+        crop_shape = (y2 - y1, x2 - x1)
+        crop_channels = cv2.split(crop) if strict_color else None
+
+        templates = data['scaled_templates']
+        threshold = data['settings'].get('threshold', 0.8)
+        last_idx = data.get('last_success_index', -1)
+        indices = list(range(len(templates)))
+        if 0 <= last_idx < len(templates): indices.insert(0, indices.pop(last_idx))
+        for i in indices:
+            t = templates[i]
+            template_image = t['gray'] if use_gs else t['image']
+            if use_cl:
+                t_umat = t.get('gray_umat' if use_gs else 'image_umat')
+                template_image = t_umat if t_umat else template_image
+            task_data = {'path': path, 'settings': data['settings'], 'template': template_image, 'scale': t['scale']}
+            result = _match_template_task(crop, template_image, task_data, crop_shape, t['shape'], strict_color, crop_channels)
+            if result and result['confidence'] >= threshold:
+                _offset_match(result, (x1, y1))
+                data['last_success_index'] = i
+                self.motion_stats['predicted_hits'] += 1
+                return result, i, data
+        self.motion_stats['predicted_misses'] += 1
+        return None
+
+    def _update_motion_tracks(self, attempted, matched_results):
+        best = {}
+        for match_result, _idx, _data in matched_results:
+            path = match_result['path']
+            if path in attempted and (path not in best or match_result['confidence'] > best[path]['confidence']):
+                best[path] = match_result
+        for path in attempted:
+            if path in best:
+                self.motion_tracks.update(path, best[path]['rect'], self._frame_time)
+            else:
+                self.motion_tracks.miss(path)
 
     def _find_best_match(self, s_bgr, s_gray, s_bgr_umat, s_gray_umat, cache):
         matched_results = [] 
@@ -269,14 +822,32 @@ class MonitoringProcessor:
             use_gs = self.core.app_config.get('grayscale_matching', False)
             strict_color = self.core.app_config.get('strict_color_matching', False)
             effective_strict_color = strict_color and not use_gs
-            if effective_strict_color: use_cl = False
+            windows = self._frame_windows
+            # 部分キャプチャ時は窓ごとに切り出して照合する（ndarray のスライスで行う）
+            if windows is not None: use_cl = False
+
+            memo_key = (use_gs, effective_strict_color)
+            if memo_key != self._match_memo_key:
+                self._match_memo = {}
+                self._match_memo_key = memo_key
+            memo = self._match_memo
+            reuse = self._frame_is_duplicate
+            attempted = {}
+            tracks = self.motion_tracks
 
             screen_image = s_gray if use_gs else s_bgr
             if use_cl:
                 screen_umat = s_gray_umat if use_gs else s_bgr_umat
                 screen_image = screen_umat if screen_umat is not None else screen_image
+            if screen_image is None:
+                # デバイス上で前処理したフレームを CPU で照合する場合（部分キャプチャ等）
+                screen_image = self._host_bgr(s_bgr_umat)
+                if screen_image is None: return []
 
-            s_shape = screen_image.get().shape[:2] if use_cl and isinstance(screen_image, cv2.UMat) else screen_image.shape[:2]
+            # 縮小後のフレームサイズはホスト側のグレー画像と同じ（UMat を読み戻して調べない）
+            s_shape = s_gray.shape[:2]
+            # 色調厳格モードのチャンネル分離はフレームごとに1回（UMat ならデバイス上のまま）
+            screen_channels = cv2.split(screen_image) if effective_strict_color and windows is None else None
 
             for path, data in cache.items():
                 folder_path = data.get('folder_path')
@@ -286,6 +857,56 @@ class MonitoringProcessor:
                 templates_to_check = data['scaled_templates']
                 num_templates = len(templates_to_check)
                 if num_templates == 0: continue
+                features = data.get('features')
+
+                # 同一フレームで照合済みなら結果をそのまま使う
+                if reuse:
+                    cached = memo.get(path)
+                    if cached is not None and cached[0] is data:
+                        for cached_result, idx in cached[1]:
+                            matched_results.append((dict(cached_result), idx, data))
+                        self.match_skip_stats['reused'] += 1
+                        continue
+
+                # 移動ターゲット: 予測窓で見つかれば全体の照合を省略する
+                if tracks is not None and windows is None and features is None:
+                    hit = self._match_predicted_window(path, data, screen_image, s_shape, use_gs, use_cl, effective_strict_color)
+                    if hit is not None:
+                        attempted[path] = data
+                        self.match_skip_stats['matched'] += 1
+                        matched_results.append(hit)
+                        continue
+
+                offset = None
+                path_image, path_shape, path_channels = screen_image, s_shape, screen_channels
+                if windows is not None:
+                    window = windows.get(path)
+                    if window is None: continue  # このフレームでは取得していない
+                    wx1, wy1, wx2, wy2 = window
+                    path_image = screen_image[wy1:wy2, wx1:wx2]
+                    path_shape = path_image.shape[:2]
+                    path_channels = cv2.split(path_image) if effective_strict_color else None
+                    offset = (wx1, wy1)
+                attempted[path] = data
+                self.match_skip_stats['matched'] += 1
+
+                if features is not None:
+                    # 特徴点照合: 倍率ごとの照合の代わりに、記述子の照合とホモグラフィ推定を1回だけ行う
+                    if offset is None:
+                        gray_image, screen_features = s_gray, self._frame_features(s_gray)
+                    else:
+                        gray_image = s_gray[wy1:wy2, wx1:wx2]
+                        screen_features = compute_screen_features(gray_image)
+                    task_data = {'path': path, 'settings': data['settings']}
+                    if self.core.thread_pool:
+                        future = self.core.thread_pool.submit(match_features, gray_image, screen_features, features, task_data)
+                        futures.append((future, 0, data, offset))
+                    else:
+                        match_result = match_features(gray_image, screen_features, features, task_data)
+                        if match_result and offset: _offset_match(match_result, offset)
+                        if match_result:
+                            matched_results.append((match_result, 0, data))
+                    continue
 
                 user_threshold = data['settings'].get('threshold', 0.8)
                 last_idx = data.get('last_success_index', -1)
@@ -304,10 +925,11 @@ class MonitoringProcessor:
                         t_shape = t['shape']
 
                         if self.core.thread_pool and not use_cl:
-                            future = self.core.thread_pool.submit(_match_template_task, screen_image, template_image, task_data, s_shape, t_shape, effective_strict_color)
-                            futures.append((future, i, data)) 
+                            future = self.core.thread_pool.submit(_match_template_task, path_image, template_image, task_data, path_shape, t_shape, effective_strict_color, path_channels)
+                            futures.append((future, i, data, offset)) 
                         else:
-                            match_result = _match_template_task(screen_image, template_image, task_data, s_shape, t_shape, effective_strict_color)
+                            match_result = _match_template_task(path_image, template_image, task_data, path_shape, t_shape, effective_strict_color, path_channels)
+                            if match_result and offset: _offset_match(match_result, offset)
                             if match_result and match_result['confidence'] >= user_threshold:
                                 data['last_success_index'] = i
                                 matched_results.append((match_result, i, data))
@@ -316,9 +938,10 @@ class MonitoringProcessor:
                          self.logger.log("Error during template processing for %s: %s", Path(path).name, str(e))
 
         if futures:
-            for f, idx, data_ref in futures:
+            for f, idx, data_ref, offset in futures:
                 try:
                     match_result = f.result()
+                    if match_result and offset: _offset_match(match_result, offset)
                     if match_result:
                         th = data_ref['settings'].get('threshold', 0.8)
                         if match_result['confidence'] >= th:
@@ -326,10 +949,109 @@ class MonitoringProcessor:
                              matched_results.append((match_result, idx, data_ref))
                 except Exception: pass
 
+        if self.motion_tracks is not None and attempted and not self._frame_is_duplicate:
+            self._update_motion_tracks(attempted, matched_results)
+
+        if attempted:
+            found = {}
+            for match_result, idx, data_ref in matched_results:
+                if match_result['path'] in attempted:
+                    found.setdefault(match_result['path'], []).append((dict(match_result), idx))
+            for path, data in attempted.items():
+                memo[path] = (data, found.get(path, []))
+            self._record_stability_rects(s_gray, found)
+
         if not matched_results: return []
         matched_results.sort(key=lambda x: x[0]['confidence'], reverse=True)
+        if MULTI_REGION_CAPTURE:
+            for match_result, _idx, _data in matched_results:
+                self._record_search_hint(match_result, s_gray.shape, current_time)
+        if TRACE.match:
+            best = matched_results[0][0]
+            trace(
+                "match", "matches",
+                count=len(matched_results),
+                best=Path(best['path']).name,
+                conf=round(float(best['confidence']), 4),
+                scale=best.get('scale'),
+                rect=best.get('rect'),
+                opencl=use_cl,
+            )
         return [item[0] for item in matched_results]
 
+    QUICK_TIMER_SEARCH_MARGIN = 96  # 登録位置からの探索マージン（元解像度px）
+
+    def match_quick_timers(self, entries, screen_gray, full_frame_fallback=False):
+        """
+        照合期間に入ったクイックタイマーをまとめて照合します。
+        監視ループが作成済みのグレースケール画像（縮小後）を共有し、
+        登録位置の周辺ウィンドウのみを探索します（登録位置が不明な旧エントリは全体を探索）。
+        戻り値: {slot: (max_val, (x, y))}  (x, y) は縮小後フレーム座標でのテンプレート左上
+        """
+        results = {}
+        if screen_gray is None or screen_gray.size == 0 or not entries:
+            return results
+        qt_mgr = self.core._quick_timer_manager
+        scale = self.core.effective_capture_scale or 1.0
+        s_h, s_w = screen_gray.shape[:2]
+        margin = int(self.QUICK_TIMER_SEARCH_MARGIN * scale)
+
+        for e in entries:
+            template = qt_mgr.get_scaled_template(e, scale)
+            if template is None:
+                continue
+            t_h, t_w = template.shape[:2]
+            if t_h > s_h or t_w > s_w:
+                continue
+
+            windows = []
+            origin = e.get("template_origin")
+            if origin is not None:
+                ox, oy = int(origin[0] * scale), int(origin[1] * scale)
+                x1, y1 = max(0, ox - margin), max(0, oy - margin)
+                x2, y2 = min(s_w, ox + t_w + margin), min(s_h, oy + t_h + margin)
+                if x2 - x1 >= t_w and y2 - y1 >= t_h:
+                    windows.append((x1, y1, x2, y2))
+            if not windows or full_frame_fallback:
+                windows.append((0, 0, s_w, s_h))
+
+            best = None
+            for (x1, y1, x2, y2) in windows:
+                try:
+                    res = cv2.matchTemplate(screen_gray[y1:y2, x1:x2], template, cv2.TM_CCOEFF_NORMED)
+                    _minv, maxv, _minl, maxl = cv2.minMaxLoc(res)
+                except cv2.error:
+                    continue
+                if best is None or maxv > best[0]:
+                    best = (maxv, (maxl[0] + x1, maxl[1] + y1))
+                # 周辺ウィンドウで見つかれば全体探索は不要
+                if best[0] >= 0.8:
+                    break
+            if best is not None:
+                results[e.get("slot")] = best
+        return results
+
+    def build_quick_timer_match(self, entry, loc):
+        """クイックタイマーの照合結果を ActionManager.execute_click 用のマッチ情報に変換します。"""
+        scale = self.core.effective_capture_scale or 1.0
+        template = self.core._quick_timer_manager.get_scaled_template(entry, scale)
+        t_h, t_w = template.shape[:2]
+        off_x, off_y = entry.get("click_offset", (0, 0))
+        slot = entry.get("slot", "?")
+        return {
+            'path': f"QuickTimer_{slot}",
+            'confidence': 0.0,
+            'scale': scale,
+            # rect は縮小後フレーム座標、click_position はテンプレート内の元解像度オフセット
+            'rect': (loc[0], loc[1], loc[0] + t_w, loc[1] + t_h),
+            'settings': {
+                'point_click': True,
+                'click_position': (off_x, off_y),
+                'roi_enabled': False,
+                'right_click': entry.get("right_click", False)
+            }
+        }
+
     def _start_ocr_task_if_needed(self, path, match, current_time):
         settings = match.get('settings', {})
         ocr_settings = settings.get('ocr_settings')
@@ -337,11 +1059,11 @@ class MonitoringProcessor:
         if not OCR_AVAILABLE or not ocr_settings or not ocr_settings.get('enabled', False):
             return
         
-        # 既にOCRタスクが実行中ならスキップ
-        if path in self.core.ocr_futures:
+        # 実行中、または新しい完了済み結果があれば再利用（状態遷移をまたいでも重複投入しない）
+        if self.ocr_scheduler.can_reuse(path, current_time):
             return
         
-        screen_img = getattr(self.core, 'latest_high_res_frame', None)
+        screen_img = self._high_res_frame()
         if screen_img is None:
             return
         
@@ -359,78 +1081,34 @@ class MonitoringProcessor:
         parent_x = int(match_rect[0] / capture_scale)
         parent_y = int(round(match_rect[1] / capture_scale))
         
-        # ★★★ 原因特定のため、詳細なデバッグ情報を追加 ★★★
-        capture_method = getattr(self.core.capture_manager, 'current_method', 'mss')
-        rec_area = self.core.recognition_area
-        screen_img_h, screen_img_w = screen_img.shape[:2] if screen_img is not None else (0, 0)
-        
-        if DEBUG_OCR_COORDS:
-            try:
-                # recognition_areaの期待サイズと実際の画像サイズを比較
-                if rec_area:
-                    expected_w = rec_area[2] - rec_area[0]
-                    expected_h = rec_area[3] - rec_area[1]
-                    size_match = (expected_w == screen_img_w and expected_h == screen_img_h)
-                else:
-                    expected_w = expected_h = 0
-                    size_match = False
-                
-                # ★★★ 原因特定: 座標計算の詳細を出力（端数切り捨てによる誤差を確認） ★★★
-                # ★★★ 修正: 実際のウィンドウスケールを考慮してparent_posを計算 ★★★
-                parent_x_raw_old = match_rect[0] / capture_scale
-                parent_y_raw_old = match_rect[1] / capture_scale
-                parent_x_raw = match_rect[0] / capture_scale
-                parent_y_raw = match_rect[1] / capture_scale
-                parent_x_int = int(parent_x_raw)
-                parent_y_int = int(parent_y_raw)
-                parent_x_round = int(round(parent_x_raw))
-                parent_y_round = int(round(parent_y_raw))
-                
-                # ★★★ 追加: ウィンドウスケールの情報を取得 ★★★
-                window_scale = getattr(self.core, 'current_window_scale', None)
-                actual_window_scale = getattr(self.core, 'actual_window_scale', None)
-
-                # ★★★ 追加: match_rectの座標系を確認 ★★★
-                # match_rectはリサイズ後の画像（effective_capture_scaleでリサイズ）内での座標
-                # screen_imgはリサイズ前の画像（latest_high_res_frame）
-                # ★★★ 修正: parent_pos = match_rect / detected_scale でリサイズ前の画像内での座標に変換（ウィンドウスケールの補正を考慮） ★★★
-                
-                print(
-                    f"[OCR DEBUG CAPTURE] method={capture_method} "
-                    f"recognition_area={rec_area} "
-                    f"expected_size={expected_w}x{expected_h} "
-                    f"captured_img={screen_img_w}x{screen_img_h} "
-                    f"size_match={size_match} "
-                    f"match_rect={match_rect} "
-                    f"match_rect_coords=({match_rect[0]},{match_rect[1]},{match_rect[2]},{match_rect[3]}) "
-                    f"detected_scale={detected_scale:.3f} "
-                    f"capture_scale={capture_scale:.3f} "
-                    f"real_scale={real_scale:.3f} "
-                    f"window_scale={window_scale} "
-                    f"actual_window_scale={actual_window_scale} "
-                    f"parent_pos=({parent_x},{parent_y}) "
-                    f"parent_calc_raw_old=({parent_x_raw_old:.3f},{parent_y_raw_old:.3f}) "
-                    f"parent_calc_raw=({parent_x_raw:.3f},{parent_y_raw:.3f}) "
-                    f"parent_calc_int=({parent_x_int},{parent_y_int}) "
-                    f"parent_calc_round=({parent_x_round},{parent_y_round}) "
-                    f"parent_calc_formula_old=match_rect[0]/{capture_scale:.3f}={parent_x_raw_old:.3f} "
-                    f"parent_calc_formula=match_rect[0]/{capture_scale:.3f}={parent_x_raw:.3f}"
-                )
-            except Exception:
-                pass
-        
+        if TRACE.ocr:
+            # 座標系の確認用: match_rect は縮小後、parent_pos は元解像度（latest_high_res_frame）での座標
+            screen_img_h, screen_img_w = screen_img.shape[:2]
+            rec_area = self.core.recognition_area
+            trace(
+                "ocr", "ocr_start",
+                path=Path(path).name,
+                method=getattr(self.core.capture_manager, 'current_method', 'mss'),
+                recognition_area=rec_area,
+                expected_size=((rec_area[2] - rec_area[0]), (rec_area[3] - rec_area[1])) if rec_area else None,
+                captured_size=(screen_img_w, screen_img_h),
+                match_rect=tuple(match_rect),
+                detected_scale=round(detected_scale, 4),
+                capture_scale=round(capture_scale, 4),
+                real_scale=round(real_scale, 4),
+                window_scale=getattr(self.core, 'current_window_scale', None),
+                parent_pos=(parent_x, parent_y),
+                parent_raw=(round(match_rect[0] / capture_scale, 3), round(match_rect[1] / capture_scale, 3)),
+            )
+
         parent_pos = (parent_x, parent_y)
         # real_scaleは既に計算済み（上記で計算）
         
-        # OCRタスク開始時刻を記録（処理時間計測用）
-        self.core.ocr_start_times[path] = current_time
-        
         # OCRタスクを非同期実行
         # DXCamとMSSで座標系が異なる可能性があるため、キャプチャ方法を渡す
         capture_method = getattr(self.core.capture_manager, 'current_method', 'mss')
         # ★★★ 追加: capture_scaleを渡してroi_offsetの座標系変換に使用 ★★★
-        future = self.thread_pool.submit(
-            OCRRuntimeEvaluator.evaluate,
+        request = dict(
             screen_image=screen_img,
             parent_pos=parent_pos,
             ocr_settings=ocr_settings,
@@ -438,9 +1116,52 @@ class MonitoringProcessor:
             current_scale=real_scale,
             capture_scale=capture_scale,  # ★★★ 追加: roi_offsetの座標系変換に使用 ★★★
             hwnd=self.core.target_hwnd,
-            capture_method=capture_method
+            capture_method=capture_method,
+            trend_key=path,  # 数値モードの読み取り値を時系列として記録
+            sample_time=current_time
         )
-        self.core.ocr_futures[path] = future
+        # ★★★ (改善) 即時投入せずスケジューラに積み、フレーム単位でまとめて実行 ★★★
+        self.ocr_scheduler.submit(path, request, current_time)
+
+    def _ocr_fail_cooldown(self, path, settings, current_time):
+        """
+        OCR不一致後のクールダウン秒数を返します。
+        数値モードで読み取り値がしばらく変化していなければ、再OCRの間隔を延ばします。
+        （平滑値/変化速度の条件はサンプルが必要なため対象外）
+        """
+        cooldown = self.ocr_fail_cooldown_sec
+        ocr_settings = settings.get('ocr_settings') or {}
+        if not isinstance(ocr_settings, dict) or self.ocr_stable_cooldown_sec <= cooldown:
+            return cooldown
+        config = ocr_settings.get('config') or {}
+        condition = ocr_settings.get('condition') or {}
+        if not config.get('numeric_mode', False) or condition.get('source', 'value') not in (None, 'value'):
+            return cooldown
+        if get_trend_store().stable_duration(path, current_time) >= self.ocr_stable_after_sec:
+            return self.ocr_stable_cooldown_sec
+        return cooldown
+
+    def prefetch_ocr(self, matches, current_time, last_match_time_map):
+        """
+        クリック候補になり得るマッチの OCR を先行して開始します（インターバル待機と重ねるため）。
+        結果はパス単位で保持され、process_matches_as_sequence で再利用されます。
+        """
+        if not OCR_AVAILABLE:
+            return
+        for m in matches:
+            path = m['path']
+            settings = m.get('settings') or {}
+            ocr_settings = settings.get('ocr_settings')
+            if not isinstance(ocr_settings, dict) or not ocr_settings.get('enabled', False):
+                continue
+            cooldown_until = self.ocr_fail_cooldowns.get(path)
+            if cooldown_until and current_time < cooldown_until:
+                continue
+            # 直前にクリックしてデバウンス中のものは先行しない（結果が古くなるため）
+            debounce = settings.get('debounce_time', 0.0)
+            if current_time - last_match_time_map.get(path, 0) <= debounce:
+                continue
+            self._start_ocr_task_if_needed(path, m, current_time)
 
     def process_matches_as_sequence(self, all_matches, current_time, last_match_time_map, folder_order_map=None):
         """
@@ -536,12 +1257,14 @@ class MonitoringProcessor:
                 if elapsed >= interval:
                     clickable_after_interval.append(m)
 
+        # このフレームで新たに検出されたOCR対象をまとめて評価
+        self.ocr_scheduler.touch(current_match_paths, current_time)
+        self.ocr_scheduler.flush()
+
+        # 検出状態のみリセット（OCRは見失ってから一定時間後に OCRScheduler.sweep が回収する）
         keys_to_remove = [p for p in self.core.match_detected_at if p not in current_match_paths]
         for p in keys_to_remove:
             self.core.match_detected_at.pop(p, None)
-            self.core.ocr_futures.pop(p, None)
-            self.core.ocr_results.pop(p, None)
-            self.core.ocr_start_times.pop(p, None)
 
         if not clickable_after_interval:
             return None
@@ -572,24 +1295,22 @@ class MonitoringProcessor:
 
             # デバッグ: OCRに関与する場合のみ状態を出力（トグルで制御）
             # - OCR不要の画像まで `[OCR TRACE]` が出ると誤解を招くため、OCR必須/結果待ち/結果ありの場合に限定する
-            if ENABLE_OCR_TRACE_LOG and (
+            if TRACE.ocr and (
                 ocr_required
                 or (path in self.core.ocr_results)
                 or (path in self.core.ocr_futures)
             ):
-                try:
-                    has_result = path in self.core.ocr_results
-                    has_future = path in self.core.ocr_futures
-                    future_done = has_future and self.core.ocr_futures[path].done()
-                    self.logger.log(
-                        f"[OCR TRACE] eval path={Path(path).name} "
-                        f"interval={settings.get('interval_time', 1.5):.2f} "
-                        f"conf={target_match.get('confidence', 0):.2f} "
-                        f"ocr_required={ocr_required} "
-                        f"has_result={has_result} has_future={has_future} future_done={future_done}"
-                    )
-                except Exception:
-                    pass
+                future = self.core.ocr_futures.get(path)
+                trace(
+                    "ocr", "ocr_eval",
+                    path=Path(path).name,
+                    interval=settings.get('interval_time', 1.5),
+                    conf=round(float(target_match.get('confidence', 0)), 4),
+                    ocr_required=ocr_required,
+                    has_result=path in self.core.ocr_results,
+                    has_future=future is not None,
+                    future_done=bool(future is not None and future.done()),
+                )
 
             # OCR不要（無効）の場合は、インターバル優先の順序に従って候補として積む
             if not ocr_required:
@@ -611,10 +1332,10 @@ class MonitoringProcessor:
                 else:
                     # 失敗なら検出状態をリセットし、次の候補を検討
                     if ENABLE_OCR_SKIP_LOG:
-                        self.logger.log(f"[OCR SKIP] {ocr_result.get('log_msg', '(cached result)')}")
+                        self.logger.log(f"[OCR SKIP] {ocr_result.get('log_msg', '(cached result)')}", key=("ocr_skip", path))
                     self.core.match_detected_at.pop(path, None)
                     if self.ocr_fail_cooldown_sec > 0:
-                        self.ocr_fail_cooldowns[path] = current_time + self.ocr_fail_cooldown_sec
+                        self.ocr_fail_cooldowns[path] = current_time + self._ocr_fail_cooldown(path, settings, current_time)
                     continue
 
             # OCR実行中のFutureがある場合
@@ -637,10 +1358,10 @@ class MonitoringProcessor:
                         else:
                             # 失敗なら検出状態をリセットし、次の候補へ
                             if ENABLE_OCR_SKIP_LOG:
-                                self.logger.log(f"[OCR SKIP] {log_msg} {time_str} path={Path(path).name}")
+                                self.logger.log(f"[OCR SKIP] {log_msg} {time_str} path={Path(path).name}", key=("ocr_skip", path))
                             self.core.match_detected_at.pop(path, None)
                             if self.ocr_fail_cooldown_sec > 0:
-                                self.ocr_fail_cooldowns[path] = current_time + self.ocr_fail_cooldown_sec
+                                self.ocr_fail_cooldowns[path] = current_time + self._ocr_fail_cooldown(path, settings, current_time)
                     except Exception as e:
                         self.logger.log(f"[OCR ERROR] {e}")
                     finally:
@@ -649,7 +1370,7 @@ class MonitoringProcessor:
                         self.core.ocr_results.pop(path, None)
                 else:
                     # 最優先候補がOCR待ちなら、後続を処理せず終了（優先度維持）
-                    self.logger.log(f"[OCR WAIT] path={Path(path).name}")
+                    self.logger.log(f"[OCR WAIT] path={Path(path).name}", key=("ocr_wait", path))
                     return None
 
             # ここまでで結果がない場合は、次の候補を検討
@@ -669,7 +1390,7 @@ class MonitoringProcessor:
         # 画面安定性チェック
         is_stability_check_enabled = self.core.app_config.get('screen_stability_check', {}).get('enabled', True)
         if is_stability_check_enabled and not self.core.is_eco_cooldown_active:
-            if not self.check_screen_stability():
+            if not self.check_screen_stability(target_match):
                 self.core._log("log_stability_hold_click")
                 self.core.updateStatus.emit("unstable", "orange")
                 self.core.last_successful_click_time = current_time
@@ -686,7 +1407,7 @@ class MonitoringProcessor:
             ocr_settings = settings.get('ocr_settings')
             ocr_required = bool(OCR_AVAILABLE and isinstance(ocr_settings, dict) and ocr_settings.get('enabled', False))
             if ocr_required and not target_match.get('ocr_success', False):
-                self.logger.log(f"[OCR GUARD SKIP] path={Path(target_match.get('path',''))} required={ocr_required} success_flag={target_match.get('ocr_success', False)}")
+                self.logger.log(f"[OCR GUARD SKIP] path={Path(target_match.get('path',''))} required={ocr_required} success_flag={target_match.get('ocr_success', False)}", key=("ocr_guard_skip", target_match.get('path')))
                 return
             # OCRがOFFで「クリックしない」設定がONなら、絶対にクリックしない（安全ガード）
             if isinstance(ocr_settings, dict):
@@ -700,9 +1421,7 @@ class MonitoringProcessor:
         click_time = time.time()
         last_match_time_map[target_path] = click_time
         if target_path in self.core.match_detected_at: del self.core.match_detected_at[target_path]
-        if target_path in self.core.ocr_futures: del self.core.ocr_futures[target_path]
-        if target_path in self.core.ocr_results: del self.core.ocr_results[target_path]
-        if target_path in self.core.ocr_start_times: del self.core.ocr_start_times[target_path]
+        self.ocr_scheduler.cancel(target_path)
 
     def execute_click(self, match_info):
         try:
@@ -711,6 +1430,13 @@ class MonitoringProcessor:
         except Exception as e:
             self.logger.log(f"[ERROR] Failed during environment tracking pre-click: {e}")
 
+        if self.motion_tracks is not None:
+            # 移動中のターゲットは、キャプチャからクリックまでの遅延ぶん予測位置へずらす
+            dx, dy = self.motion_tracks.predict_offset(match_info['path'], time.monotonic())
+            if dx or dy:
+                match_info = dict(match_info)
+                _offset_match(match_info, (dx, dy))
+
         result = self.core.action_manager.execute_click(
             match_info, 
             self.core.recognition_area, 
@@ -718,6 +1444,16 @@ class MonitoringProcessor:
             self.core.effective_capture_scale,
             self.core.current_window_scale
         )
+        if result and result.get('success'):
+            self.mark_clicked()
+        if TRACE.action:
+            trace(
+                "action", "click",
+                path=Path(match_info['path']).name,
+                success=bool(result and result.get('success')),
+                rect=match_info.get('rect'),
+                scale=match_info.get('scale'),
+            )
         
         if result and result.get('success'): 
             if self.core._lifecycle_hook_active:
@@ -784,3 +1520,9 @@ class MonitoringProcessor:
                 except Exception: cpu_percent = 0.0
             
             self.core.statsUpdated.emit(self.core._click_count, uptime_str, timer_data, cpu_percent, self.core.current_fps)
+            if TRACE.capture:
+                trace("capture", "health", **self.core.capture_manager.get_health_stats())
+            if TRACE.match and self.motion_tracks is not None:
+                trace("match", "motion", **self.motion_stats)
+            if TRACE.match:
+                trace("match", "reuse", skip_rate=round(self.get_match_skip_rate(), 4), **self.match_skip_stats)
@@ -522,6 +522,12 @@ class SelectionHandler:
     def _update_rec_area_preview(self):
         img = None
         if self.core.recognition_area:
+             # 監視中はキャプチャ専用スレッドの最新フレームを使い、追加のキャプチャをしない
+             latest = self.core.capture_manager.get_latest_frame(self.core.recognition_area)
+             # 部分キャプチャのフレーム（未取得部分が黒）はプレビューに使わない
+             if latest is not None and latest.boxes is None:
+                 self.core.updateRecAreaPreview.emit(latest.image.copy())
+                 return
              try: img = self.core.capture_manager.capture_frame(region=self.core.recognition_area)
              except Exception as e: self.logger.log(f"Error capturing for rec area preview: {e}")
         self.core.updateRecAreaPreview.emit(img)
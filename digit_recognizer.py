@@ -0,0 +1,235 @@
+# digit_recognizer.py
+# ★★★ (追加) 数値モード用: 学習した数字グリフによる高速テンプレート認識 ★★★
+"""
+ゲーム固有フォントの数字（HP・スタミナ・カウンター等）を、
+OCR設定ダイアログで登録したラベル付きサンプルから学習し、Tesseract を使わずに読み取る。
+
+- 入力は OCRRuntimeEvaluator._preprocess_image と同じ二値化済み ROI
+- 列方向の投影でグリフを切り出し、固定サイズに正規化したベクトル同士の相関（行列積1回）で判定
+- '.' と '-' は学習不要（行の高さに対する大きさと形で判定）
+- グリフは ~/click_pic/.imeck15/digit_glyphs/<name>.npz に保存し、全アイテムで共有する
+  （アプリ用の隠しディレクトリなので、画像ツリーや孤立JSONのクリーンアップの対象にならない）
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from pathlib import Path
+from typing import List, Tuple
+
+import cv2
+import numpy as np
+
+from ocr_engine import log
+
+GLYPH_DIR = Path.home() / "click_pic" / ".imeck15" / "digit_glyphs"
+GLYPH_W, GLYPH_H = 12, 16
+MAX_SAMPLES_PER_CHAR = 20
+# 行の高さに対してこれより低いグリフは '.' / '-' とみなす
+SMALL_GLYPH_RATIO = 0.4
+
+
+class DigitTemplateRecognizer:
+    """
+    数字グリフのテンプレート認識器。
+    recognize() は OCREnginePool.recognize と同じ (raw_text, avg_conf, elapsed_ms) を返す。
+    """
+
+    def __init__(self, name: str = "default", glyph_dir: Path = None):
+        self.name = name
+        self.glyph_dir = Path(glyph_dir) if glyph_dir else GLYPH_DIR
+        self._lock = threading.Lock()
+        self.labels: List[str] = []
+        self.vectors = np.zeros((0, GLYPH_W * GLYPH_H), dtype=np.float32)
+        self.load()
+
+    @property
+    def path(self) -> Path:
+        return self.glyph_dir / f"{self.name}.npz"
+
+    @property
+    def is_trained(self) -> bool:
+        return len(self.labels) > 0
+
+    def trained_chars(self) -> str:
+        return "".join(sorted(set(self.labels)))
+
+    # ------------------------------------------------------------------
+    # 保存・読み込み
+    # ------------------------------------------------------------------
+    def load(self):
+        if not self.path.exists():
+            return
+        try:
+            with np.load(self.path) as data:
+                labels = [str(l) for l in data['labels']]
+                vectors = data['vectors'].astype(np.float32)
+            if vectors.ndim == 2 and vectors.shape[1] == GLYPH_W * GLYPH_H and len(labels) == len(vectors):
+                with self._lock:
+                    self.labels, self.vectors = labels, vectors
+        except Exception as e:
+            log("[OCR WARN] Failed to load digit glyphs '%s': %s", self.path, e)
+
+    def save(self):
+        self.glyph_dir.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(self.path.stem + ".tmp.npz")
+        with self._lock:
+            np.savez_compressed(tmp_path, labels=np.array(self.labels), vectors=self.vectors)
+        tmp_path.replace(self.path)
+
+    # ------------------------------------------------------------------
+    # グリフ切り出し
+    # ------------------------------------------------------------------
+    @staticmethod
+    def _foreground_mask(binary: np.ndarray) -> np.ndarray:
+        """二値画像から文字側のマスクを返す（少数派の画素を文字とみなす）。"""
+        if binary.ndim == 3:
+            binary = cv2.cvtColor(binary, cv2.COLOR_BGR2GRAY)
+        mask = binary >= 128
+        if mask.mean() > 0.5:
+            mask = ~mask
+        return mask
+
+    @staticmethod
+    def segment(binary: np.ndarray) -> Tuple[np.ndarray, list, int]:
+        """
+        左から順にグリフ矩形 [(x1, y1, x2, y2), ...] を返します。
+        Returns: (文字マスク, 矩形リスト, 行の高さ)
+        """
+        mask = DigitTemplateRecognizer._foreground_mask(binary)
+        rows = np.flatnonzero(mask.any(axis=1))
+        if rows.size == 0:
+            return mask, [], 0
+        line_top, line_bottom = rows[0], rows[-1] + 1
+        cols = mask.any(axis=0).astype(np.int8)
+        # 列投影の立ち上がり/立ち下がりで文字の区切りを求める
+        edges = np.flatnonzero(np.diff(np.concatenate(([0], cols, [0]))))
+        boxes = []
+        for x1, x2 in zip(edges[0::2], edges[1::2]):
+            glyph_rows = np.flatnonzero(mask[:, x1:x2].any(axis=1))
+            y1, y2 = glyph_rows[0], glyph_rows[-1] + 1
+            # 孤立した1〜2画素のノイズは除外
+            if np.count_nonzero(mask[y1:y2, x1:x2]) < 3:
+                continue
+            boxes.append((int(x1), int(y1), int(x2), int(y2)))
+        return mask, boxes, int(line_bottom - line_top)
+
+    @staticmethod
+    def _small_glyph_char(box, line_height, line_top):
+        x1, y1, x2, y2 = box
+        w, h = x2 - x1, y2 - y1
+        if line_height <= 0 or h >= line_height * SMALL_GLYPH_RATIO:
+            return None
+        # 行の下端付近にあるものは '.'、横長で中央付近にあるものは '-'
+        center = (y1 + y2) / 2.0 - line_top
+        if w >= h * 1.5 and center < line_height * 0.75:
+            return "-"
+        return "."
+
+    @staticmethod
+    def _normalize(glyph_mask: np.ndarray) -> np.ndarray:
+        resized = cv2.resize(glyph_mask.astype(np.float32), (GLYPH_W, GLYPH_H), interpolation=cv2.INTER_AREA)
+        vec = resized.reshape(-1)
+        vec = vec - vec.mean()
+        norm = np.linalg.norm(vec)
+        return vec / norm if norm > 0 else vec
+
+    def _extract(self, binary: np.ndarray):
+        """[(small_char or None, 正規化ベクトル), ...] を返します。"""
+        mask, boxes, line_height = self.segment(binary)
+        if not boxes:
+            return []
+        line_top = min(b[1] for b in boxes)
+        glyphs = []
+        for box in boxes:
+            small = self._small_glyph_char(box, line_height, line_top)
+            if small is not None:
+                glyphs.append((small, None))
+                continue
+            x1, y1, x2, y2 = box
+            glyphs.append((None, self._normalize(mask[y1:y2, x1:x2])))
+        return glyphs
+
+    # ------------------------------------------------------------------
+    # 学習・認識
+    # ------------------------------------------------------------------
+    def learn(self, binary: np.ndarray, label: str) -> int:
+        """
+        ラベル付きサンプル（例: "1234"）からグリフを学習します。
+        切り出したグリフ数とラベルの文字数が一致しない場合は ValueError。
+        Returns: 追加したグリフ数
+        """
+        label = "".join(label.split())
+        glyphs = self._extract(binary)
+        if len(glyphs) != len(label):
+            raise ValueError(f"Glyph count mismatch: found {len(glyphs)}, label has {len(label)}")
+
+        added = 0
+        with self._lock:
+            labels = list(self.labels)
+            vectors = [v for v in self.vectors]
+            for ch, (small, vec) in zip(label, glyphs):
+                if small is not None or vec is None or not ch.isdigit():
+                    continue
+                same = [i for i, l in enumerate(labels) if l == ch]
+                # 文字ごとの上限を超えたら古いサンプルから置き換える
+                if len(same) >= MAX_SAMPLES_PER_CHAR:
+                    del labels[same[0]]
+                    del vectors[same[0]]
+                labels.append(ch)
+                vectors.append(vec)
+                added += 1
+            self.labels = labels
+            self.vectors = np.stack(vectors).astype(np.float32) if vectors else np.zeros((0, GLYPH_W * GLYPH_H), dtype=np.float32)
+        return added
+
+    def clear(self):
+        with self._lock:
+            self.labels = []
+            self.vectors = np.zeros((0, GLYPH_W * GLYPH_H), dtype=np.float32)
+
+    def recognize(self, binary: np.ndarray) -> Tuple[str, float, float]:
+        start = time.perf_counter()
+        glyphs = self._extract(binary)
+        with self._lock:
+            labels, templates = self.labels, self.vectors
+
+        chars = []
+        scores = []
+        vec_idx = [i for i, (small, _vec) in enumerate(glyphs) if small is None]
+        best_chars = {}
+        if vec_idx and len(labels) > 0:
+            # 全グリフ × 全テンプレートの相関を一度に計算
+            glyph_mat = np.stack([glyphs[i][1] for i in vec_idx])
+            sims = glyph_mat @ templates.T
+            best = sims.argmax(axis=1)
+            for row, i in enumerate(vec_idx):
+                best_chars[i] = (labels[best[row]], float(sims[row, best[row]]))
+
+        for i, (small, _vec) in enumerate(glyphs):
+            if small is not None:
+                chars.append(small)
+                continue
+            ch, score = best_chars.get(i, ("?", 0.0))
+            chars.append(ch)
+            scores.append(max(0.0, score) * 100.0)
+
+        raw_text = "".join(chars)
+        avg_conf = sum(scores) / len(scores) if scores else 0.0
+        elapsed_ms = (time.perf_counter() - start) * 1000.0
+        return raw_text, avg_conf, elapsed_ms
+
+
+_recognizers = {}
+_recognizers_lock = threading.Lock()
+
+
+def get_digit_recognizer(name: str = "default") -> DigitTemplateRecognizer:
+    """グリフセット名ごとに共有の認識器を返します。"""
+    with _recognizers_lock:
+        rec = _recognizers.get(name)
+        if rec is None:
+            rec = DigitTemplateRecognizer(name)
+            _recognizers[name] = rec
+        return rec
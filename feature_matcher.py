@@ -0,0 +1,174 @@
+# feature_matcher.py
+# ★★★ (追加) 特徴点（ORB / AKAZE）による照合。拡大縮小・回転したテンプレートを1回の照合で探す ★★★
+"""
+特徴点照合（画像ごとの「特徴点照合」設定が ON のアイテム用）。
+
+テンプレート照合は倍率ごとに matchTemplate を1回ずつ実行するため、自動スケールの範囲が広いほど遅くなり、
+回転した対象は見つけられない。ここでは:
+
+- キャッシュ構築時 : compute_template_features() でテンプレートの特徴点と記述子を1回だけ計算
+- フレームごと      : compute_screen_features() で画面の特徴点を1回だけ計算（全アイテムで共有）
+- アイテムごと      : match_features() で記述子を照合 → RANSAC でホモグラフィを推定
+
+結果はテンプレート照合と同じ形式（path / settings / location / confidence / scale / rect）に変換する。
+confidence は、推定した変換で画面側を切り出してテンプレートに重ね、TM_CCOEFF_NORMED で求めた一致度
+（テンプレート照合と同じ尺度なので、同じしきい値がそのまま使える）。照合はグレースケールで行う。
+
+検出器は FEATURE_DETECTOR 環境変数で選ぶ（orb / akaze、既定は orb）。どちらもバイナリ記述子（ハミング距離）。
+"""
+
+from __future__ import annotations
+
+import os
+
+import cv2
+import numpy as np
+
+FEATURE_DETECTOR = os.environ.get("FEATURE_DETECTOR", "orb").strip().lower()
+# テンプレートから取り出す特徴点の上限
+TEMPLATE_FEATURES = 500
+# 画面から取り出す特徴点の上限（フレームごとに1回）
+SCREEN_FEATURES = 3000
+# これより特徴点が少ないテンプレートは特徴点照合に向かない（テンプレート照合に戻す）
+MIN_TEMPLATE_KEYPOINTS = 12
+# ホモグラフィ推定に必要な、比率テストを通った対応点の最小数
+MIN_GOOD_MATCHES = 8
+# Lowe の比率テスト（最良 / 次点の距離比）
+RATIO_TEST = 0.75
+# RANSAC の再投影誤差の許容量（縮小後px）
+RANSAC_REPROJ_THRESHOLD = 3.0
+# 推定した倍率（キャッシュ構築時の倍率に対する比）の許容範囲
+MIN_RELATIVE_SCALE = 0.25
+MAX_RELATIVE_SCALE = 4.0
+
+
+def _create_detector(max_features: int):
+    if FEATURE_DETECTOR == "akaze" and hasattr(cv2, "AKAZE_create"):
+        return cv2.AKAZE_create()
+    # 小さなテンプレートでも特徴点が取れるよう、境界とパッチを既定（31px）より小さくする
+    return cv2.ORB_create(nfeatures=max_features, edgeThreshold=15, patchSize=15, fastThreshold=10)
+
+
+_matcher = None
+
+
+def _get_matcher():
+    global _matcher
+    if _matcher is None:
+        _matcher = cv2.BFMatcher(cv2.NORM_HAMMING, crossCheck=False)
+    return _matcher
+
+
+class FeatureSet:
+    """特徴点の座標 (N, 2) と記述子。テンプレートの場合は元のグレー画像も保持する。"""
+    __slots__ = ("points", "descriptors", "gray", "scale")
+
+    def __init__(self, points, descriptors, gray=None, scale=1.0):
+        self.points = points
+        self.descriptors = descriptors
+        self.gray = gray
+        self.scale = scale
+
+    def __len__(self):
+        return 0 if self.descriptors is None else len(self.descriptors)
+
+
+def _detect(gray, max_features: int):
+    keypoints, descriptors = _create_detector(max_features).detectAndCompute(gray, None)
+    if descriptors is None or not keypoints:
+        return np.empty((0, 2), np.float32), None
+    return np.float32([kp.pt for kp in keypoints]), descriptors
+
+
+def compute_template_features(gray, scale: float):
+    """
+    キャッシュ構築時に呼び出します。gray は倍率 scale で縮小済みのテンプレート。
+    特徴点が少なすぎる場合は None（呼び出し側はテンプレート照合を使う）。
+    """
+    points, descriptors = _detect(gray, TEMPLATE_FEATURES)
+    if descriptors is None or len(points) < MIN_TEMPLATE_KEYPOINTS:
+        return None
+    return FeatureSet(points, descriptors, gray, scale)
+
+
+def compute_screen_features(gray):
+    """フレームごとに1回呼び出し、結果を全アイテムの match_features() で共有します。"""
+    points, descriptors = _detect(gray, SCREEN_FEATURES)
+    return FeatureSet(points, descriptors)
+
+
+def match_features(screen_gray, screen_features, template_features, template_data):
+    """
+    テンプレートの特徴点を画面の特徴点と照合します。
+    見つかればテンプレート照合と同じ形式の結果に加えて 'homography'
+    （テンプレートの縮小前の座標 → 縮小後フレーム座標 の 3x3 変換）を返し、見つからなければ None。
+    """
+    if len(screen_features) < MIN_GOOD_MATCHES or len(template_features) == 0:
+        return None
+
+    try:
+        pairs = _get_matcher().knnMatch(template_features.descriptors, screen_features.descriptors, k=2)
+    except cv2.error:
+        return None
+    good = [p[0] for p in pairs if len(p) == 2 and p[0].distance < RATIO_TEST * p[1].distance]
+    if len(good) < MIN_GOOD_MATCHES:
+        return None
+
+    src = template_features.points[[m.queryIdx for m in good]].reshape(-1, 1, 2)
+    dst = screen_features.points[[m.trainIdx for m in good]].reshape(-1, 1, 2)
+    homography, inliers = cv2.findHomography(src, dst, cv2.RANSAC, RANSAC_REPROJ_THRESHOLD)
+    if homography is None or inliers is None or int(inliers.sum()) < MIN_GOOD_MATCHES:
+        return None
+
+    # 裏返し・極端な拡大縮小・強い射影歪みは誤対応とみなす
+    linear = homography[:2, :2]
+    det = float(np.linalg.det(linear))
+    if det <= 0:
+        return None
+    relative_scale = det ** 0.5
+    if not (MIN_RELATIVE_SCALE <= relative_scale <= MAX_RELATIVE_SCALE):
+        return None
+    if abs(homography[2, 0]) > 0.002 or abs(homography[2, 1]) > 0.002:
+        return None
+
+    t_h, t_w = template_features.gray.shape[:2]
+    corners = np.float32([[0, 0], [t_w, 0], [t_w, t_h], [0, t_h]]).reshape(-1, 1, 2)
+    projected = cv2.perspectiveTransform(corners, homography).reshape(-1, 2)
+    s_h, s_w = screen_gray.shape[:2]
+    x1, y1 = np.floor(projected.min(axis=0)).astype(int)
+    x2, y2 = np.ceil(projected.max(axis=0)).astype(int)
+    x1, y1, x2, y2 = max(0, int(x1)), max(0, int(y1)), min(s_w, int(x2)), min(s_h, int(y2))
+    if x2 - x1 < 2 or y2 - y1 < 2:
+        return None
+
+    # 画面側をテンプレートの座標に戻して重ね、テンプレート照合と同じ尺度の一致度を求める
+    try:
+        warped = cv2.warpPerspective(screen_gray, homography, (t_w, t_h), flags=cv2.INTER_LINEAR | cv2.WARP_INVERSE_MAP)
+        confidence = float(cv2.matchTemplate(warped, template_features.gray, cv2.TM_CCOEFF_NORMED)[0, 0])
+    except cv2.error:
+        return None
+    if not np.isfinite(confidence) or confidence < template_data['settings'].get('threshold', 0.8):
+        return None
+
+    # クリック位置の計算用に、縮小前のテンプレート座標から写す変換にしておく
+    to_template = np.diag([template_features.scale, template_features.scale, 1.0])
+    return {
+        'path': template_data['path'],
+        'settings': template_data['settings'],
+        'location': (x1, y1),
+        'confidence': confidence,
+        'scale': template_features.scale * relative_scale,
+        'rect': (x1, y1, x2, y2),
+        'homography': homography @ to_template,
+    }
+
+
+def project_point(homography, x: float, y: float):
+    """3x3 変換で点 (x, y) を写します。"""
+    px, py, pw = homography @ np.array([x, y, 1.0])
+    return px / pw, py / pw
+
+
+def translate_homography(homography, dx: float, dy: float):
+    """写した先を (dx, dy) だけ平行移動した変換を返します。"""
+    return np.array([[1.0, 0.0, dx], [0.0, 1.0, dy], [0.0, 0.0, 1.0]]) @ homography
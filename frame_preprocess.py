@@ -0,0 +1,150 @@
+# frame_preprocess.py
+# ★★★ (追加) キャプチャ画像の縮小とグレースケール化を最小のパス数で行う ★★★
+"""
+監視ループの前処理（縮小 + グレースケール化）。
+
+従来は「元画像のコピー → BGR縮小 → 縮小画像のコピー → グレースケール化」と
+画像全体を4回走査していた。ここでは用途に応じて必要なものだけを作る:
+
+- 縮小なし              : グレースケール化のみ（BGR はキャプチャ画像をそのまま使う）
+- 縮小あり・BGRが必要    : BGR を縮小し、小さい画像からグレースケール化
+- 縮小あり・グレーのみ    : 元解像度で1チャンネルに変換してから縮小（3チャンネル縮小を省く）
+
+キャプチャ画像は毎回新しく確保された配列で、以降は読み取りのみのためコピーしない。
+
+OpenCL 有効時は preprocess_frame_umat で、転送1回 → デバイス上で縮小・変換し、
+ホストにはグレー画像（安定性チェック・クイックタイマー用）だけを読み戻す。
+
+部分キャプチャ（矩形ごとの画像）は preprocess_parts で矩形ごとに縮小・変換する。
+
+ベンチマーク:
+  python frame_preprocess.py [--width 1920] [--height 1080] [--repeat 200] [--image PATH]
+軽量化プリセット（standard / performance / ultra）ごとに従来処理との所要時間を比較します。
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+
+import cv2
+import numpy as np
+
+# core.on_app_config_changed の軽量化プリセットと同じ縮小率
+PRESET_SCALES = {"standard": 0.5, "performance": 0.4, "ultra": 0.3}
+
+
+def preprocess_frame(frame, scale: float, need_bgr: bool = True):
+    """
+    (縮小後BGR, 縮小後グレー) を返します。need_bgr=False の場合 BGR は None。
+    scale が 1.0 の場合、BGR は frame そのもの（コピーしない）。
+    """
+    if scale == 1.0:
+        return (frame if need_bgr else None), cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+    if need_bgr:
+        bgr = cv2.resize(frame, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+        return bgr, cv2.cvtColor(bgr, cv2.COLOR_BGR2GRAY)
+    gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+    return None, cv2.resize(gray, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+
+
+def preprocess_frame_umat(frame, scale: float, need_bgr: bool = True):
+    """
+    (縮小後BGRのUMat, 縮小後グレーのUMat, 縮小後グレーのndarray) を返します。
+    need_bgr=False の場合 BGR の UMat は None。
+    """
+    src = cv2.UMat(frame)
+    if scale == 1.0:
+        bgr_umat = src
+        gray_umat = cv2.cvtColor(src, cv2.COLOR_BGR2GRAY)
+    elif need_bgr:
+        bgr_umat = cv2.resize(src, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+        gray_umat = cv2.cvtColor(bgr_umat, cv2.COLOR_BGR2GRAY)
+    else:
+        bgr_umat = None
+        gray_umat = cv2.resize(cv2.cvtColor(src, cv2.COLOR_BGR2GRAY), None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+    return bgr_umat, gray_umat, gray_umat.get()
+
+
+def preprocess_parts(parts, size, scale: float, out_shape=None, need_bgr: bool = True):
+    """
+    部分キャプチャ [((x1, y1, x2, y2), 画像), ...]（元解像度）を矩形ごとに縮小・グレースケール化し、
+    縮小後の全体サイズの画像の同じ位置に置いて (縮小後BGR, 縮小後グレー) を返します（未取得部分は黒）。
+    走査するのは取得した矩形の画素だけで、全体サイズの配列は確保するのみ。
+    out_shape: 縮小後の全体サイズ (高さ, 幅)。全体フレームの前処理結果と揃える場合に指定
+    """
+    width, height = size
+    if out_shape is None:
+        out_shape = (max(1, int(round(height * scale))), max(1, int(round(width * scale))))
+    out_h, out_w = out_shape[:2]
+    gray = np.zeros((out_h, out_w), dtype=np.uint8)
+    bgr = np.zeros((out_h, out_w, 3), dtype=np.uint8) if need_bgr else None
+    for (x1, y1, x2, y2), part in parts:
+        rx1, ry1 = min(out_w, int(x1 * scale)), min(out_h, int(y1 * scale))
+        rx2, ry2 = min(out_w, int(np.ceil(x2 * scale))), min(out_h, int(np.ceil(y2 * scale)))
+        if rx2 <= rx1 or ry2 <= ry1:
+            continue
+        small = part if scale == 1.0 else cv2.resize(part, (rx2 - rx1, ry2 - ry1), interpolation=cv2.INTER_AREA)
+        small = small[:ry2 - ry1, :rx2 - rx1]
+        sh, sw = small.shape[:2]
+        if bgr is not None:
+            bgr[ry1:ry1 + sh, rx1:rx1 + sw] = small
+        gray[ry1:ry1 + sh, rx1:rx1 + sw] = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+    return bgr, gray
+
+
+def _legacy_preprocess(frame, scale: float):
+    """変更前の監視ループと同じ処理（ベンチマークの比較用）。"""
+    high_res = frame.copy()
+    bgr = frame
+    if scale != 1.0:
+        bgr = cv2.resize(bgr, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+    for_hash = bgr.copy()
+    gray = cv2.cvtColor(bgr, cv2.COLOR_BGR2GRAY)
+    return high_res, for_hash, bgr, gray
+
+
+def _time_ms(func, repeat: int) -> float:
+    func()  # ウォームアップ
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) * 1000.0 / repeat
+
+
+def run_benchmark(frame, repeat: int = 200):
+    rows = []
+    for name, scale in [("off", 1.0)] + list(PRESET_SCALES.items()):
+        legacy = _time_ms(lambda: _legacy_preprocess(frame, scale), repeat)
+        fused_bgr = _time_ms(lambda: preprocess_frame(frame, scale, need_bgr=True), repeat)
+        fused_gray = _time_ms(lambda: preprocess_frame(frame, scale, need_bgr=False), repeat)
+        rows.append((name, scale, legacy, fused_bgr, fused_gray))
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark capture preprocessing (downscale + grayscale)")
+    parser.add_argument("--width", type=int, default=1920)
+    parser.add_argument("--height", type=int, default=1080)
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--image", help="use a screenshot instead of random noise")
+    args = parser.parse_args(argv)
+
+    if args.image:
+        frame = cv2.imdecode(np.fromfile(args.image, np.uint8), cv2.IMREAD_COLOR)
+        if frame is None:
+            print(f"Cannot read image: {args.image}")
+            return 1
+    else:
+        frame = np.random.default_rng(0).integers(0, 256, (args.height, args.width, 3), dtype=np.uint8)
+
+    print(f"frame {frame.shape[1]}x{frame.shape[0]}, {args.repeat} iterations, OpenCV {cv2.__version__}")
+    print(f"{'preset':12s} {'scale':>5s} {'legacy':>9s} {'bgr+gray':>9s} {'gray only':>9s}")
+    for name, scale, legacy, fused_bgr, fused_gray in run_benchmark(frame, args.repeat):
+        print(f"{name:12s} {scale:5.2f} {legacy:7.3f}ms {fused_bgr:7.3f}ms {fused_gray:7.3f}ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -7,6 +7,9 @@ import socket
 import ctypes
 import requests  # 追加: ダウンロード用
 import logging   # 追加: ログ用
+import logging.handlers
+import threading
+from collections import deque
 import time      # 追加: リトライ待機用
 from pathlib import Path # 追加: パス操作用
 
@@ -39,6 +42,7 @@ from locale_manager import LocaleManager
 
 # 追加: OCR言語マッピングのインポート
 from ocr_manager import LOCALE_TO_TESS_CODE
+from ocr_engine import set_logger as set_ocr_logger
 
 LOCK_PORT = 54321
 _lock_socket = None
@@ -53,27 +57,141 @@ def check_and_lock():
         _lock_socket = None
         return False
 
+def _env_float(name, default):
+    try:
+        return max(0.0, float(os.environ.get(name, str(default))))
+    except ValueError:
+        return default
+
 class Logger(QObject):
+    """
+    アプリ全体のロガー。
+    ★★★ (改善) 監視ループなどのホットパスから毎フレーム呼ばれても負荷にならないよう、
+    log() はキューに積むだけにし、翻訳・整形・出力は UI スレッドで一定間隔ごとにまとめて行う。
+
+    - 同じキー（既定はメッセージと引数の組）は LOG_RATE_LIMIT_SEC 以内の重複を間引き、次回出力時に件数を付記
+      （その後出力が無くても、間引き期間が過ぎた時点の flush で件数を報告する）
+    - force=True は間引きの対象外
+    - IMECK_LOG_FILE を指定するとローテーション付きのファイルにも出力
+    """
     logReady = Signal(str)
+
+    FLUSH_INTERVAL_MS = max(1, int(_env_float("LOG_FLUSH_INTERVAL_MS", 100)))
+    RATE_LIMIT_SEC = _env_float("LOG_RATE_LIMIT_SEC", 1.0)
+    QUEUE_MAX = 5000
+
     def __init__(self, ui_manager=None):
         super().__init__()
         self.ui_manager = ui_manager
         self.locale_manager = None 
+        self._queue = deque(maxlen=self.QUEUE_MAX)
+        self._rate_lock = threading.Lock()
+        self._last_emit = {}
+        self._suppressed = {}
+        self._file_logger = self._create_file_sink(os.environ.get("IMECK_LOG_FILE"))
+        self._flush_timer = None
     def set_ui(self, ui_manager):
         self.ui_manager = ui_manager
         self.logReady.connect(self.ui_manager.update_log)
+        # UI 接続後はキュー経由でまとめて出力する
+        self._flush_timer = QTimer(self)
+        self._flush_timer.setInterval(self.FLUSH_INTERVAL_MS)
+        self._flush_timer.timeout.connect(self.flush)
+        self._flush_timer.start()
+        app = QApplication.instance()
+        if app is not None:
+            app.aboutToQuit.connect(self.flush)
     def set_locale_manager(self, locale_manager):
         self.locale_manager = locale_manager
-    def log(self, message: str, *args, force=False):
+
+    @staticmethod
+    def _create_file_sink(path):
+        if not path:
+            return None
+        try:
+            file_logger = logging.getLogger("imeck15.log")
+            file_logger.setLevel(logging.INFO)
+            file_logger.propagate = False
+            handler = logging.handlers.RotatingFileHandler(path, maxBytes=2 * 1024 * 1024, backupCount=3, encoding="utf-8")
+            handler.setFormatter(logging.Formatter("%(asctime)s %(message)s"))
+            file_logger.addHandler(handler)
+            return file_logger
+        except Exception as e:
+            print(f"[WARN] Failed to open log file '{path}': {e}")
+            return None
+
+    def log(self, message: str, *args, force=False, key=None):
+        """
+        メッセージ（翻訳キーまたは文字列）を記録します。整形は flush 時まで遅延されます。
+        key: 間引き用のキー。内容が毎回変わるトレース行などで指定する
+        """
+        now = time.monotonic()
+        suppressed = 0
+        if not force and self.RATE_LIMIT_SEC > 0:
+            if key is None:
+                key = (message, args)
+                try:
+                    hash(key)
+                except TypeError:
+                    key = message
+            with self._rate_lock:
+                last = self._last_emit.get(key)
+                if last is not None and now - last < self.RATE_LIMIT_SEC:
+                    _msg, _args, count = self._suppressed.get(key, (message, args, 0))
+                    self._suppressed[key] = (message, args, count + 1)
+                    return
+                self._last_emit[key] = now
+                suppressed = self._suppressed.pop(key, (None, None, 0))[2]
+                if len(self._last_emit) > 4096:
+                    self._last_emit = {k: t for k, t in self._last_emit.items() if now - t < self.RATE_LIMIT_SEC}
+        self._queue.append((message, args, suppressed))
+        if self._flush_timer is None:
+            # UI 接続前（起動処理中）は即時出力
+            self.flush()
+
+    def _format(self, message, args):
         try:
             if self.locale_manager:
-                translated_message = self.locale_manager.tr(message, *args)
-            else:
-                translated_message = message % args if args else message
+                return self.locale_manager.tr(message, *args)
+            return message % args if args else message
         except Exception:
-            translated_message = f"{message} (args: {args})"
-        print(f"[LOG] {translated_message}")
-        self.logReady.emit(translated_message)
+            return f"{message} (args: {args})"
+
+    def _collect_expired_suppressed(self):
+        """間引き期間が過ぎたまま次の出力が来ていない件数を (message, args, count) で取り出す。"""
+        if not self._suppressed:
+            return []
+        now = time.monotonic()
+        expired = []
+        with self._rate_lock:
+            for key in list(self._suppressed):
+                if now - self._last_emit.get(key, 0.0) >= self.RATE_LIMIT_SEC:
+                    expired.append(self._suppressed.pop(key))
+        return expired
+
+    def flush(self):
+        pending = self._collect_expired_suppressed()
+        if not self._queue and not pending:
+            return
+        lines = []
+        while self._queue:
+            try:
+                message, args, suppressed = self._queue.popleft()
+            except IndexError:
+                break
+            text = self._format(message, args)
+            if suppressed:
+                text = f"{text} (x{suppressed + 1})"
+            lines.append(text)
+        for message, args, count in pending:
+            lines.append(f"{self._format(message, args)} (+{count} suppressed)")
+        if not lines:
+            return
+        print("\n".join(f"[LOG] {line}" for line in lines))
+        if self._file_logger is not None:
+            for line in lines:
+                self._file_logger.info(line)
+        self.logReady.emit("\n".join(lines))
 
 # ----------------------------------------------------------------------
 # 追加機能: Tesseract初期化と自動ダウンロード (リトライ版)
@@ -262,12 +380,25 @@ def main():
     
     # ConfigManager初期化
     config_manager = ConfigManager(logger)
+    # 孤立JSONのクリーンアップは起動をブロックしないようバックグラウンドで実行
+    config_manager.start_background_cleanup()
 
+    # OCR エンジン・数字認識の警告もアプリのログに出す
+    set_ocr_logger(logger)
     logger.log("OCR環境を確認中...", force=True)
     if not initialize_tesseract(logger, config_manager):
         logger.log("[WARN] OCRデータの準備に失敗しました。OCR機能は動作しない可能性があります。", force=True)
     else:
         logger.log("OCR環境の準備が完了しました。", force=True)
+        # 常駐OCRエンジンを事前に読み込み、初回OCRの遅延をなくす（tesserocr がある場合のみ）
+        try:
+            from ocr_engine import get_engine_pool, TESSEROCR_AVAILABLE
+            if TESSEROCR_AVAILABLE:
+                locale_code = config_manager.load_app_config().get("language", "en_US")
+                get_engine_pool().warmup_async({'eng', LOCALE_TO_TESS_CODE.get(locale_code, 'eng')})
+                logger.log("[INFO] OCR engine pool: tesserocr (warming up)", force=True)
+        except Exception as e:
+            logger.log(f"[WARN] OCR engine warmup failed: {e}", force=True)
 
     capture_manager = CaptureManager(logger)
     ui_manager = UIManager(None, capture_manager, config_manager, logger, locale_manager)
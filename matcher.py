@@ -9,6 +9,7 @@ import numpy as np
 def calculate_phash(image):
     """
     OpenCVの画像(Numpy配列)からpHashを計算します。
+    NOTE: PIL変換を伴うため低速です。監視ループ内では calculate_dct_hash を使用してください。
     """
     if image is None:
         return None
@@ -18,10 +19,37 @@ def calculate_phash(image):
     except Exception:
         return None
 
-def _match_template_task(screen_image, template_image, template_data, screen_shape, template_shape, effective_strict_color: bool):
+def calculate_dct_hash(gray_image, hash_size: int = 8, highfreq_factor: int = 4):
+    """
+    グレースケール画像から DCT ベースの知覚ハッシュ(pHash相当)を計算します。
+    imagehash.phash と同じ手順(縮小 → DCT → 低周波成分の中央値で2値化)を
+    OpenCV/NumPy だけで行うため、PIL変換やカラー変換が不要です。
+    戻り値: hash_size*hash_size ビットの int（失敗時は None）
+    """
+    if gray_image is None or gray_image.size == 0:
+        return None
+    try:
+        if gray_image.ndim == 3:
+            gray_image = cv2.cvtColor(gray_image, cv2.COLOR_BGR2GRAY)
+        img_size = hash_size * highfreq_factor
+        small = cv2.resize(gray_image, (img_size, img_size), interpolation=cv2.INTER_AREA)
+        dct = cv2.dct(np.float32(small))
+        low_freq = dct[:hash_size, :hash_size]
+        bits = (low_freq > np.median(low_freq)).ravel()
+        return int.from_bytes(np.packbits(bits).tobytes(), 'big')
+    except cv2.error:
+        return None
+
+def hash_distance(hash_a: int, hash_b: int) -> int:
+    """calculate_dct_hash の結果同士のハミング距離を返します。"""
+    return (hash_a ^ hash_b).bit_count()
+
+def _match_template_task(screen_image, template_image, template_data, screen_shape, template_shape, effective_strict_color: bool, screen_channels=None):
     """
     メインのマッチングタスク関数。
     条件に応じて適切なマッチング戦略関数を呼び出します。
+    screen_channels: 色調厳格モードで使う、分離済みのスクリーン画像 (B, G, R)。
+                     フレームごとに1回だけ分離して全テンプレートで共有する。
     """
     settings = template_data['settings']
     threshold = settings.get('threshold', 0.8)
@@ -36,7 +64,7 @@ def _match_template_task(screen_image, template_image, template_data, screen_sha
     # --- 戦略の分岐 ---
     try:
         if effective_strict_color:
-            result_val, result_loc = _match_strict_color(screen_image, template_data['template'])
+            result_val, result_loc = _match_strict_color(screen_image, template_data['template'], screen_channels)
         else:
             result_val, result_loc = _match_standard(screen_image, template_data['template'])
             
@@ -56,25 +84,29 @@ def _match_template_task(screen_image, template_image, template_data, screen_sha
     
     return None
 
-def _match_strict_color(screen_image, template_image_data):
+def _match_strict_color(screen_image, template_image_data, screen_channels=None):
     """
     色調厳格モード (Strict Color Matching)
     RGB各チャンネルごとにマッチングを行い、最小値(Min)を採用します。
+    ★★★ (改善) スクリーンが UMat の場合は分離・照合・最小値の計算をすべてデバイス上で行い、
+        読み戻すのは minMaxLoc の結果のみ ★★★
     """
-    # 必要な場合のみデータを取得（UMat -> Numpy）
-    screen_np = screen_image.get() if hasattr(screen_image, 'get') else screen_image
-    template_np = template_image_data.get() if hasattr(template_image_data, 'get') else template_image_data
-    
-    # 安全性チェック: データ不正やチャンネル不足
-    if screen_np is None or template_np is None:
-        return -1.0, (-1, -1)
-    if len(screen_np.shape) < 3 or screen_np.shape[2] != 3:
-        return -1.0, (-1, -1)
+    if isinstance(screen_image, cv2.UMat):
+        if not isinstance(template_image_data, cv2.UMat):
+            template_image_data = cv2.UMat(template_image_data)
+    else:
+        template_image_data = template_image_data.get() if isinstance(template_image_data, cv2.UMat) else template_image_data
+
+        # 安全性チェック: データ不正やチャンネル不足
+        if screen_image is None or template_image_data is None:
+            return -1.0, (-1, -1)
+        if len(screen_image.shape) < 3 or screen_image.shape[2] != 3:
+            return -1.0, (-1, -1)
 
     # チャンネル分離
     try:
-        s_b, s_g, s_r = cv2.split(screen_np)
-        t_b, t_g, t_r = cv2.split(template_np)
+        s_b, s_g, s_r = screen_channels if screen_channels is not None else cv2.split(screen_image)
+        t_b, t_g, t_r = cv2.split(template_image_data)
         
         # 3回マッチング
         result_b = cv2.matchTemplate(s_b, t_b, cv2.TM_CCOEFF_NORMED)
@@ -87,7 +119,7 @@ def _match_strict_color(screen_image, template_image_data):
         _, max_val, _, max_loc = cv2.minMaxLoc(result_min)
         return max_val, max_loc
         
-    except cv2.error:
+    except (cv2.error, ValueError):
         return -1.0, (-1, -1)
 
 def _match_standard(screen_image, template_image_data):
@@ -100,7 +132,8 @@ def _match_standard(screen_image, template_image_data):
     is_template_umat = isinstance(template_image_data, cv2.UMat)
 
     if is_screen_umat and not is_template_umat:
-        screen_image = screen_image.get()
+        # スクリーン全体を読み戻さず、小さいテンプレートの方を転送する
+        template_image_data = cv2.UMat(template_image_data)
     elif not is_screen_umat and is_template_umat:
         template_image_data = template_image_data.get()
 
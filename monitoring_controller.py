@@ -15,6 +15,9 @@ from PySide6.QtWidgets import QMessageBox
 
 from monitoring_states import IdleState
 from monitoring_states import CountdownState
+from ocr_engine import get_engine_pool, get_result_cache
+from ocr_trend import get_trend_store
+from core_monitoring import MULTI_REGION_CAPTURE
 
 
 class MonitoringController:
@@ -71,7 +74,7 @@ class MonitoringController:
             core._click_count = 0
             core._cooldown_until = 0
             core._last_clicked_path = None
-            core.screen_stability_hashes.clear()
+            core.screen_stability_frames.clear()
             core.last_successful_click_time = 0
             core.is_eco_cooldown_active = False
             core._last_eco_check_time = time.time()
@@ -101,6 +104,16 @@ class MonitoringController:
                         core.logger.log(f"[WARN] Failed to build timer schedule: {e}")
                         core.cacheBuildFinished.emit(False)
                 
+                # キャプチャを専用スレッドで先行させ、監視ループは最新フレームを受け取る
+                core.monitoring_processor.reset_frame_state()
+                core.capture_manager.health.reset()
+                get_engine_pool().reset_stats()
+                get_result_cache().reset_stats()
+                producer = core.capture_manager.start_producer(
+                    lambda: core.recognition_area, core.monitoring_processor.producer_target_fps()
+                )
+                if producer is not None and MULTI_REGION_CAPTURE:
+                    producer.sub_region_provider = core.monitoring_processor.plan_capture_boxes
                 core._monitor_thread = threading.Thread(target=core.monitoring_processor.monitoring_loop, daemon=True)
                 core._monitor_thread.start()
                 core.updateStatus.emit("monitoring", "blue")
@@ -121,6 +134,29 @@ class MonitoringController:
             core.ui_manager.set_tree_enabled(True)
             if core._monitor_thread and core._monitor_thread.is_alive():
                 core._monitor_thread.join(timeout=1.0)
+            core.capture_manager.stop_producer()
+            core.monitoring_processor.close_window_tracker()
+            stats = core.capture_manager.get_health_stats()
+            core.logger.log(
+                f"[INFO] Capture stats ({stats['backend']}): frames={stats['frames']} failures={stats['failures']} "
+                f"reinits={stats['reinits']} mean={stats['mean_grab_ms']}ms duplicates={stats['duplicate_rate'] * 100:.1f}%"
+            )
+            skip = core.monitoring_processor.match_skip_stats
+            core.logger.log(
+                f"[INFO] Match reuse: duplicate_frames={skip['duplicate_frames']}/{skip['frames']} "
+                f"skip_rate={core.monitoring_processor.get_match_skip_rate() * 100:.1f}%"
+            )
+            for backend, ocr_stats in get_engine_pool().get_stats().items():
+                core.logger.log(
+                    f"[INFO] OCR engine ({backend}): calls={ocr_stats['calls']} "
+                    f"avg={ocr_stats['avg_ms']:.1f}ms max={ocr_stats['max_ms']:.1f}ms"
+                )
+            cache_stats = get_result_cache().get_stats()
+            if cache_stats['hits'] or cache_stats['misses']:
+                core.logger.log(
+                    f"[INFO] OCR result cache: hits={cache_stats['hits']} misses={cache_stats['misses']} "
+                    f"expired={cache_stats['expired']} hit_rate={cache_stats['hit_rate'] * 100:.1f}%"
+                )
             with core.cache_lock:
                 for cache in [core.normal_template_cache, core.backup_template_cache]:
                     for item in cache.values():
@@ -128,6 +164,8 @@ class MonitoringController:
             core.match_detected_at.clear()
             core.priority_timers.clear()
             core.folder_cooldowns.clear()
+            core.monitoring_processor.ocr_scheduler.clear()
+            get_trend_store().clear()
             core.ocr_futures.clear()
             core.ocr_results.clear()
             core.ocr_start_times.clear()
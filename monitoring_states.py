@@ -31,81 +31,54 @@ class IdleState(State):
     def handle(self, current_time, screen_data, last_match_time_map, pre_matches=None):
         context = self.context
 
-        # 0. クイックタイマー
+        # 0. クイックタイマー（照合期間に入ったものを共有グレー画像でまとめて照合）
         qt_mgr = getattr(context, "_quick_timer_manager", None)
         if qt_mgr and qt_mgr.has_any():
-            import cv2
-            for e in qt_mgr.entries_sorted():
-                trigger_time = float(e.get("trigger_time", 0))
-                match_start = float(e.get("match_start_time", trigger_time - 60.0))
-                if current_time < match_start:
-                    continue
-                if qt_mgr.remove_if_expired(e, current_time, grace_seconds=5.0):
-                    continue
-
-                template_gray = e.get("template_gray", None)
-                if template_gray is None:
-                    continue
-
-                frame = getattr(context, "latest_high_res_frame", None)
-                if frame is None or frame.size == 0:
-                    continue
-
-                screen_gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-                res = cv2.matchTemplate(screen_gray, template_gray, cv2.TM_CCOEFF_NORMED)
-                _minv, maxv, _minl, maxl = cv2.minMaxLoc(res)
-                if maxv >= 0.85:
-                    context.transition_to(QuickTimerStandbyState(context, e, maxl))
-                    return
-                break
+            due_entries = qt_mgr.due_entries(current_time, grace_seconds=5.0)
+            if due_entries:
+                qt_results = context.monitoring_processor.match_quick_timers(due_entries, screen_data[1])
+                for e in due_entries:
+                    hit = qt_results.get(e.get("slot"))
+                    if hit and hit[0] >= 0.85:
+                        context.transition_to(QuickTimerStandbyState(context, e, hit[1]))
+                        return
         
         # 1. タイマーアプローチ (スケジュール実行)
-        if context.timer_schedule_cache:
-            for path, schedule in context.timer_schedule_cache.items():
-                actions = schedule['actions']
-                pending_actions = [a for a in actions if not a['executed']]
-                if not pending_actions: continue
-                
-                next_action = pending_actions[0]
+        scheduler = context.timer_schedule_cache
+        locked_paths = set()
+        if scheduler:
+            locked_paths = scheduler.locked_paths(current_time)
+            for path in list(locked_paths):
+                next_action = scheduler.next_action(path)
+                if next_action is None: continue
                 time_until_trigger = next_action['target_time'] - current_time
                 
                 if time_until_trigger < -1.0:
                     context.logger.log(f"[WARN] Timer action expired for {Path(path).name}. Skipping.")
-                    next_action['executed'] = True
+                    scheduler.complete(path, current_time)
                     continue
                 
-                if time_until_trigger <= schedule['approach_time']:
-                    target_match = None
-                    if pre_matches:
-                        for m in pre_matches:
-                            if m['path'] == path:
-                                target_match = m
-                                break
-                    if not target_match:
-                        cache_item = context.normal_template_cache.get(path) or context.backup_template_cache.get(path)
-                        if cache_item:
-                            matches = context._find_best_match(*screen_data, {path: cache_item})
-                            if matches: target_match = matches[0]
-                    
-                    if target_match:
-                        new_state = TimerStandbyState(context, path, schedule)
-                        context.transition_to(new_state)
-                        return
+                target_match = None
+                if pre_matches:
+                    for m in pre_matches:
+                        if m['path'] == path:
+                            target_match = m
+                            break
+                if not target_match:
+                    cache_item = context.normal_template_cache.get(path) or context.backup_template_cache.get(path)
+                    if cache_item:
+                        matches = context._find_best_match(*screen_data, {path: cache_item})
+                        if matches: target_match = matches[0]
+                
+                if target_match:
+                    new_state = TimerStandbyState(context, path, scheduler[path])
+                    context.transition_to(new_state)
+                    return
+            locked_paths = scheduler.locked_paths(current_time)
         
         # 2. 候補の選定（タイマーロックされていないもの）
         all_matches = pre_matches if pre_matches is not None else []
-        candidates = []
-        for m in all_matches:
-            is_locked_by_timer = False
-            if m['path'] in context.timer_schedule_cache:
-                schedule = context.timer_schedule_cache[m['path']]
-                pending = [a for a in schedule['actions'] if not a['executed']]
-                if pending:
-                    next_action = pending[0]
-                    lock_start_time = next_action['target_time'] - schedule['approach_time']
-                    if current_time >= lock_start_time: is_locked_by_timer = True
-            if not is_locked_by_timer:
-                candidates.append(m)
+        candidates = [m for m in all_matches if m['path'] not in locked_paths]
         
         normal_matches = [m for m in candidates if m['path'] in context.normal_template_cache]
         backup_trigger_matches = [m for m in candidates if m['path'] in context.backup_template_cache]
@@ -113,6 +86,9 @@ class IdleState(State):
         # 信頼度順にソート (公平な競争の準備)
         normal_matches.sort(key=lambda x: x['confidence'], reverse=True)
 
+        # OCR付きの候補はインターバル待機と並行して先に読み取りを開始しておく
+        context.monitoring_processor.prefetch_ocr(normal_matches, current_time, last_match_time_map)
+
         # ★★★ 統合ループ ★★★
         for match in normal_matches:
             path_str = match['path']
@@ -236,24 +212,10 @@ class PriorityState(State):
         self.last_detection_time = current
 
     def _build_priority_cache(self):
-        def filter_cache(source_cache, dest_cache):
-            count = 0
-            for p, d in source_cache.items():
-                is_match = False
-                f_path = d.get('folder_path')
-                # パス一致または名前一致（コンテキストスタックで登録されたパスを信頼）
-                if f_path and Path(f_path) == Path(self.folder_path):
-                    is_match = True
-                elif Path(p).parent == Path(self.folder_path):
-                    is_match = True
-                
-                if is_match:
-                    dest_cache[p] = d
-                    count += 1
-            return count
-
-        c1 = filter_cache(self.context.normal_template_cache, self.priority_normal_cache)
-        c2 = filter_cache(self.context.backup_template_cache, self.priority_backup_cache)
+        # キャッシュ構築時に作成済みのフォルダ別ビューを参照する
+        self.priority_normal_cache, self.priority_backup_cache = self.context.template_manager.get_folder_views(
+            self.context.template_cache_views, self.folder_path
+        )
 
     def _get_item_interval(self, path_str):
         entry = self.priority_normal_cache.get(path_str) or self.priority_backup_cache.get(path_str)
@@ -474,13 +436,13 @@ class TimerStandbyState(State):
         self.context.logger.log("log_timer_standby_started", Path(target_path).name)
 
     def handle(self, current_time, screen_data, last_match_time_map, pre_matches=None):
-        actions = self.schedule['actions']
-        pending = [a for a in actions if not a['executed']]
-        if not pending:
+        scheduler = self.context.timer_schedule_cache
+        next_action = scheduler.next_action(self.target_path) if self.target_path in scheduler else None
+        # 当日分を実行し終え、次のアクションが接近時間外（翌日など）になったら待機終了
+        if next_action is None or not scheduler.is_locked(self.target_path, current_time):
             self.context.logger.log("log_timer_standby_finished")
             self._return_to_parent_or_idle()
             return
-        next_action = pending[0]
         time_diff = next_action['target_time'] - current_time
         if time_diff <= 0:
             target_cache = {}
@@ -499,7 +461,7 @@ class TimerStandbyState(State):
                     settings_copy['click_position'] = [next_action['x'], next_action['y']]
                     best_match['settings'] = settings_copy
                 self.context._execute_click(best_match)
-                next_action['executed'] = True
+                scheduler.complete(self.target_path, current_time)
                 self.context.logger.log("log_timer_action_executed", Path(self.target_path).name)
                 time.sleep(self.schedule['sequence_interval'])
                 return
@@ -544,44 +506,27 @@ class QuickTimerStandbyState(State):
 
     def handle(self, current_time, screen_data, last_match_time_map, pre_matches=None):
         if current_time >= self.trigger_time:
-            import cv2
-            template_gray = self.entry.get("template_gray")
-            frame = self.context.latest_high_res_frame
-            if template_gray is not None and frame is not None:
-                screen_gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-                res = cv2.matchTemplate(screen_gray, template_gray, cv2.TM_CCOEFF_NORMED)
-                _minv, maxv, _minl, maxl = cv2.minMaxLoc(res)
-                if maxv >= 0.8:
-                    off_x, off_y = self.entry.get("click_offset", (0,0))
-                    click_x = maxl[0] + off_x
-                    click_y = maxl[1] + off_y
-                    self.context.logger.log("log_quick_timer_fired", str(self.slot_num))
-                    dummy_match = {
-                        'path': f"QuickTimer_{self.slot_num}",
-                        'confidence': maxv,
-                        'rect': (maxl[0], maxl[1], template_gray.shape[1], template_gray.shape[0]),
-                        'settings': {
-                            'point_click': True,
-                            'click_position': (click_x, click_y),
-                            'roi_enabled': False,
-                            'right_click': self.entry.get("right_click", False)
-                        }
-                    }
-                    rec_area = self.context.recognition_area
-                    if rec_area:
-                        rel_x = click_x
-                        rel_y = click_y
-                        dummy_match['settings']['click_position'] = (rel_x, rel_y)
-                        self.context.action_manager.execute_click(
-                            dummy_match, 
-                            self.context.recognition_area, 
-                            self.context.target_hwnd, 
-                            self.context.effective_capture_scale, 
-                            self.context.current_window_scale
-                        )
-                    self.context.remove_quick_timer(self.entry["slot"])
-                    self._return_to_parent_or_idle()
-                    return
+            processor = self.context.monitoring_processor
+            # 発火時は一度きりなので、登録位置周辺で見つからなければ全体も探索する
+            hit = processor.match_quick_timers([self.entry], screen_data[1], full_frame_fallback=True).get(self.entry.get("slot"))
+            if hit and hit[0] >= 0.8:
+                maxv, loc = hit
+                self.context.logger.log("log_quick_timer_fired", str(self.slot_num))
+                dummy_match = processor.build_quick_timer_match(self.entry, loc)
+                dummy_match['confidence'] = maxv
+                if self.context.recognition_area:
+                    # テンプレートは登録時の画面から切り出しているため、ウィンドウスケール補正は掛けない
+                    self.context.action_manager.execute_click(
+                        dummy_match, 
+                        self.context.recognition_area, 
+                        self.context.target_hwnd, 
+                        self.context.effective_capture_scale, 
+                        1.0
+                    )
+                    processor.mark_clicked()
+                self.context.remove_quick_timer(self.entry["slot"])
+                self._return_to_parent_or_idle()
+                return
             self.context.logger.log("log_quick_timer_failed_not_found", str(self.slot_num))
             self.context.remove_quick_timer(self.entry["slot"])
             self._return_to_parent_or_idle()
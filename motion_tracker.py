@@ -0,0 +1,123 @@
+# motion_tracker.py
+# ★★★ (追加) 移動するターゲットの位置を等速モデルで予測する ★★★
+"""
+アイテム（画像パス）ごとのマッチ位置を α-β フィルタ（定常カルマンフィルタ相当の等速モデル）で追跡する。
+
+- search_window(): 次フレームでの予測位置の周辺窓（まずここだけを照合し、外れたら全体を探索）
+- predict_offset(): クリック時点までの経過時間ぶんの移動量（処理遅延の補正に使う）
+
+座標はすべて縮小後フレーム基準。時刻は time.monotonic()（キャプチャ時刻）。
+"""
+
+from __future__ import annotations
+
+import os
+
+
+def _env_float(name, default):
+    try:
+        return max(0.0, float(os.environ.get(name, str(default))))
+    except ValueError:
+        return default
+
+
+# α: 位置の補正量、β: 速度の補正量（大きいほど観測に素早く追従する）
+ALPHA = 0.85
+BETA = 0.35
+# 予測窓のマージン（縮小後px）。予測からの経過時間に比例して広げる
+SEARCH_MARGIN = int(_env_float("MOTION_SEARCH_MARGIN", 32))
+# この回数続けて見つからなければ追跡をやめる
+MAX_MISSES = 3
+# これより遅い（px/秒）場合は静止とみなし、クリック位置を補正しない
+MIN_SPEED = 5.0
+# クリック位置の補正に使う経過時間の上限（秒）
+MAX_LEAD_SEC = 0.5
+
+
+class MotionTrack:
+    __slots__ = ("x", "y", "vx", "vy", "t", "w", "h", "hits", "misses")
+
+    def __init__(self, x, y, w, h, t):
+        self.x, self.y = x, y
+        self.vx, self.vy = 0.0, 0.0
+        self.w, self.h = w, h
+        self.t = t
+        self.hits = 1
+        self.misses = 0
+
+    def predict(self, t):
+        dt = t - self.t
+        return self.x + self.vx * dt, self.y + self.vy * dt
+
+    def update(self, x, y, w, h, t):
+        dt = t - self.t
+        self.w, self.h = w, h
+        self.hits += 1
+        self.misses = 0
+        if dt <= 0:
+            # 同じフレームでの再照合
+            self.x, self.y = x, y
+            return
+        px, py = self.predict(t)
+        rx, ry = x - px, y - py
+        self.x, self.y = px + ALPHA * rx, py + ALPHA * ry
+        self.vx += BETA * rx / dt
+        self.vy += BETA * ry / dt
+        self.t = t
+
+    @property
+    def speed(self) -> float:
+        return (self.vx * self.vx + self.vy * self.vy) ** 0.5
+
+
+class MotionTrackerStore:
+    def __init__(self):
+        self._tracks = {}
+
+    def get(self, key):
+        return self._tracks.get(key)
+
+    def update(self, key, rect, t):
+        """マッチ矩形 (x1, y1, x2, y2) の中心で追跡を更新します。"""
+        x1, y1, x2, y2 = rect
+        cx, cy, w, h = (x1 + x2) / 2.0, (y1 + y2) / 2.0, x2 - x1, y2 - y1
+        track = self._tracks.get(key)
+        if track is None:
+            self._tracks[key] = MotionTrack(cx, cy, w, h, t)
+        else:
+            track.update(cx, cy, w, h, t)
+
+    def miss(self, key):
+        track = self._tracks.get(key)
+        if track is None:
+            return
+        track.misses += 1
+        if track.misses >= MAX_MISSES:
+            del self._tracks[key]
+
+    def search_window(self, key, t, frame_shape):
+        """予測位置の周辺窓 (x1, y1, x2, y2) を返します。追跡が1回分しか無い（速度不明）場合は None。"""
+        track = self._tracks.get(key)
+        if track is None or track.hits < 2:
+            return None
+        px, py = track.predict(t)
+        # 経過時間に応じて不確かさが増えるため、移動量の半分を余分に確保する
+        lead = abs(t - track.t) * track.speed * 0.5
+        half_w = track.w / 2.0 + SEARCH_MARGIN + lead
+        half_h = track.h / 2.0 + SEARCH_MARGIN + lead
+        h, w = frame_shape[:2]
+        window = (max(0, int(px - half_w)), max(0, int(py - half_h)), min(w, int(px + half_w) + 1), min(h, int(py + half_h) + 1))
+        if window[2] - window[0] < track.w or window[3] - window[1] < track.h:
+            return None
+        return window
+
+    def predict_offset(self, key, now):
+        """追跡の最終観測から now までの予測移動量 (dx, dy)。静止・未追跡なら (0, 0)。"""
+        track = self._tracks.get(key)
+        if track is None or track.hits < 2 or track.speed < MIN_SPEED:
+            return 0.0, 0.0
+        dt = min(MAX_LEAD_SEC, max(0.0, now - track.t))
+        return track.vx * dt, track.vy * dt
+
+    def clear(self):
+        self._tracks.clear()
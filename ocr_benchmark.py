@@ -0,0 +1,212 @@
+# ocr_benchmark.py
+# ★★★ (追加) 登録済みOCR設定の精度・速度をスクリーンショットで一括測定するコマンド ★★★
+"""
+OCR ベンチマーク（GUI不要）。
+
+ライブラリ (~/click_pic) から OCR 設定が有効なアイテムをすべて読み込み、
+保存済みスクリーンショット上でテンプレートを探して、設定された ROI を実際の判定と同じ
+OCRRuntimeEvaluator.evaluate で読み取ります。エンジン/前処理プリセットごとに
+正解率・平均/p95レイテンシを表示します。
+
+使い方:
+  python ocr_benchmark.py <スクリーンショットフォルダ> [--all-presets] [--tesseract PATH] [--verbose]
+
+スクリーンショットフォルダには expected.json を置きます:
+  {
+    "screen_001.png": {"hp_icon.png": "1234", "folder/stamina.png": "56"},
+    ...
+  }
+キーはアイテムのファイル名、またはライブラリからの相対パス。
+スクリーンショットは認識範囲を等倍（登録時と同じウィンドウサイズ）で保存したものを想定しています。
+"""
+
+from __future__ import annotations
+
+import argparse
+import copy
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+from config import ConfigManager
+from digit_recognizer import get_digit_recognizer
+from ocr_engine import get_result_cache
+from ocr_preprocess import PREPROCESS_PRESETS
+from ocr_runtime import OCRRuntimeEvaluator
+
+# テンプレートが見つかったとみなす一致度
+MATCH_THRESHOLD = 0.8
+
+
+class _PrintLogger:
+    def log(self, message, *args, **kwargs):
+        if args:
+            message = f"{message} {' '.join(str(a) for a in args)}"
+        print(f"[LOG] {message}")
+
+
+def _read_image(path: Path):
+    return cv2.imdecode(np.fromfile(str(path), np.uint8), cv2.IMREAD_COLOR)
+
+
+def _collect_ocr_items(config_manager, item_list, out):
+    for item in item_list:
+        if item.get('type') == 'folder':
+            _collect_ocr_items(config_manager, item.get('children', []), out)
+            continue
+        path = Path(item['path'])
+        settings = config_manager.load_item_setting(path)
+        ocr_settings = settings.get('ocr_settings')
+        if isinstance(ocr_settings, dict) and ocr_settings.get('enabled', False) and ocr_settings.get('roi'):
+            out.append((path, settings))
+    return out
+
+
+def _template_for_item(path: Path, settings: dict):
+    """TemplateManager と同じく、認識ROIが有効ならテンプレートを切り出します。"""
+    img = _read_image(path)
+    if img is None:
+        return None
+    if settings.get('roi_enabled', False):
+        h, w = img.shape[:2]
+        rect = settings.get('roi_rect_variable') if settings.get('roi_mode', 'fixed') == 'variable' else settings.get('roi_rect')
+        if rect:
+            x1, y1, x2, y2 = max(0, rect[0]), max(0, rect[1]), min(w, rect[2]), min(h, rect[3])
+            if x1 < x2 and y1 < y2:
+                img = img[y1:y2, x1:x2]
+    return img
+
+
+def _percentile(values, q):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    idx = min(len(ordered) - 1, max(0, int(round(q / 100.0 * (len(ordered) - 1)))))
+    return ordered[idx]
+
+
+def _is_correct(raw_text, expected, numeric_mode):
+    if numeric_mode:
+        got = OCRRuntimeEvaluator._extract_first_number(raw_text or "")
+        try:
+            return got is not None and got == float(expected)
+        except ValueError:
+            return False
+    return (raw_text or "").strip().lower() == str(expected).strip().lower()
+
+
+def _variants(ocr_config: dict, all_presets: bool):
+    """(engine, preset) の組み合わせを返します。"""
+    presets = list(PREPROCESS_PRESETS) if all_presets else [ocr_config.get("preprocess", "global")]
+    if all_presets and not ocr_config.get("color_key"):
+        presets = [p for p in presets if p != "color_key"]
+    engines = ["tesseract"]
+    if ocr_config.get("numeric_mode", False) and get_digit_recognizer(ocr_config.get("glyph_set", "default")).is_trained:
+        engines.append("digits")
+    return [(e, p) for e in engines for p in presets]
+
+
+def run_benchmark(screenshot_dir: Path, all_presets: bool = False, verbose: bool = False):
+    expected_path = screenshot_dir / "expected.json"
+    with open(expected_path, "r", encoding="utf-8") as f:
+        expected_map = json.load(f)
+
+    config_manager = ConfigManager(_PrintLogger())
+    base_dir = config_manager.base_dir
+    items = _collect_ocr_items(config_manager, config_manager.get_hierarchical_list(None), [])
+    if not items:
+        print("No items with OCR settings found.")
+        return {}
+
+    # 同じ画像を繰り返し読むため、結果キャッシュを無効化して実際の処理時間を測る
+    get_result_cache().ttl_sec = 0
+
+    templates = {}
+    for path, settings in items:
+        templates[path] = _template_for_item(path, settings)
+
+    results = {}
+    for shot_name, expectations in expected_map.items():
+        screen = _read_image(screenshot_dir / shot_name)
+        if screen is None:
+            print(f"[WARN] Cannot read screenshot: {shot_name}")
+            continue
+        screen_gray = cv2.cvtColor(screen, cv2.COLOR_BGR2GRAY)
+
+        for path, settings in items:
+            rel = path.relative_to(base_dir).as_posix() if base_dir in path.parents else path.name
+            expected = expectations.get(rel, expectations.get(path.name))
+            if expected is None:
+                continue
+            template = templates.get(path)
+            if template is None or template.shape[0] > screen.shape[0] or template.shape[1] > screen.shape[1]:
+                continue
+            res = cv2.matchTemplate(screen_gray, cv2.cvtColor(template, cv2.COLOR_BGR2GRAY), cv2.TM_CCOEFF_NORMED)
+            _min_v, max_v, _min_l, max_l = cv2.minMaxLoc(res)
+            if max_v < MATCH_THRESHOLD:
+                print(f"[WARN] {rel} not found in {shot_name} (max={max_v:.2f})")
+                continue
+
+            base_ocr = settings['ocr_settings']
+            for engine, preset in _variants(base_ocr.get('config', {}), all_presets):
+                ocr_settings = copy.deepcopy(base_ocr)
+                ocr_settings.setdefault('config', {})
+                ocr_settings['config']['engine'] = engine
+                ocr_settings['config']['preprocess'] = preset
+
+                start = time.perf_counter()
+                _ok, _log_msg, raw_text, _conf = OCRRuntimeEvaluator.evaluate(
+                    screen, max_l, ocr_settings, item_settings=settings, current_scale=1.0, capture_scale=1.0
+                )
+                elapsed_ms = (time.perf_counter() - start) * 1000.0
+
+                correct = _is_correct(raw_text, expected, ocr_settings['config'].get('numeric_mode', False))
+                r = results.setdefault((engine, preset), {'n': 0, 'correct': 0, 'latencies': []})
+                r['n'] += 1
+                r['correct'] += int(correct)
+                r['latencies'].append(elapsed_ms)
+                if verbose:
+                    mark = "OK " if correct else "NG "
+                    print(f"  {mark}{shot_name} {rel} [{engine}/{preset}] got='{raw_text}' expected='{expected}' {elapsed_ms:.1f}ms")
+
+    return results
+
+
+def _print_report(results):
+    if not results:
+        print("No measurements.")
+        return
+    print(f"{'engine':10s} {'preset':10s} {'n':>5s} {'accuracy':>9s} {'mean':>9s} {'p95':>9s}")
+    for (engine, preset), r in sorted(results.items()):
+        lat = r['latencies']
+        mean = sum(lat) / len(lat) if lat else 0.0
+        acc = r['correct'] / r['n'] * 100.0 if r['n'] else 0.0
+        print(f"{engine:10s} {preset:10s} {r['n']:5d} {acc:8.1f}% {mean:7.1f}ms {_percentile(lat, 95):7.1f}ms")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="OCR accuracy/latency benchmark over saved screenshots")
+    parser.add_argument("screenshot_dir", help="folder containing screenshots and expected.json")
+    parser.add_argument("--all-presets", action="store_true", help="measure every preprocessing preset")
+    parser.add_argument("--tesseract", help="path to the tesseract executable")
+    parser.add_argument("--tessdata", default=str(Path.home() / "click_pic" / "tessdata"), help="tessdata directory")
+    parser.add_argument("--verbose", action="store_true", help="print every evaluation")
+    args = parser.parse_args(argv)
+
+    os.environ['TESSDATA_PREFIX'] = args.tessdata
+    if args.tesseract:
+        import pytesseract
+        pytesseract.pytesseract.tesseract_cmd = args.tesseract
+
+    results = run_benchmark(Path(args.screenshot_dir), all_presets=args.all_presets, verbose=args.verbose)
+    _print_report(results)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,325 @@
+# ocr_engine.py
+# ★★★ (改善) OCRごとに tesseract プロセスを起動せず、常駐エンジンを使い回す ★★★
+"""
+OCR エンジンプール。
+
+- tesserocr (libtesseract の in-process バインディング) が使える場合は、
+  (言語, PSM, 数字モード) ごとに PyTessBaseAPI を常駐させて再利用する。
+  言語データの読み込みは初回のみで、以降はプロセス起動・一時ファイル・TSV解析が不要になる。
+- tesserocr が無い環境では pytesseract (プロセス起動) にフォールバックする。
+- 呼び出しごとのレイテンシを記録し、get_stats() で参照できる（監視停止時にログへ出力。監視開始時に reset_stats()）。
+- OCRResultCache: 前処理済み画像のハッシュ + 言語/設定 をキーにした LRU + TTL キャッシュ。
+  HPや数値表示のように同じ値が続く場合、同一クロップはエンジンを呼ばずに即座に結果を返す。
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import queue
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional, Tuple
+
+import numpy as np
+import pytesseract
+from pytesseract import Output
+from PIL import Image
+
+TESSEROCR_AVAILABLE = False
+try:
+    import tesserocr
+    TESSEROCR_AVAILABLE = True
+except ImportError:
+    tesserocr = None
+
+NUMERIC_WHITELIST = "0123456789.-"
+
+# アプリの Logger（main.py で set_logger() により登録。未登録時は標準出力へ）
+_logger = None
+
+
+def set_logger(logger):
+    """OCR 系モジュール（ocr_engine / digit_recognizer）の警告を出力する Logger を登録します。"""
+    global _logger
+    _logger = logger
+
+
+def log(message: str, *args):
+    if _logger is not None:
+        _logger.log(message, *args)
+    else:
+        print(message % args if args else message)
+
+
+class OCREnginePool:
+    """
+    スレッドセーフな OCR エンジンプール。
+    PyTessBaseAPI はスレッド間で共有できないため、キーごとにキューで貸し出す。
+    """
+
+    def __init__(self, max_engines_per_key: int = 2):
+        self.max_engines_per_key = max(1, int(max_engines_per_key))
+        self._lock = threading.Lock()
+        self._engines: Dict[tuple, queue.Queue] = {}
+        self._engine_counts: Dict[tuple, int] = {}
+        self._all_engines = []
+        self._failed_keys = set()
+        self._stats = {}
+
+    @property
+    def backend(self) -> str:
+        return "tesserocr" if TESSEROCR_AVAILABLE else "pytesseract"
+
+    # ------------------------------------------------------------------
+    # エンジン管理
+    # ------------------------------------------------------------------
+    def _create_engine(self, key):
+        lang, psm, numeric_mode = key
+        kwargs = {'lang': lang, 'psm': psm}
+        tessdata = os.environ.get('TESSDATA_PREFIX')
+        if tessdata:
+            kwargs['path'] = tessdata
+        api = tesserocr.PyTessBaseAPI(**kwargs)
+        if numeric_mode:
+            api.SetVariable("tessedit_char_whitelist", NUMERIC_WHITELIST)
+        return api
+
+    def _acquire(self, key):
+        with self._lock:
+            if key in self._failed_keys:
+                return None
+            q = self._engines.setdefault(key, queue.Queue())
+            try:
+                return q.get_nowait()
+            except queue.Empty:
+                pass
+            can_create = self._engine_counts.get(key, 0) < self.max_engines_per_key
+            if can_create:
+                self._engine_counts[key] = self._engine_counts.get(key, 0) + 1
+
+        if can_create:
+            try:
+                api = self._create_engine(key)
+            except Exception as e:
+                log("[OCR WARN] tesserocr engine init failed for %s: %s. Falling back to pytesseract.", key, e)
+                with self._lock:
+                    self._engine_counts[key] -= 1
+                    self._failed_keys.add(key)
+                return None
+            with self._lock:
+                self._all_engines.append(api)
+            return api
+
+        # 上限に達している場合は返却を待つ
+        return q.get()
+
+    def _release(self, key, api):
+        if api is None:
+            return
+        with self._lock:
+            q = self._engines.get(key)
+        if q is not None:
+            q.put(api)
+
+    def warmup(self, langs: Iterable[str], numeric_modes: Iterable[bool] = (False, True), psm: int = 7):
+        """起動時に言語ごとのエンジンを作成しておき、初回OCRの待ち時間をなくす。"""
+        if not TESSEROCR_AVAILABLE:
+            return
+        for lang in langs:
+            for numeric_mode in numeric_modes:
+                key = (lang, psm, bool(numeric_mode))
+                api = self._acquire(key)
+                self._release(key, api)
+
+    def warmup_async(self, langs: Iterable[str], **kwargs):
+        langs = list(langs)
+        thread = threading.Thread(target=self.warmup, args=(langs,), kwargs=kwargs, daemon=True)
+        thread.start()
+        return thread
+
+    def shutdown(self):
+        with self._lock:
+            engines, self._all_engines = self._all_engines, []
+            self._engines.clear()
+            self._engine_counts.clear()
+        for api in engines:
+            try:
+                api.End()
+            except Exception:
+                pass
+
+    # ------------------------------------------------------------------
+    # 認識
+    # ------------------------------------------------------------------
+    def recognize(self, binary_img: np.ndarray, lang: str = "eng", numeric_mode: bool = False, psm: int = 7) -> Tuple[str, float, float]:
+        """
+        前処理済み画像を認識します。
+        Returns:
+            str: 単語を連結した生テキスト
+            float: 単語信頼度の平均 (0.0 - 100.0)
+            float: 処理時間 (ms)
+        """
+        start = time.perf_counter()
+        pil_img = Image.fromarray(binary_img)
+        pil_img.info['dpi'] = (72, 72)
+
+        key = (lang, int(psm), bool(numeric_mode))
+        api = self._acquire(key) if TESSEROCR_AVAILABLE else None
+        if api is not None:
+            backend = "tesserocr"
+            try:
+                api.SetImage(pil_img)
+                text = api.GetUTF8Text() or ""
+                confidences = [c for c in api.AllWordConfidences() if c > -1]
+            finally:
+                self._release(key, api)
+            raw_text = "".join(text.split())
+        else:
+            backend = "pytesseract"
+            custom_config = f'--psm {int(psm)}'
+            if numeric_mode:
+                custom_config += f' -c tessedit_char_whitelist={NUMERIC_WHITELIST}'
+            data = pytesseract.image_to_data(pil_img, lang=lang, config=custom_config, output_type=Output.DICT)
+            valid_texts = []
+            confidences = []
+            for txt, conf in zip(data['text'], data['conf']):
+                if int(float(conf)) > -1:
+                    txt = txt.strip()
+                    if txt:
+                        valid_texts.append(txt)
+                        confidences.append(int(float(conf)))
+            raw_text = "".join(valid_texts)
+
+        avg_conf = sum(confidences) / len(confidences) if confidences else 0.0
+        elapsed_ms = (time.perf_counter() - start) * 1000.0
+        self._record(backend, elapsed_ms)
+        return raw_text, avg_conf, elapsed_ms
+
+    def _record(self, backend: str, elapsed_ms: float):
+        with self._lock:
+            s = self._stats.setdefault(backend, {'calls': 0, 'total_ms': 0.0, 'max_ms': 0.0, 'last_ms': 0.0})
+            s['calls'] += 1
+            s['total_ms'] += elapsed_ms
+            s['last_ms'] = elapsed_ms
+            s['max_ms'] = max(s['max_ms'], elapsed_ms)
+
+    def reset_stats(self):
+        with self._lock:
+            self._stats = {}
+
+    def get_stats(self) -> dict:
+        """バックエンドごとの {calls, avg_ms, max_ms, last_ms} を返します。"""
+        with self._lock:
+            return {
+                backend: {
+                    'calls': s['calls'],
+                    'avg_ms': s['total_ms'] / s['calls'] if s['calls'] else 0.0,
+                    'max_ms': s['max_ms'],
+                    'last_ms': s['last_ms'],
+                }
+                for backend, s in self._stats.items()
+            }
+
+
+class OCRResultCache:
+    """
+    前処理済み二値画像の内容ハッシュをキーにした OCR 結果キャッシュ（LRU + TTL）。
+    値は (raw_text, avg_conf)。
+    """
+
+    def __init__(self, max_entries: int = 256, ttl_sec: float = 10.0):
+        self.max_entries = max(1, int(max_entries))
+        self.ttl_sec = float(ttl_sec)
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[tuple, tuple]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+
+    @staticmethod
+    def make_key(binary_img: np.ndarray, lang: str, numeric_mode: bool, psm: int) -> tuple:
+        img = np.ascontiguousarray(binary_img)
+        digest = hashlib.blake2b(img.data, digest_size=16).digest()
+        return (digest, img.shape, lang, bool(numeric_mode), int(psm))
+
+    def get(self, key) -> Optional[Tuple[str, float]]:
+        if self.ttl_sec <= 0:
+            return None
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            stored_at, value = entry
+            if now - stored_at > self.ttl_sec:
+                del self._entries[key]
+                self.expired += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, raw_text: str, avg_conf: float):
+        if self.ttl_sec <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic(), (raw_text, avg_conf))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def reset_stats(self):
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+            self.expired = 0
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'hits': self.hits,
+                'misses': self.misses,
+                'expired': self.expired,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+            }
+
+
+_engine_pool = None
+_engine_pool_lock = threading.Lock()
+_result_cache = None
+
+
+def get_engine_pool() -> OCREnginePool:
+    """プロセス共通のエンジンプールを返します。"""
+    global _engine_pool
+    with _engine_pool_lock:
+        if _engine_pool is None:
+            _engine_pool = OCREnginePool()
+        return _engine_pool
+
+
+def get_result_cache() -> OCRResultCache:
+    """プロセス共通の OCR 結果キャッシュを返します（環境変数 OCR_CACHE_TTL_SEC / OCR_CACHE_SIZE で調整）。"""
+    global _result_cache
+    with _engine_pool_lock:
+        if _result_cache is None:
+            try:
+                ttl = float(os.environ.get("OCR_CACHE_TTL_SEC", "10"))
+            except ValueError:
+                ttl = 10.0
+            try:
+                size = int(os.environ.get("OCR_CACHE_SIZE", "256"))
+            except ValueError:
+                size = 256
+            _result_cache = OCRResultCache(max_entries=size, ttl_sec=ttl)
+        return _result_cache
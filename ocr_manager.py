@@ -4,7 +4,6 @@
 import os
 import sys
 import re
-import cv2
 import numpy as np
 import requests
 import pytesseract
@@ -14,6 +13,8 @@ from pathlib import Path
 from PySide6.QtCore import QObject, QThread, Signal
 import shutil
 
+from ocr_preprocess import compile_pipeline
+
 # --- Windows用: Tesseract実行ファイルの自動探索 ---
 if sys.platform == 'win32':
     if shutil.which('tesseract') is None:
@@ -59,6 +60,11 @@ class OCRConfig:
         self.lang = "eng"
         self.numeric_mode = False
         self.psm = 7 
+        # 数値モードの認識エンジン: "tesseract" または "digits"（学習済み数字テンプレート）
+        self.engine = "tesseract"
+        # 前処理プリセット（ocr_preprocess.PREPROCESS_PRESETS）と文字色キー
+        self.preprocess = "global"
+        self.color_key = None
 
 class OCRWorker(QThread):
     finished = Signal(str, object, object)
@@ -127,17 +133,8 @@ class OCRWorker(QThread):
         else:
             crop_img = self.image.copy()
 
-        if len(crop_img.shape) == 3: gray = cv2.cvtColor(crop_img, cv2.COLOR_BGR2GRAY)
-        else: gray = crop_img
-
-        if self.config.scale > 1.0:
-            gray = cv2.resize(gray, None, fx=self.config.scale, fy=self.config.scale, interpolation=cv2.INTER_CUBIC)
-
-        if self.config.invert: gray = cv2.bitwise_not(gray)
-
-        _, binary = cv2.threshold(gray, self.config.threshold, 255, cv2.THRESH_BINARY)
-        
-        return binary
+        # ★★★ (改善) ランタイム判定（OCRRuntimeEvaluator）と同じ共通パイプラインを使用 ★★★
+        return compile_pipeline(self.config)(crop_img)
 
     def _extract_first_number(self, text: str):
         try:
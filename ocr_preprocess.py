@@ -0,0 +1,209 @@
+# ocr_preprocess.py
+# ★★★ (追加) OCR前処理パイプラインを共通化し、設定ごとに一度だけ組み立てる ★★★
+"""
+OCR 前処理パイプライン。
+
+OCRRuntimeEvaluator（監視中の判定）と OCRWorker（設定ダイアログのテスト）で
+同じ前処理を使うための共通モジュール。
+
+設定（ocr_settings['config'] または OCRConfig）で使用するキー:
+  scale      : 拡大倍率（>1.0 のとき拡大）
+  threshold  : 固定しきい値（threshold_mode == "global" のとき）
+  invert     : 色反転
+  preprocess : プリセット名（PREPROCESS_PRESETS）。未指定は従来どおり "global"
+  color_key  : {"bgr": [b, g, r], "tolerance": 40}  プリセット "color_key" 用の文字色
+
+compile_pipeline(config) は設定値の組をキーにキャッシュされるため、
+設定が変わらない限り毎回の組み立てコストは発生しない。
+
+ベンチマーク:
+  python ocr_preprocess.py <サンプルフォルダ> [lang]
+  サンプルは "<正解テキスト>_任意.png" の形式（例: 1234_hp.png）
+"""
+
+from __future__ import annotations
+
+import functools
+import sys
+import time
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+# プリセット: 各段の設定値（config 側の値で上書きされない部分）
+PREPROCESS_PRESETS = {
+    # 従来の処理: グレー → 拡大 → (反転) → 固定しきい値
+    "global": {"threshold_mode": "global", "morph": None},
+    # 大津の二値化: 背景の明るさが変わってもしきい値調整が不要
+    "otsu": {"threshold_mode": "otsu", "morph": None},
+    # 適応的二値化: グラデーション背景や影のある数字向け
+    "adaptive": {"threshold_mode": "adaptive", "adaptive_block": 31, "adaptive_c": 10, "morph": None},
+    # 大津 + オープニング: 細かいノイズの除去
+    "clean": {"threshold_mode": "otsu", "morph": "open", "morph_kernel": 2},
+    # 文字色キー: 指定色に近い画素のみを文字として抽出（カラフルな背景向け）
+    "color_key": {"threshold_mode": "color_key", "morph": "close", "morph_kernel": 2},
+}
+
+MORPH_OPS = {
+    "open": cv2.MORPH_OPEN,
+    "close": cv2.MORPH_CLOSE,
+    "dilate": cv2.MORPH_DILATE,
+    "erode": cv2.MORPH_ERODE,
+}
+
+
+def _config_value(config, key, default):
+    if isinstance(config, dict):
+        return config.get(key, default)
+    return getattr(config, key, default)
+
+
+def pipeline_key(config) -> tuple:
+    """パイプラインを一意に決める設定値の組（キャッシュキー）。"""
+    color_key = _config_value(config, "color_key", None) or {}
+    bgr = tuple(int(v) for v in color_key.get("bgr", (255, 255, 255)))
+    return (
+        str(_config_value(config, "preprocess", "global") or "global"),
+        float(_config_value(config, "scale", 2.0)),
+        int(_config_value(config, "threshold", 128)),
+        bool(_config_value(config, "invert", False)),
+        bgr,
+        int(color_key.get("tolerance", 40)),
+    )
+
+
+def compile_pipeline(config):
+    """設定から前処理関数 (BGR/グレー画像 -> 二値画像) を返します。"""
+    return _compile(pipeline_key(config))
+
+
+@functools.lru_cache(maxsize=64)
+def _compile(key):
+    preset_name, scale, threshold, invert, key_bgr, key_tol = key
+    preset = PREPROCESS_PRESETS.get(preset_name, PREPROCESS_PRESETS["global"])
+    mode = preset.get("threshold_mode", "global")
+
+    stages = []
+
+    if mode == "color_key":
+        lower = np.array([max(0, c - key_tol) for c in key_bgr], dtype=np.uint8)
+        upper = np.array([min(255, c + key_tol) for c in key_bgr], dtype=np.uint8)
+
+        def color_key_stage(img):
+            if img.ndim == 2:
+                img = cv2.cvtColor(img, cv2.COLOR_GRAY2BGR)
+            # 文字色の画素を黒、それ以外を白（Tesseract向けの黒文字）
+            return cv2.bitwise_not(cv2.inRange(img, lower, upper))
+        stages.append(color_key_stage)
+        if scale > 1.0:
+            stages.append(lambda img: cv2.resize(img, None, fx=scale, fy=scale, interpolation=cv2.INTER_NEAREST))
+        if invert:
+            stages.append(cv2.bitwise_not)
+    else:
+        def gray_stage(img):
+            return cv2.cvtColor(img, cv2.COLOR_BGR2GRAY) if img.ndim == 3 else img
+        stages.append(gray_stage)
+        if scale > 1.0:
+            stages.append(lambda img: cv2.resize(img, None, fx=scale, fy=scale, interpolation=cv2.INTER_CUBIC))
+        if invert:
+            stages.append(cv2.bitwise_not)
+
+        if mode == "otsu":
+            stages.append(lambda img: cv2.threshold(img, 0, 255, cv2.THRESH_BINARY | cv2.THRESH_OTSU)[1])
+        elif mode == "adaptive":
+            block = int(preset.get("adaptive_block", 31)) | 1
+            c = float(preset.get("adaptive_c", 10))
+            stages.append(lambda img: cv2.adaptiveThreshold(
+                img, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY, block, c))
+        else:
+            stages.append(lambda img: cv2.threshold(img, threshold, 255, cv2.THRESH_BINARY)[1])
+
+    morph = preset.get("morph")
+    if morph in MORPH_OPS:
+        size = max(1, int(preset.get("morph_kernel", 2)))
+        kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (size, size))
+        op = MORPH_OPS[morph]
+        stages.append(lambda img: cv2.morphologyEx(img, op, kernel))
+
+    stages = tuple(stages)
+
+    def run(img: np.ndarray) -> np.ndarray:
+        for stage in stages:
+            img = stage(img)
+        return img
+
+    return run
+
+
+# ----------------------------------------------------------------------
+# ベンチマーク
+# ----------------------------------------------------------------------
+def load_samples(sample_dir):
+    """「<正解>_xxx.png」形式の画像を [(label, BGR画像, ファイル名), ...] で返します。"""
+    samples = []
+    for path in sorted(Path(sample_dir).iterdir()):
+        if path.suffix.lower() not in (".png", ".jpg", ".jpeg", ".bmp"):
+            continue
+        img = cv2.imdecode(np.fromfile(str(path), np.uint8), cv2.IMREAD_COLOR)
+        if img is None:
+            continue
+        samples.append((path.stem.split("_")[0], img, path.name))
+    return samples
+
+
+def benchmark_presets(samples, base_config: dict, recognize=None, presets=None):
+    """
+    プリセットごとに前処理時間と認識精度を測定します。
+    recognize: 二値画像 -> テキスト の関数（None の場合は速度のみ）
+    Returns: {preset: {'mean_ms', 'max_ms', 'accuracy'}}
+    """
+    results = {}
+    for name in (presets or PREPROCESS_PRESETS.keys()):
+        cfg = dict(base_config, preprocess=name)
+        pipeline = compile_pipeline(cfg)
+        times = []
+        correct = 0
+        for label, img, _name in samples:
+            start = time.perf_counter()
+            binary = pipeline(img)
+            times.append((time.perf_counter() - start) * 1000.0)
+            if recognize is not None and recognize(binary) == label:
+                correct += 1
+        results[name] = {
+            'mean_ms': sum(times) / len(times) if times else 0.0,
+            'max_ms': max(times) if times else 0.0,
+            'accuracy': (correct / len(samples)) if (recognize is not None and samples) else None,
+        }
+    return results
+
+
+def _main(argv):
+    if len(argv) < 2:
+        print("usage: python ocr_preprocess.py <sample_dir> [lang]")
+        return 1
+    samples = load_samples(argv[1])
+    if not samples:
+        print(f"No samples in {argv[1]}")
+        return 1
+    lang = argv[2] if len(argv) > 2 else "eng"
+    numeric = all(label.replace(".", "").replace("-", "").isdigit() for label, _img, _n in samples)
+
+    recognize = None
+    try:
+        from ocr_engine import get_engine_pool
+        pool = get_engine_pool()
+        recognize = lambda binary: pool.recognize(binary, lang=lang, numeric_mode=numeric)[0]
+    except Exception as e:
+        print(f"[WARN] OCR engine unavailable, measuring speed only: {e}")
+
+    results = benchmark_presets(samples, {"scale": 2.0, "threshold": 128, "invert": False}, recognize)
+    print(f"{len(samples)} samples, lang={lang}, numeric={numeric}")
+    for name, r in results.items():
+        acc = "-" if r['accuracy'] is None else f"{r['accuracy'] * 100:.1f}%"
+        print(f"{name:10s} mean={r['mean_ms']:.3f}ms max={r['max_ms']:.3f}ms accuracy={acc}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(_main(sys.argv))
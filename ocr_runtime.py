@@ -5,12 +5,16 @@ import cv2
 import re
 import os
 import sys
+import time
 import numpy as np
-import pytesseract
 from datetime import datetime
 from pathlib import Path
-from pytesseract import Output
-from PIL import Image
+
+from ocr_engine import get_engine_pool, get_result_cache
+from digit_recognizer import get_digit_recognizer
+from ocr_preprocess import compile_pipeline
+from ocr_trend import get_trend_store, TREND_WINDOW_SEC
+from tracing import TRACE, trace
 
 # Windows API用
 if sys.platform == 'win32':
@@ -52,8 +56,12 @@ class OCRRuntimeEvaluator:
         return 0, 0
 
     @staticmethod
-    def evaluate(screen_image: np.ndarray, parent_pos: tuple, ocr_settings: dict, item_settings: dict = None, current_scale: float = 1.0, capture_scale: float = 1.0, hwnd=None, capture_method: str = 'mss') -> tuple[bool, str, str, float]:
+    def evaluate(screen_image: np.ndarray, parent_pos: tuple, ocr_settings: dict, item_settings: dict = None, current_scale: float = 1.0, capture_scale: float = 1.0, hwnd=None, capture_method: str = 'mss', trend_key=None, sample_time: float = None) -> tuple[bool, str, str, float]:
         """
+        trend_key: 指定すると数値モードの読み取り値を時系列として記録し、
+                   condition['source'] が smoothed / rate の条件を判定できるようにする
+        sample_time: 読み取り値の時刻（キャプチャ時刻。未指定は現在時刻）
+
         Returns:
             bool: 条件合致(True/False)
             str: ログメッセージ
@@ -115,7 +123,9 @@ class OCRRuntimeEvaluator:
 
         roi_info = f"[ROI: P({px},{py}) Offset(-{roi_offset_x}, -{roi_offset_y}) Scale({current_scale:.3f}) -> ({x1},{y1})-({x2},{y2})]"
 
-        # DEBUG_OCR_COORDS が無効のため出力を停止
+        if TRACE.ocr:
+            trace("ocr", "ocr_roi", parent=(px, py), offset=(roi_offset_x, roi_offset_y),
+                  scale=round(current_scale, 4), crop=(x1, y1, x2, y2), method=capture_method)
 
         if x1 >= x2 or y1 >= y2:
             return False, f"OCR Error: Invalid ROI {roi_info}", "", 0.0
@@ -152,32 +162,35 @@ class OCRRuntimeEvaluator:
 
         try:
             lang = config.get("lang", "eng")
-            custom_config = '--psm 7'
-            
             is_numeric_mode = config.get("numeric_mode", False)
-            if is_numeric_mode:
-                custom_config += ' -c tessedit_char_whitelist=0123456789.-'
 
-            pil_img = Image.fromarray(processed_img)
-            pil_img.info['dpi'] = (72, 72)
-            
-            data = pytesseract.image_to_data(pil_img, lang=lang, config=custom_config, output_type=Output.DICT)
-            
-            valid_texts = []
-            confidences = []
-            
-            n_boxes = len(data['text'])
-            for i in range(n_boxes):
-                if int(data['conf'][i]) > -1:
-                    txt = data['text'][i].strip()
-                    if txt:
-                        valid_texts.append(txt)
-                        confidences.append(int(data['conf'][i]))
-            
-            raw_text = "".join(valid_texts)
-            avg_conf = sum(confidences) / len(confidences) if confidences else 0.0
+            # ★★★ (追加) 数値モードで数字テンプレート認識が選ばれていれば Tesseract を使わない ★★★
+            digit_recognizer = None
+            if is_numeric_mode and config.get("engine") == "digits":
+                digit_recognizer = get_digit_recognizer(config.get("glyph_set", "default"))
+                if not digit_recognizer.is_trained:
+                    digit_recognizer = None  # 未学習なら Tesseract にフォールバック
+
+            if digit_recognizer is not None:
+                raw_text, avg_conf, engine_ms = digit_recognizer.recognize(processed_img)
+                engine_label = f"digits {engine_ms:.2f}ms"
+            else:
+                # ★★★ (改善) 同一クロップ（前処理後）の結果はキャッシュから返す ★★★
+                result_cache = get_result_cache()
+                cache_key = result_cache.make_key(processed_img, lang, is_numeric_mode, 7)
+                cached = result_cache.get(cache_key)
+                if cached is not None:
+                    raw_text, avg_conf = cached
+                    engine_label = "cached"
+                else:
+                    # ★★★ (改善) 常駐エンジンプールで認識（tesserocr が無い場合は pytesseract） ★★★
+                    raw_text, avg_conf, engine_ms = get_engine_pool().recognize(
+                        processed_img, lang=lang, numeric_mode=is_numeric_mode, psm=7
+                    )
+                    result_cache.put(cache_key, raw_text, avg_conf)
+                    engine_label = f"{engine_ms:.0f}ms"
             
-            log_text_display = f"'{raw_text}'(Conf:{avg_conf:.0f})"
+            log_text_display = f"'{raw_text}'(Conf:{avg_conf:.0f}, {engine_label})"
             
             MIN_CONFIDENCE = 40
             if avg_conf < MIN_CONFIDENCE and raw_text:
@@ -194,8 +207,8 @@ class OCRRuntimeEvaluator:
         operator = OCRRuntimeEvaluator._normalize_operator(operator_raw, is_numeric_mode)
         
         # ★★★ デバッグ: 演算子の正規化結果をログに出力 ★★★
-        if DEBUG_OCR_COORDS and operator_raw != operator:
-            print(f"[OCR DEBUG] Operator normalized: '{operator_raw}' -> '{operator}' (numeric_mode={is_numeric_mode})")
+        if TRACE.ocr and operator_raw != operator:
+            trace("ocr", "operator_normalized", raw=operator_raw, operator=operator, numeric_mode=is_numeric_mode)
 
         if is_numeric_mode:
             numeric_val = OCRRuntimeEvaluator._extract_first_number(raw_text)
@@ -212,13 +225,31 @@ class OCRRuntimeEvaluator:
             if not operator or operator not in [">=", "<=", "==", "!=", ">", "<"]:
                 return False, f"Config Error: Invalid operator '{operator_raw}' (normalized: '{operator}')", raw_text, avg_conf
 
+            # ★★★ (追加) 読み取り値を時系列に記録し、平滑値/変化速度での判定に対応 ★★★
+            source = condition.get("source", "value") or "value"
+            compared_val = numeric_val
+            if trend_key is not None:
+                now = sample_time if sample_time is not None else time.time()
+                trend_store = get_trend_store()
+                trend_store.record(trend_key, now, numeric_val)
+                if source in ("smoothed", "rate"):
+                    try:
+                        window_sec = float(condition.get("window_sec") or TREND_WINDOW_SEC)
+                    except (TypeError, ValueError):
+                        window_sec = TREND_WINDOW_SEC
+                    compared_val = trend_store.value_for(trend_key, source, now, window_sec)
+                    if compared_val is None:
+                        return False, f"OCR Trend: Not enough samples for {source} ({numeric_val:g})", raw_text, avg_conf
+            elif source in ("smoothed", "rate"):
+                return False, f"OCR Trend: No history for {source} ({numeric_val:g})", raw_text, avg_conf
+
             result = False
-            if operator == ">=": result = (numeric_val >= target_val)
-            elif operator == "<=": result = (numeric_val <= target_val)
-            elif operator == "==": result = (numeric_val == target_val)
-            elif operator == "!=": result = (numeric_val != target_val)
-            elif operator == ">": result = (numeric_val > target_val)
-            elif operator == "<": result = (numeric_val < target_val)
+            if operator == ">=": result = (compared_val >= target_val)
+            elif operator == "<=": result = (compared_val <= target_val)
+            elif operator == "==": result = (compared_val == target_val)
+            elif operator == "!=": result = (compared_val != target_val)
+            elif operator == ">": result = (compared_val > target_val)
+            elif operator == "<": result = (compared_val < target_val)
             else:
                 # ★★★ 追加: 想定外の演算子の場合はFalseを返す（安全性のため） ★★★
                 return False, f"Config Error: Unsupported operator '{operator}'", raw_text, avg_conf
@@ -232,7 +263,11 @@ class OCRRuntimeEvaluator:
             disp_numeric = fmt_num(numeric_val)
             disp_target = fmt_num(target_val)
             
-            log_msg = f"OCR Comp: {disp_numeric} {operator} {disp_target} -> {status} [Conf:{avg_conf:.0f}]"
+            if source in ("smoothed", "rate"):
+                unit = "/s" if source == "rate" else ""
+                log_msg = f"OCR Comp: {source}={compared_val:.2f}{unit} (now {disp_numeric}) {operator} {disp_target} -> {status} [Conf:{avg_conf:.0f}]"
+            else:
+                log_msg = f"OCR Comp: {disp_numeric} {operator} {disp_target} -> {status} [Conf:{avg_conf:.0f}]"
             # -----------------------------------------------------------
             
             return result, log_msg, raw_text, avg_conf
@@ -269,16 +304,8 @@ class OCRRuntimeEvaluator:
 
     @staticmethod
     def _preprocess_image(img: np.ndarray, config: dict) -> np.ndarray:
-        scale = config.get("scale", 2.0)
-        threshold = config.get("threshold", 128)
-        invert = config.get("invert", False)
-        if len(img.shape) == 3: gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
-        else: gray = img
-        if scale > 1.0:
-            gray = cv2.resize(gray, None, fx=scale, fy=scale, interpolation=cv2.INTER_CUBIC)
-        if invert: gray = cv2.bitwise_not(gray)
-        _, binary = cv2.threshold(gray, threshold, 255, cv2.THRESH_BINARY)
-        return binary
+        # ★★★ (改善) 共通パイプライン（設定ごとに一度だけ組み立て、OCRWorkerと共有） ★★★
+        return compile_pipeline(config)(img)
 
     @staticmethod
     def _extract_first_number(text: str):
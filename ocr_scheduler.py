@@ -0,0 +1,160 @@
+# ocr_scheduler.py
+# ★★★ (改善) OCRタスクの投入・重複排除・キャンセルを一元管理する ★★★
+"""
+監視ループ用の OCR スケジューラ。
+
+- パスごとに実行中/完了済みの OCR を1つだけ保持し、状態 (Idle / Priority / Sequence) をまたいで再利用する
+- 常駐エンジン (tesserocr) がある場合、同一フレームの要求はまとめて1つのワーカータスクで評価する。
+  pytesseract へのフォールバック時は ROI ごとに別プロセスになるため、従来どおり要求ごとに並列で投入する
+- マッチが一定時間見えなくなったパスは、未開始ならキャンセルして回収し、実行中なら結果を破棄する
+
+状態は CoreEngine の ocr_futures / ocr_results / ocr_start_times を共有して保持するため、
+既存の結果参照コードはそのまま動作する。
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+import time
+from concurrent.futures import Future
+
+from ocr_engine import get_engine_pool
+
+
+def _env_float(name, default):
+    try:
+        return max(0.0, float(os.environ.get(name, str(default))))
+    except ValueError:
+        return default
+
+
+class OCRScheduler:
+    # マッチが見えなくなってから OCR を破棄するまでの猶予
+    LOSS_GRACE_SEC = _env_float("OCR_LOSS_GRACE_SEC", 0.5)
+    # 完了済みの結果を、新しい検出サイクルで再利用できる期間
+    REUSE_MAX_AGE_SEC = _env_float("OCR_REUSE_MAX_AGE_SEC", 1.0)
+
+    def __init__(self, core, evaluate):
+        self.core = core
+        self._evaluate = evaluate
+        self._pending = []
+        self._last_seen = {}
+        self._done_at = {}
+        self._lock = threading.Lock()
+        self.stats = {'submitted': 0, 'reused': 0, 'reclaimed': 0, 'discarded': 0}
+
+    # ------------------------------------------------------------------
+    # 参照
+    # ------------------------------------------------------------------
+    def touch(self, paths, now):
+        """このフレームで見えているパスを記録します（キャンセル判定用）。"""
+        for path in paths:
+            self._last_seen[path] = now
+
+    def can_reuse(self, path, now) -> bool:
+        """実行中、または十分新しい完了済み結果があれば True（新規投入は不要）。"""
+        core = self.core
+        future = core.ocr_futures.get(path)
+        if future is None and path not in core.ocr_results:
+            return False
+        if future is not None and not future.done():
+            self.stats['reused'] += 1
+            return True
+        done_at = self._done_at.get(path)
+        if done_at is not None and now - done_at <= self.REUSE_MAX_AGE_SEC:
+            self.stats['reused'] += 1
+            return True
+        # 古い結果は使わない（値が変わっている可能性がある）
+        self.cancel(path)
+        return False
+
+    def get_stats(self) -> dict:
+        return dict(self.stats, in_flight=len(self.core.ocr_futures), pending=len(self._pending))
+
+    # ------------------------------------------------------------------
+    # 投入
+    # ------------------------------------------------------------------
+    def submit(self, path, request, now) -> Future:
+        future = Future()
+        future.add_done_callback(lambda f, p=path: self._on_done(p, f))
+        with self._lock:
+            self._pending.append((path, request, future))
+        self.core.ocr_futures[path] = future
+        self.core.ocr_start_times[path] = now
+        self._last_seen[path] = now
+        self.stats['submitted'] += 1
+        return future
+
+    def _on_done(self, path, future):
+        if self.core.ocr_futures.get(path) is future:
+            self._done_at[path] = time.time()
+
+    def _run(self, items):
+        for _path, request, future in items:
+            # キャンセル済み（マッチ消失）の要求は実行しない
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                future.set_result(self._evaluate(**request))
+            except Exception as e:
+                future.set_exception(e)
+
+    def flush(self):
+        """
+        溜まった要求を投入します。常駐エンジンがある場合は1つのワーカータスクで順に評価し、
+        無い場合（ROI ごとに tesseract プロセスを起動する）は要求ごとに投入して並列に実行します。
+        """
+        with self._lock:
+            batch, self._pending = self._pending, []
+        if not batch:
+            return
+
+        if get_engine_pool().backend == "tesserocr":
+            tasks = [batch]
+        else:
+            tasks = [[item] for item in batch]
+        for i, items in enumerate(tasks):
+            try:
+                self.core.thread_pool.submit(self._run, items)
+            except RuntimeError as e:
+                # スレッドプール停止中（終了処理中など）
+                for rest in tasks[i:]:
+                    for _path, _request, future in rest:
+                        if future.set_running_or_notify_cancel():
+                            future.set_exception(e)
+                break
+
+    # ------------------------------------------------------------------
+    # キャンセル
+    # ------------------------------------------------------------------
+    def cancel(self, path):
+        """パスの OCR を破棄します。未開始ならキャンセルして回収します。"""
+        core = self.core
+        future = core.ocr_futures.pop(path, None)
+        if future is not None and not future.done():
+            if future.cancel():
+                self.stats['reclaimed'] += 1
+            else:
+                self.stats['discarded'] += 1
+        with self._lock:
+            self._pending = [item for item in self._pending if item[0] != path]
+        core.ocr_results.pop(path, None)
+        core.ocr_start_times.pop(path, None)
+        self._done_at.pop(path, None)
+
+    def sweep(self, now):
+        """一定時間マッチしていないパスの OCR を破棄します。"""
+        core = self.core
+        tracked = set(core.ocr_futures) | set(core.ocr_results)
+        for path in tracked:
+            if now - self._last_seen.get(path, 0) > self.LOSS_GRACE_SEC:
+                self.cancel(path)
+        # 見失ったまま OCR も無いパスの記録は捨てる
+        for path in [p for p, t in self._last_seen.items() if now - t > self.LOSS_GRACE_SEC and p not in tracked]:
+            del self._last_seen[path]
+
+    def clear(self):
+        for path in list(set(self.core.ocr_futures) | set(self.core.ocr_results)):
+            self.cancel(path)
+        self._last_seen.clear()
@@ -11,13 +11,17 @@ from PySide6.QtWidgets import (
     QDialog, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, 
     QSlider, QComboBox, QCheckBox, QGroupBox, QTextEdit, 
     QMessageBox, QWidget, QSizePolicy, QLineEdit, QFormLayout,
-    QScrollArea, QFrame, QGridLayout, QSplitter
+    QScrollArea, QFrame, QGridLayout, QSplitter, QSpinBox, QColorDialog
 )
 from PySide6.QtCore import Qt, Signal, Slot, QTimer, QRectF, QPoint, QPointF, QEvent
 from PySide6.QtGui import QImage, QPixmap, QPainter, QPen, QColor, QBrush, QMouseEvent, QWheelEvent, QFont, QFontMetrics
 
 from ocr_manager import OCRConfig, OCRManager, TESS_CODE_DISPLAY_MAP
 from ocr_runtime import OCRRuntimeEvaluator
+from ocr_preprocess import compile_pipeline, PREPROCESS_PRESETS
+from digit_recognizer import get_digit_recognizer
+from ocr_trend import VALUE_SOURCES
+from custom_input_dialog import ask_string_custom
 
 class OCRPreviewLabel(QLabel):
     rect_changed = Signal(tuple)
@@ -582,6 +586,38 @@ class OCRSettingsDialog(QDialog):
         self.chk_invert.stateChanged.connect(self.trigger_preview_update)
         img_layout.addWidget(self.chk_invert, 2, 0, 1, 2)
 
+        # ★★★ (追加) 前処理プリセット（大津/適応的二値化・ノイズ除去・文字色キー） ★★★
+        img_layout.addWidget(QLabel(self.tr("ocr_lbl_preprocess")), 3, 0)
+        self.combo_preprocess = QComboBox()
+        for preset_name in PREPROCESS_PRESETS:
+            self.combo_preprocess.addItem(preset_name, preset_name)
+        idx = self.combo_preprocess.findData(getattr(self.config, 'preprocess', 'global'))
+        self.combo_preprocess.setCurrentIndex(max(0, idx))
+        self.combo_preprocess.currentIndexChanged.connect(self._update_color_key_widgets)
+        self.combo_preprocess.currentIndexChanged.connect(self.trigger_preview_update)
+        img_layout.addWidget(self.combo_preprocess, 3, 1)
+
+        # 文字色キー（プリセット "color_key" 用）: 文字色と許容差
+        img_layout.addWidget(QLabel(self.tr("ocr_lbl_color_key")), 4, 0)
+        color_key = getattr(self.config, 'color_key', None) or {}
+        self._color_key_bgr = [int(v) for v in color_key.get("bgr", (255, 255, 255))]
+        color_hbox = QHBoxLayout()
+        self.btn_color_key = QPushButton()
+        self.btn_color_key.setFixedWidth(60)
+        self.btn_color_key.setToolTip(self.tr("ocr_tooltip_color_key"))
+        self.btn_color_key.clicked.connect(self.pick_color_key)
+        color_hbox.addWidget(self.btn_color_key)
+        self.spin_color_tolerance = QSpinBox()
+        self.spin_color_tolerance.setRange(0, 128)
+        self.spin_color_tolerance.setPrefix("±")
+        self.spin_color_tolerance.setValue(int(color_key.get("tolerance", 40)))
+        self.spin_color_tolerance.setToolTip(self.tr("ocr_tooltip_color_key"))
+        self.spin_color_tolerance.valueChanged.connect(self.trigger_preview_update)
+        color_hbox.addWidget(self.spin_color_tolerance)
+        color_hbox.addStretch()
+        img_layout.addLayout(color_hbox, 4, 1)
+        self._update_color_key_widgets()
+
         img_group.setLayout(img_layout)
         groups_layout.addWidget(img_group, 1)
 
@@ -628,6 +664,28 @@ class OCRSettingsDialog(QDialog):
         
         logic_layout.addWidget(self.input_target_value, 1, 2)
 
+        # ★★★ (追加) 数値モード用: 学習済み数字テンプレートによる高速認識 ★★★
+        self.chk_digit_engine = QCheckBox(self.tr("ocr_chk_digit_engine"))
+        self.chk_digit_engine.setToolTip(self.tr("ocr_tooltip_digit_engine"))
+        self.chk_digit_engine.setChecked(getattr(self.config, 'engine', 'tesseract') == "digits")
+        logic_layout.addWidget(self.chk_digit_engine, 2, 0, 1, 2)
+
+        self.btn_learn_digits = QPushButton(self.tr("ocr_btn_learn_digits"))
+        self.btn_learn_digits.clicked.connect(self.learn_digits)
+        logic_layout.addWidget(self.btn_learn_digits, 2, 2)
+
+        # ★★★ (追加) 数値モード用: 最新値 / 平均値 / 変化速度（/秒）のどれで判定するか ★★★
+        lbl_source = QLabel(self.tr("ocr_lbl_value_source"))
+        logic_layout.addWidget(lbl_source, 3, 0)
+        self.combo_source = QComboBox()
+        for source in VALUE_SOURCES:
+            self.combo_source.addItem(self.tr(f"ocr_source_{source}"), source)
+        idx = self.combo_source.findData(self.condition.get("source", "value"))
+        self.combo_source.setCurrentIndex(max(0, idx))
+        self.combo_source.setEnabled(self.config.numeric_mode)
+        self.combo_source.setToolTip(self.tr("ocr_tooltip_value_source"))
+        logic_layout.addWidget(self.combo_source, 3, 1, 1, 2)
+
         current_op_key = self.condition.get("operator", ">=")
         self.update_operator_list(current_op_key)
         
@@ -770,10 +828,43 @@ class OCRSettingsDialog(QDialog):
             self.combo_lang.setEnabled(True)
             if self.previous_lang_idx >= 0:
                 self.combo_lang.blockSignals(True); self.combo_lang.setCurrentIndex(self.previous_lang_idx); self.combo_lang.blockSignals(False)
+        self.chk_digit_engine.setEnabled(self.config.numeric_mode)
+        self.btn_learn_digits.setEnabled(self.config.numeric_mode)
+        self.combo_source.setEnabled(self.config.numeric_mode)
         current_op = self.combo_operator.currentData()
         self.update_operator_list(current_op)
         self.trigger_preview_update()
 
+    def _selected_engine(self) -> str:
+        if self.chk_numeric.isChecked() and self.chk_digit_engine.isChecked():
+            return "digits"
+        return "tesseract"
+
+    def _processed_roi_image(self):
+        """ランタイムと同じ前処理を掛けたROI画像を返します。"""
+        worker = self.ocr_manager.create_worker(self.original_image, self.config, self.roi)
+        return worker._crop_and_process_image()
+
+    @Slot()
+    def learn_digits(self):
+        if not self.roi:
+            QMessageBox.warning(self, "Warning", self.tr("ocr_warn_select_area"))
+            return
+        self.update_preview_image()
+        label, ok = ask_string_custom(self, self.tr("ocr_btn_learn_digits"), self.tr("ocr_prompt_learn_digits"), "")
+        if not ok or not label.strip():
+            return
+
+        processed_img = self._processed_roi_image()
+        recognizer = get_digit_recognizer()
+        try:
+            added = recognizer.learn(processed_img, label)
+            recognizer.save()
+        except Exception as e:
+            self.result_text_edit.setText(f"Error: {e}")
+            return
+        self.result_text_edit.setText(f"Learned {added} glyph(s)\nTrained: {recognizer.trained_chars()}")
+
     def update_operator_list(self, current_op_key=None):
         if current_op_key is None: current_op_key = self.combo_operator.currentData()
         self.combo_operator.clear()
@@ -794,6 +885,28 @@ class OCRSettingsDialog(QDialog):
         else: self.combo_operator.setCurrentIndex(0)
 
     @Slot()
+    def _update_color_key_widgets(self):
+        b, g, r = self._color_key_bgr
+        self.btn_color_key.setStyleSheet(f"background-color: rgb({r}, {g}, {b});")
+        enabled = self.combo_preprocess.currentData() == "color_key"
+        self.btn_color_key.setEnabled(enabled)
+        self.spin_color_tolerance.setEnabled(enabled)
+
+    def pick_color_key(self):
+        b, g, r = self._color_key_bgr
+        color = QColorDialog.getColor(QColor(r, g, b), self, self.tr("ocr_lbl_color_key"))
+        if not color.isValid():
+            return
+        self._color_key_bgr = [color.blue(), color.green(), color.red()]
+        self._update_color_key_widgets()
+        self.trigger_preview_update()
+
+    def _current_color_key(self):
+        """プリセットが文字色キーの場合は画面上の指定を、それ以外は既存の設定をそのまま返す。"""
+        if self.combo_preprocess.currentData() != "color_key":
+            return self.config.color_key
+        return {"bgr": list(self._color_key_bgr), "tolerance": self.spin_color_tolerance.value()}
+
     def trigger_preview_update(self):
         self.label_thresh_val.setText(f"{self.slider_thresh.value()}")
         self.debounce_timer.start()
@@ -804,12 +917,16 @@ class OCRSettingsDialog(QDialog):
         self.config.invert = self.chk_invert.isChecked()
         self.config.lang = self.combo_lang.currentData() 
         self.config.numeric_mode = self.chk_numeric.isChecked()
+        self.config.engine = self._selected_engine()
+        self.config.preprocess = self.combo_preprocess.currentData() or "global"
+        self.config.color_key = self._current_color_key()
         try:
-            temp_img = self.original_image.copy()
-            if len(temp_img.shape) == 3: gray = cv2.cvtColor(temp_img, cv2.COLOR_BGR2GRAY)
-            else: gray = temp_img
-            if self.config.invert: gray = cv2.bitwise_not(gray)
-            _, binary = cv2.threshold(gray, self.config.threshold, 255, cv2.THRESH_BINARY)
+            # プレビューはROI座標を保つため等倍で、実行時と同じパイプラインを適用
+            preview_config = {
+                "preprocess": self.config.preprocess, "scale": 1.0, "threshold": self.config.threshold,
+                "invert": self.config.invert, "color_key": self.config.color_key,
+            }
+            binary = compile_pipeline(preview_config)(self.original_image)
             disp_img = cv2.cvtColor(binary, cv2.COLOR_GRAY2RGB)
             h, w, ch = disp_img.shape
             bytes_per_line = ch * w
@@ -878,6 +995,18 @@ class OCRSettingsDialog(QDialog):
         
         self.btn_test.setEnabled(False)
 
+        # 数字テンプレート認識は1ms未満で終わるため、ワーカースレッドを使わず直接実行
+        recognizer = get_digit_recognizer()
+        if self.config.engine == "digits" and recognizer.is_trained:
+            try:
+                processed_img = self._processed_roi_image()
+                raw_text, _conf, _ms = recognizer.recognize(processed_img)
+                numeric_value = OCRRuntimeEvaluator._extract_first_number(raw_text)
+                self.on_ocr_finished(raw_text, numeric_value, processed_img)
+            except Exception as e:
+                self.on_ocr_error(str(e))
+            return
+
         self.worker = self.ocr_manager.create_worker(
             self.original_image, 
             self.config, 
@@ -966,6 +1095,9 @@ class OCRSettingsDialog(QDialog):
         self.config.invert = self.chk_invert.isChecked()
         self.config.lang = self.combo_lang.currentData()
         self.config.numeric_mode = self.chk_numeric.isChecked()
+        self.config.engine = self._selected_engine()
+        self.config.preprocess = self.combo_preprocess.currentData() or "global"
+        self.config.color_key = self._current_color_key()
         
         target_val_str = self.input_target_value.text()
         final_target_val = target_val_str # デフォルトは文字列のまま
@@ -1013,6 +1145,11 @@ class OCRSettingsDialog(QDialog):
                     operator_value = "Contains"  # デフォルト値
         
         condition_data = {"operator": operator_value, "value": final_target_val}
+        source = self.combo_source.currentData() if self.config.numeric_mode else "value"
+        if source and source != "value":
+            condition_data["source"] = source
+            if self.condition.get("window_sec"):
+                condition_data["window_sec"] = self.condition["window_sec"]
         return self.config, self.roi, condition_data, self.chk_enable.isChecked(), self.chk_no_click_when_disabled.isChecked()
 
     @Slot()
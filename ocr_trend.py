@@ -0,0 +1,151 @@
+# ocr_trend.py
+# ★★★ (追加) 数値OCRの読み取り値をアイテムごとの時系列として保持する ★★★
+"""
+数値モードの OCR 結果をアイテム（画像パス）ごとのリングバッファに保存し、
+条件判定で「平滑化した値」や「変化速度（/秒）」を使えるようにする。
+
+条件 (ocr_settings['condition']) で使用するキー:
+  source     : "value"（従来どおり最新値） / "smoothed"（窓内の平均） / "rate"（窓内の傾き, 値/秒）
+  window_sec : smoothed / rate の計算に使う時間窓（未指定は OCR_TREND_WINDOW_SEC）
+
+例: HP が毎秒 50 以上減っている → source="rate", operator="<=", value=-50
+
+また、値が一定時間変化していないアイテムは、OCR失敗後のクールダウンを延ばして
+Tesseract の呼び出し回数を減らすために使う（stable_duration）。
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+from collections import deque
+
+
+def _env_number(name, default, cast=float):
+    try:
+        return max(0, cast(os.environ.get(name, str(default))))
+    except ValueError:
+        return default
+
+
+# アイテムごとに保持するサンプル数
+TREND_BUFFER_SIZE = _env_number("OCR_TREND_SIZE", 64, int)
+# smoothed / rate の既定の時間窓
+TREND_WINDOW_SEC = _env_number("OCR_TREND_WINDOW_SEC", 3.0)
+# 値が変化していないとみなす許容差
+STABLE_TOLERANCE = _env_number("OCR_STABLE_TOLERANCE", 0.0)
+
+VALUE_SOURCES = ("value", "smoothed", "rate")
+
+
+class NumericSeries:
+    """(timestamp, value) の固定長リングバッファ。"""
+
+    def __init__(self, maxlen: int = TREND_BUFFER_SIZE):
+        self._samples = deque(maxlen=max(2, maxlen))
+
+    def __len__(self):
+        return len(self._samples)
+
+    def add(self, t: float, value: float):
+        self._samples.append((float(t), float(value)))
+
+    def latest(self):
+        return self._samples[-1] if self._samples else None
+
+    def window(self, now: float, window_sec: float):
+        return [(t, v) for t, v in self._samples if now - t <= window_sec]
+
+    def smoothed(self, now: float, window_sec: float = TREND_WINDOW_SEC):
+        """窓内の平均値（窓内にサンプルが無ければ None）。"""
+        samples = self.window(now, window_sec)
+        if not samples:
+            return None
+        return sum(v for _t, v in samples) / len(samples)
+
+    def rate(self, now: float, window_sec: float = TREND_WINDOW_SEC):
+        """窓内サンプルの最小二乗の傾き（値/秒）。2点未満・時間幅ゼロなら None。"""
+        samples = self.window(now, window_sec)
+        if len(samples) < 2:
+            return None
+        n = len(samples)
+        mean_t = sum(t for t, _v in samples) / n
+        mean_v = sum(v for _t, v in samples) / n
+        var_t = sum((t - mean_t) ** 2 for t, _v in samples)
+        if var_t <= 0:
+            return None
+        cov = sum((t - mean_t) * (v - mean_v) for t, v in samples)
+        return cov / var_t
+
+    def stable_duration(self, now: float, tolerance: float = STABLE_TOLERANCE) -> float:
+        """最新値から許容差内に収まっている期間（秒）。サンプルが2点未満なら 0。"""
+        if len(self._samples) < 2:
+            return 0.0
+        _last_t, last_v = self._samples[-1]
+        since = None
+        for t, v in reversed(self._samples):
+            if abs(v - last_v) > tolerance:
+                break
+            since = t
+        return max(0.0, now - since) if since is not None else 0.0
+
+
+class OCRTrendStore:
+    """アイテムごとの NumericSeries を管理します（OCRワーカースレッドから記録される）。"""
+
+    def __init__(self, maxlen: int = TREND_BUFFER_SIZE):
+        self.maxlen = maxlen
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def record(self, key, t: float, value: float):
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = NumericSeries(self.maxlen)
+                self._series[key] = series
+            series.add(t, value)
+
+    def value_for(self, key, source: str, now: float, window_sec: float = TREND_WINDOW_SEC):
+        """条件判定に使う値を返します。計算できない場合は None。"""
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                return None
+            if source == "smoothed":
+                return series.smoothed(now, window_sec)
+            if source == "rate":
+                return series.rate(now, window_sec)
+            latest = series.latest()
+            return latest[1] if latest else None
+
+    def stable_duration(self, key, now: float, tolerance: float = STABLE_TOLERANCE) -> float:
+        with self._lock:
+            series = self._series.get(key)
+            return series.stable_duration(now, tolerance) if series is not None else 0.0
+
+    def snapshot(self, key):
+        """[(timestamp, value), ...] のコピーを返します（表示・デバッグ用）。"""
+        with self._lock:
+            series = self._series.get(key)
+            return list(series._samples) if series is not None else []
+
+    def discard(self, key):
+        with self._lock:
+            self._series.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._series.clear()
+
+
+_trend_store = None
+_trend_store_lock = threading.Lock()
+
+
+def get_trend_store() -> OCRTrendStore:
+    global _trend_store
+    with _trend_store_lock:
+        if _trend_store is None:
+            _trend_store = OCRTrendStore()
+        return _trend_store
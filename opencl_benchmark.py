@@ -0,0 +1,112 @@
+# opencl_benchmark.py
+# ★★★ (追加) 監視ループの前処理＋照合を CPU と OpenCL(UMat) で比較するベンチマーク ★★★
+"""
+1フレーム分の処理（縮小・グレースケール化 → テンプレート照合）を、
+CPU（ndarray）と OpenCL（UMat をデバイス上に置いたまま）で実行して所要時間を比較します。
+照合は通常モードと色調厳格モードの両方を測定します。
+
+Intel の OpenCL CPU ランタイムや Mesa (rusticl / Clover) など、実行環境のデバイスで測定されます。
+使用するデバイスは OPENCV_OPENCL_DEVICE 環境変数で選べます（例: ":CPU:0"）。
+
+使い方:
+  python opencl_benchmark.py [--width 1920] [--height 1080] [--scale 0.5] [--templates 10] [--repeat 50] [--image PATH]
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+
+import cv2
+import numpy as np
+
+from frame_preprocess import preprocess_frame, preprocess_frame_umat
+from matcher import _match_standard, _match_strict_color
+
+
+def _make_templates(frame_small, count: int, size: int, rng):
+    h, w = frame_small.shape[:2]
+    templates = []
+    for _ in range(count):
+        x = int(rng.integers(0, max(1, w - size)))
+        y = int(rng.integers(0, max(1, h - size)))
+        templates.append(np.ascontiguousarray(frame_small[y:y + size, x:x + size]))
+    return templates
+
+
+def _cpu_frame(frame, scale, templates, strict):
+    bgr, _gray = preprocess_frame(frame, scale, need_bgr=True)
+    channels = cv2.split(bgr) if strict else None
+    for t in templates:
+        if strict:
+            _match_strict_color(bgr, t, channels)
+        else:
+            _match_standard(bgr, t)
+
+
+def _opencl_frame(frame, scale, templates_umat, strict):
+    bgr_umat, _gray_umat, _gray = preprocess_frame_umat(frame, scale, need_bgr=True)
+    channels = cv2.split(bgr_umat) if strict else None
+    for t in templates_umat:
+        if strict:
+            _match_strict_color(bgr_umat, t, channels)
+        else:
+            _match_standard(bgr_umat, t)
+
+
+def _time_ms(func, repeat: int) -> float:
+    func()  # ウォームアップ（OpenCL はカーネルのビルドを含むため除外する）
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) * 1000.0 / repeat
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="CPU vs OpenCL (UMat) benchmark of preprocessing + template matching")
+    parser.add_argument("--width", type=int, default=1920)
+    parser.add_argument("--height", type=int, default=1080)
+    parser.add_argument("--scale", type=float, default=0.5, help="capture scale (lightweight preset)")
+    parser.add_argument("--templates", type=int, default=10)
+    parser.add_argument("--template-size", type=int, default=48)
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--image", help="use a screenshot instead of random noise")
+    args = parser.parse_args(argv)
+
+    rng = np.random.default_rng(0)
+    if args.image:
+        frame = cv2.imdecode(np.fromfile(args.image, np.uint8), cv2.IMREAD_COLOR)
+        if frame is None:
+            print(f"Cannot read image: {args.image}")
+            return 1
+    else:
+        frame = rng.integers(0, 256, (args.height, args.width, 3), dtype=np.uint8)
+
+    small, _gray = preprocess_frame(frame, args.scale, need_bgr=True)
+    templates = _make_templates(small, args.templates, args.template_size, rng)
+
+    print(f"frame {frame.shape[1]}x{frame.shape[0]} scale={args.scale} templates={len(templates)}x{args.template_size}px "
+          f"repeat={args.repeat} OpenCV {cv2.__version__}")
+
+    cv2.ocl.setUseOpenCL(False)
+    cpu_std = _time_ms(lambda: _cpu_frame(frame, args.scale, templates, False), args.repeat)
+    cpu_strict = _time_ms(lambda: _cpu_frame(frame, args.scale, templates, True), args.repeat)
+    print(f"{'CPU':28s} standard {cpu_std:8.3f}ms/frame  strict {cpu_strict:8.3f}ms/frame")
+
+    if not cv2.ocl.haveOpenCL():
+        print("OpenCL is not available; skipped the UMat pipeline.")
+        return 0
+    cv2.ocl.setUseOpenCL(True)
+    device = cv2.ocl.Device_getDefault()
+    templates_umat = [cv2.UMat(t) for t in templates]
+    cl_std = _time_ms(lambda: _opencl_frame(frame, args.scale, templates_umat, False), args.repeat)
+    cl_strict = _time_ms(lambda: _opencl_frame(frame, args.scale, templates_umat, True), args.repeat)
+    name = f"OpenCL ({device.name()[:20]})"
+    print(f"{name:28s} standard {cl_std:8.3f}ms/frame  strict {cl_strict:8.3f}ms/frame")
+    print(f"speedup: standard x{cpu_std / cl_std:.2f}  strict x{cpu_strict / cl_strict:.2f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
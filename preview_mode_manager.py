@@ -13,7 +13,7 @@ class PreviewModeManager(QObject):
     def __init__(self, preview_label,
                  roi_button, point_cb, range_cb, random_cb,
                  roi_enabled_cb, roi_mode_fixed, roi_mode_variable,
-                 locale_manager, backup_click_cb=None, right_click_cb=None, parent=None):
+                 locale_manager, backup_click_cb=None, right_click_cb=None, feature_match_cb=None, parent=None):
         super().__init__(parent)
 
         # --- UI要素への参照 ---
@@ -27,6 +27,7 @@ class PreviewModeManager(QObject):
         self.roi_mode_fixed = roi_mode_fixed
         self.roi_mode_variable = roi_mode_variable
         self.right_click_cb = right_click_cb
+        self.feature_match_cb = feature_match_cb
         self.locale_manager = locale_manager
         self.current_mode = None
 
@@ -38,6 +39,7 @@ class PreviewModeManager(QObject):
             'roi_enabled': False, 'roi_mode': 'fixed',
             'roi_rect': None, 'roi_rect_variable': None,
             'right_click': False,
+            'feature_match': False,
             'ocr_settings': None # ★ OCR設定を追加
         }
 
@@ -92,6 +94,8 @@ class PreviewModeManager(QObject):
             setting_key = 'backup_click'
         elif self.right_click_cb is not None and source_widget == self.right_click_cb:
             setting_key = 'right_click'
+        elif self.feature_match_cb is not None and source_widget == self.feature_match_cb:
+            setting_key = 'feature_match'
         elif source_widget == self.roi_enabled_cb:
             setting_key = 'roi_enabled'
         elif source_widget == self.roi_mode_fixed and checked:
@@ -162,6 +166,8 @@ class PreviewModeManager(QObject):
                 widgets_to_disable.append(self.backup_click_cb)
             if self.right_click_cb is not None:
                 widgets_to_disable.append(self.right_click_cb)
+            if self.feature_match_cb is not None:
+                widgets_to_disable.append(self.feature_match_cb)
             self._block_all_signals(True)
             try:
                 for w in widgets_to_disable: w.setEnabled(False)
@@ -185,6 +191,7 @@ class PreviewModeManager(QObject):
             self.settings['roi_rect'] = loaded_settings.get('roi_rect')
             self.settings['roi_rect_variable'] = loaded_settings.get('roi_rect_variable')
             self.settings['right_click'] = bool(loaded_settings.get('right_click', False))
+            self.settings['feature_match'] = bool(loaded_settings.get('feature_match', False))
             # ★ OCR設定をロード
             self.settings['ocr_settings'] = loaded_settings.get('ocr_settings')
         else:
@@ -195,6 +202,7 @@ class PreviewModeManager(QObject):
                 'roi_enabled': False, 'roi_mode': 'fixed',
                 'roi_rect': None, 'roi_rect_variable': None,
                 'right_click': False,
+                'feature_match': False,
                 'ocr_settings': None
             }
 
@@ -268,6 +276,8 @@ class PreviewModeManager(QObject):
             self.backup_click_cb.setEnabled(not is_roi_drawing_mode)
         if self.right_click_cb is not None:
             self.right_click_cb.setEnabled(not is_roi_drawing_mode)
+        if self.feature_match_cb is not None:
+            self.feature_match_cb.setEnabled(not is_roi_drawing_mode)
         self.roi_mode_fixed.setEnabled(not is_roi_drawing_mode and is_roi_enabled)
         self.roi_mode_variable.setEnabled(not is_roi_drawing_mode and is_roi_enabled)
         self.roi_button.setEnabled((is_roi_enabled and is_roi_variable_mode) or is_roi_drawing_mode)
@@ -286,6 +296,8 @@ class PreviewModeManager(QObject):
             self.backup_click_cb.blockSignals(block)
         if self.right_click_cb is not None:
             self.right_click_cb.blockSignals(block)
+        if self.feature_match_cb is not None:
+            self.feature_match_cb.blockSignals(block)
 
     def _convert_cv_to_pixmap(self, cv_image_or_pixmap: np.ndarray | QPixmap) -> QPixmap | None:
         """OpenCV画像(BGR)またはQPixmapをQPixmap(RGB)に変換"""
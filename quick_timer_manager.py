@@ -10,6 +10,8 @@ from __future__ import annotations
 import time
 from typing import Dict, Any, List, Tuple
 
+import cv2
+
 
 class QuickTimerManager:
     def __init__(self, core_engine):
@@ -29,6 +31,7 @@ class QuickTimerManager:
           'template_bgr': np.ndarray,
           'template_gray': np.ndarray,
           'click_offset': (dx, dy),
+          'template_origin': (x, y),  # 登録時のテンプレート左上（認識範囲内・元解像度）
           'right_click': bool,
         }
         """
@@ -92,6 +95,37 @@ class QuickTimerManager:
         entries.sort(key=lambda e: float(e.get("trigger_time", 0)))
         return entries
 
+    def due_entries(self, current_time: float, *, grace_seconds: float = 5.0) -> List[Dict[str, Any]]:
+        """照合開始時刻を過ぎたエントリを trigger_time 順で返す（期限切れは削除する）。"""
+        due = []
+        for e in self.entries_sorted():
+            match_start = float(e.get("match_start_time", float(e.get("trigger_time", 0)) - 60.0))
+            if current_time < match_start:
+                continue
+            if self.remove_if_expired(e, current_time, grace_seconds=grace_seconds):
+                continue
+            if e.get("template_gray") is None:
+                continue
+            due.append(e)
+        return due
+
+    def get_scaled_template(self, entry: Dict[str, Any], scale: float):
+        """監視フレームの縮小率に合わせたグレースケールテンプレートを返す（縮小率ごとにエントリ内へキャッシュ）。"""
+        template_gray = entry.get("template_gray")
+        if template_gray is None:
+            return None
+        if abs(scale - 1.0) < 1e-6:
+            return template_gray
+        cache = entry.setdefault("_scaled_gray_cache", {})
+        key = round(float(scale), 4)
+        scaled = cache.get(key)
+        if scaled is None:
+            h, w = template_gray.shape[:2]
+            new_w, new_h = max(1, int(round(w * scale))), max(1, int(round(h * scale)))
+            scaled = cv2.resize(template_gray, (new_w, new_h), interpolation=cv2.INTER_AREA)
+            cache[key] = scaled
+        return scaled
+
     def remove_if_expired(self, entry: Dict[str, Any], current_time: float, *, grace_seconds: float = 5.0) -> bool:
         """期限切れなら削除して True、まだなら False。"""
         try:
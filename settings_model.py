@@ -64,6 +64,9 @@ class ImageItemSettings:
     right_click: bool = False
     backup_click: bool = False
 
+    # matching method (False: テンプレート照合 / True: 特徴点照合)
+    feature_match: bool = False
+
     # ROI settings
     roi_enabled: bool = False
     roi_mode: str = "fixed"  # "fixed" | "variable"
@@ -95,6 +98,7 @@ class ImageItemSettings:
             "random_click",
             "right_click",
             "backup_click",
+            "feature_match",
             "roi_enabled",
             "roi_mode",
             "roi_rect",
@@ -139,6 +143,7 @@ class ImageItemSettings:
             random_click=_to_bool(d.get("random_click"), False),
             right_click=_to_bool(d.get("right_click"), False),
             backup_click=_to_bool(d.get("backup_click"), False),
+            feature_match=_to_bool(d.get("feature_match"), False),
             roi_enabled=_to_bool(d.get("roi_enabled"), False),
             roi_mode=roi_mode,
             roi_rect=_as_list(d.get("roi_rect")),
@@ -165,6 +170,7 @@ class ImageItemSettings:
                 "random_click": bool(self.random_click),
                 "right_click": bool(self.right_click),
                 "backup_click": bool(self.backup_click),
+                "feature_match": bool(self.feature_match),
                 "roi_enabled": bool(self.roi_enabled),
                 "roi_mode": self.roi_mode,
                 "roi_rect": self.roi_rect,
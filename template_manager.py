@@ -5,6 +5,8 @@ import numpy as np
 from pathlib import Path
 import time
 
+from feature_matcher import compute_template_features
+
 OPENCL_AVAILABLE = False
 try:
     if cv2.ocl.haveOpenCL():
@@ -210,7 +212,57 @@ class TemplateManager:
         self.logger.log("log_cache_build_complete", len(normal_cache), len(backup_cache))
         self.logger.log("log_priority_timers", len(priority_timers))
 
-        return normal_cache, backup_cache, priority_timers, folder_children_map
+        cache_views = self._build_cache_views(normal_cache, backup_cache, folder_children_map)
+
+        return normal_cache, backup_cache, priority_timers, folder_children_map, cache_views
+
+    @staticmethod
+    def _folder_key(folder_path):
+        """フォルダパスの表記ゆれ（区切り文字・末尾スラッシュ）を吸収したキーを返す。"""
+        return str(Path(folder_path))
+
+    def _build_cache_views(self, normal_cache, backup_cache, folder_children_map):
+        """
+        監視ループで毎フレーム作っていた絞り込み済みキャッシュを、構築時に一度だけ作成します。
+          'active_normal' / 'active_backup' : 除外・優先タイマー以外のフォルダに属するテンプレート
+          'folder_normal' / 'folder_backup' : {フォルダキー: そのフォルダを対象とするテンプレート}
+        フォルダ別ビューは folder_children_map に登録されたフォルダについて作成し、
+        所属フォルダ(folder_path)が一致するもの、またはファイルが直下にあるものを含めます。
+        """
+        inactive_modes = ('excluded', 'priority_timer')
+
+        def build(cache):
+            active = {}
+            by_folder = {self._folder_key(f): {} for f in folder_children_map}
+            for p, d in cache.items():
+                if d.get('folder_mode') not in inactive_modes:
+                    active[p] = d
+                f_path = d.get('folder_path')
+                if f_path:
+                    view = by_folder.get(self._folder_key(f_path))
+                    if view is not None:
+                        view[p] = d
+                parent_view = by_folder.get(self._folder_key(Path(p).parent))
+                if parent_view is not None:
+                    parent_view[p] = d
+            return active, by_folder
+
+        active_normal, folder_normal = build(normal_cache)
+        active_backup, folder_backup = build(backup_cache)
+        return {
+            'active_normal': active_normal,
+            'active_backup': active_backup,
+            'folder_normal': folder_normal,
+            'folder_backup': folder_backup,
+        }
+
+    def get_folder_views(self, cache_views, folder_path):
+        """フォルダ別ビュー (normal, backup) を返します。未登録のフォルダは空の辞書を返します。"""
+        key = self._folder_key(folder_path)
+        return (
+            (cache_views.get('folder_normal') or {}).get(key, {}),
+            (cache_views.get('folder_backup') or {}).get(key, {}),
+        )
 
     def _process_item_for_cache(self, item_data, scales, folder_path, folder_mode, priority_trigger_path, cooldown_time, sequence_info, normal_cache, backup_cache):
         try:
@@ -252,8 +304,25 @@ class TemplateManager:
             
             use_opencl = OPENCL_AVAILABLE and cv2.ocl.useOpenCL()
 
+            # ★★★ (追加) 特徴点照合: 中央の倍率で1枚だけ作り、特徴点を事前に計算しておく
+            #     （倍率・回転の違いは照合時にホモグラフィで推定するため、倍率ごとのテンプレートは不要） ★★★
+            item_scales = scales
+            features = None
+            if settings.get('feature_match', False) and scales:
+                base_scale = scales[len(scales) // 2]
+                h, w = image_to_process.shape[:2]
+                base_w, base_h = int(w * base_scale), int(h * base_scale)
+                if base_w > 0 and base_h > 0:
+                    inter = cv2.INTER_AREA if base_scale < 1.0 else cv2.INTER_LINEAR
+                    base_gray = cv2.cvtColor(cv2.resize(image_to_process, (base_w, base_h), interpolation=inter), cv2.COLOR_BGR2GRAY)
+                    features = compute_template_features(base_gray, base_scale)
+                if features is not None:
+                    item_scales = [base_scale]
+                else:
+                    self.logger.log("log_feature_match_too_few", path_obj.name)
+
             scaled_templates = []
-            for scale in scales:
+            for scale in item_scales:
                 if scale <= 0: continue
                 h, w = image_to_process.shape[:2]
                 new_w, new_h = int(w * scale), int(h * scale)
@@ -277,6 +346,7 @@ class TemplateManager:
 
             cache_entry = {
                 'settings': settings, 'path': path, 'scaled_templates': scaled_templates,
+                'features': features,
                 'folder_path': folder_path,
                 'folder_mode': folder_mode,
                 'priority_trigger_path': priority_trigger_path,
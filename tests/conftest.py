@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# リポジトリ直下のモジュール（パッケージ化されていない）を import できるようにする
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
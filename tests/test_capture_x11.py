@@ -0,0 +1,112 @@
+"""
+XShmCapture の自動テスト（X11 ディスプレイが必要。Xvfb 上でも可）:
+  xvfb-run -s "-screen 0 320x240x24" python -m pytest -q tests/test_capture_x11.py
+"""
+
+import time
+from ctypes import c_int, c_uint, c_ulong, c_void_p
+
+import pytest
+
+pytest.importorskip("numpy")
+import capture_x11
+from capture_x11 import X11CaptureError, XShmCapture
+
+pytestmark = pytest.mark.skipif(not capture_x11.XSHM_AVAILABLE, reason="XShm capture is not available (no X11 display)")
+
+RED = 0xFF0000
+BLUE = 0x0000FF
+
+
+class _Windows:
+    """テスト用に単色のウィンドウを作る専用の Display 接続。"""
+
+    def __init__(self):
+        self._x11 = capture_x11._LIBS[0]
+        self._x11.XCreateSimpleWindow.argtypes = [c_void_p, c_ulong, c_int, c_int, c_uint, c_uint, c_uint, c_ulong, c_ulong]
+        self._x11.XCreateSimpleWindow.restype = c_ulong
+        self._x11.XMapRaised.argtypes = [c_void_p, c_ulong]
+        self._x11.XDestroyWindow.argtypes = [c_void_p, c_ulong]
+        self._dpy = self._x11.XOpenDisplay(None)
+        if not self._dpy:
+            pytest.skip("Cannot open display")
+        self._root = self._x11.XRootWindow(self._dpy, self._x11.XDefaultScreen(self._dpy))
+        self._created = []
+
+    def create(self, x, y, width, height, color):
+        window = self._x11.XCreateSimpleWindow(self._dpy, self._root, x, y, width, height, 0, 0, color)
+        self._x11.XMapRaised(self._dpy, window)
+        self._x11.XSync(self._dpy, 0)
+        self._created.append(window)
+        return window
+
+    def close(self):
+        for window in self._created:
+            self._x11.XDestroyWindow(self._dpy, window)
+        self._x11.XSync(self._dpy, 0)
+        self._x11.XCloseDisplay(self._dpy)
+
+
+@pytest.fixture
+def windows():
+    w = _Windows()
+    yield w
+    w.close()
+
+
+@pytest.fixture
+def cap():
+    try:
+        capture = XShmCapture()
+    except X11CaptureError as e:
+        pytest.skip(str(e))
+    yield capture
+    capture.close()
+
+
+def _bgr(color):
+    return [color & 0xFF, (color >> 8) & 0xFF, (color >> 16) & 0xFF]
+
+
+def _grab_until(cap, region, color, timeout=2.0):
+    """ウィンドウの描画（Expose による背景塗り）が反映されるまで取り直す。"""
+    deadline = time.monotonic() + timeout
+    while True:
+        frame = cap.grab(region)
+        if (frame[..., :3] == _bgr(color)).all() or time.monotonic() > deadline:
+            return frame
+        time.sleep(0.02)
+
+
+def test_grab_reuses_segment_and_returns_region(cap, windows):
+    windows.create(10, 10, 40, 30, RED)
+    region = (10, 10, 50, 40)
+
+    frame = _grab_until(cap, region, RED)
+    for _ in range(20):
+        frame = cap.grab(region)
+
+    assert frame.shape == (30, 40, 4)
+    assert (frame[..., :3] == _bgr(RED)).all()
+    assert cap.segment_allocations == 1
+
+    assert cap.grab((10, 10, 30, 20)).shape == (10, 20, 4)
+    assert cap.segment_allocations == 2
+
+
+def test_set_target_window_captures_occluded_window(cap, windows):
+    if not cap.composite_available:
+        pytest.skip("XComposite extension not available")
+    target = windows.create(20, 20, 60, 40, RED)
+    windows.create(0, 0, 120, 100, BLUE)
+    region = (20, 20, 80, 60)
+
+    assert (_grab_until(cap, region, BLUE)[..., :3] == _bgr(BLUE)).all()
+
+    cap.set_target_window(target)
+    frame = _grab_until(cap, region, RED)
+    assert frame.shape == (40, 60, 4)
+    assert (frame[..., :3] == _bgr(RED)).all()
+
+    cap.set_target_window(None)
+    assert (_grab_until(cap, region, BLUE)[..., :3] == _bgr(BLUE)).all()
@@ -0,0 +1,142 @@
+"""TimerScheduler の振る舞いを、注入した偽の時計で実時間に依存せず検証する。"""
+
+import time
+from datetime import datetime
+
+import pytest
+
+from timer_schedule import TimerScheduler, build_timer_schedule_cache
+
+
+class FakeClock:
+    def __init__(self, now: float):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class NullLogger:
+    def log(self, *args, **kwargs):
+        pass
+
+
+def _ts(year, month, day, hour, minute=0, second=0) -> float:
+    return datetime(year, month, day, hour, minute, second).timestamp()
+
+
+def _entry(*targets, approach_time=60.0):
+    return {
+        'approach_time': approach_time,
+        'sequence_interval': 1.0,
+        'actions': [
+            {'target_time': t, 'display_time': datetime.fromtimestamp(t).strftime("%H:%M:%S")}
+            for t in targets
+        ],
+    }
+
+
+@pytest.fixture
+def berlin_tz(monkeypatch):
+    if not hasattr(time, "tzset"):
+        pytest.skip("time.tzset is not available on this platform")
+    monkeypatch.setenv("TZ", "Europe/Berlin")
+    time.tzset()
+    yield
+    monkeypatch.undo()
+    time.tzset()
+
+
+def test_locked_paths_follows_approach_window():
+    base = _ts(2024, 1, 10, 12)
+    clock = FakeClock(base)
+    scheduler = TimerScheduler({'a.png': _entry(base + 300), 'b.png': _entry(base + 30)}, clock=clock)
+
+    assert scheduler.locked_paths() == {'b.png'}
+
+    clock.now = base + 240
+    assert scheduler.locked_paths() == {'a.png', 'b.png'}
+    assert scheduler.is_locked('a.png')
+
+
+def test_next_due_returns_earliest_lock_start():
+    base = _ts(2024, 1, 10, 12)
+    scheduler = TimerScheduler(
+        {'a.png': _entry(base + 300), 'b.png': _entry(base + 100, approach_time=10.0)},
+        clock=FakeClock(base),
+    )
+
+    path, lock_start, action = scheduler.next_due()
+    assert path == 'b.png'
+    assert lock_start == base + 90
+    assert action['target_time'] == base + 100
+
+    scheduler.complete('b.png', now=base + 100)
+    path, lock_start, _action = scheduler.next_due()
+    assert path == 'a.png'
+    assert lock_start == base + 240
+
+
+def test_next_due_is_none_when_empty():
+    assert TimerScheduler(clock=FakeClock(0.0)).next_due() is None
+
+
+def test_complete_rolls_action_to_next_day_and_unlocks():
+    base = _ts(2024, 1, 10, 12)
+    clock = FakeClock(base + 30)
+    scheduler = TimerScheduler({'a.png': _entry(base + 60, base + 300)}, clock=clock)
+    assert scheduler.is_locked('a.png')
+
+    clock.now = base + 61
+    scheduler.complete('a.png')
+
+    assert 'a.png' not in scheduler.locked_paths()
+    targets = [a['target_time'] for a in scheduler['a.png']['actions']]
+    assert targets == [base + 300, _ts(2024, 1, 11, 12, 1)]
+    assert scheduler['a.png']['actions'][-1]['executed'] is False
+
+
+def test_complete_skips_days_already_passed():
+    base = _ts(2024, 1, 10, 12)
+    scheduler = TimerScheduler({'a.png': _entry(base)}, clock=FakeClock(base))
+
+    scheduler.complete('a.png', now=_ts(2024, 1, 13, 8))
+
+    assert scheduler.next_action('a.png')['target_time'] == _ts(2024, 1, 13, 12)
+
+
+def test_complete_keeps_wall_clock_time_across_dst(berlin_tz):
+    # 2024-03-31 は欧州の夏時間開始日（1 日が 23 時間）
+    target = _ts(2024, 3, 30, 20)
+    scheduler = TimerScheduler({'a.png': _entry(target)}, clock=FakeClock(target))
+
+    scheduler.complete('a.png', now=target + 1)
+
+    rolled = scheduler.next_action('a.png')['target_time']
+    assert datetime.fromtimestamp(rolled) == datetime(2024, 3, 31, 20)
+    assert rolled - target == 23 * 60 * 60
+
+
+def test_build_timer_schedule_cache_uses_injected_clock():
+    clock = FakeClock(_ts(2024, 1, 10, 21))
+    caches = {
+        'a.png': {'settings': {'timer_mode': {
+            'enabled': True,
+            'approach_time': 120,
+            'actions': [
+                {'enabled': True, 'display_time': "20:00:00"},
+                {'enabled': True, 'display_time': "22:00:00"},
+                {'enabled': False, 'display_time': "21:30:00"},
+            ],
+        }}},
+        'broken.png': None,
+    }
+
+    scheduler = build_timer_schedule_cache(
+        normal_template_cache=caches, backup_template_cache={}, logger=NullLogger(), clock=clock
+    )
+
+    assert scheduler.clock is clock
+    targets = [a['target_time'] for a in scheduler['a.png']['actions']]
+    assert targets == [_ts(2024, 1, 10, 22), _ts(2024, 1, 11, 20)]
+    assert 'broken.png' not in scheduler
@@ -3,13 +3,156 @@ timer_schedule.py
 
 CoreEngine のタイマースケジュール構築ロジックを切り出す（リファクタ: core.py分割）。
 挙動は変えず、壊れた設定データが混ざっても全体を落とさないようガードする。
+
+★★★ (改善) 毎フレームの全件走査をやめ、ヒープベースの TimerScheduler で管理する ★★★
+- 次に実行すべきアクション / ロック中パスを O(1)〜O(log n) で取得
+- 実行済み・期限切れのアクションは翌日の display_time に自動で再スケジュール（日付またぎ・夏時間対応）
+- clock を注入できるため、実時間に依存せず挙動を検証できる
 """
 
 from __future__ import annotations
 
+import heapq
+import time
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Dict, Any
+from typing import Callable, Dict, Any, List, Optional, Set
+
+DAY_SECONDS = 24 * 60 * 60
+
+
+def _next_occurrence(action: Dict[str, Any], now: float) -> float:
+    """action の次回実行時刻（now より後）を返す。
+
+    固定の 86400 秒を足すと夏時間の切り替えで時刻がずれるため、
+    display_time から翌日以降の壁時計時刻を組み立て直す。
+    """
+    try:
+        t_time = datetime.strptime(action.get('display_time', ''), "%H:%M:%S").time()
+    except (TypeError, ValueError):
+        next_target = action['target_time'] + DAY_SECONDS
+        while next_target <= now:
+            next_target += DAY_SECONDS
+        return next_target
+    next_date = datetime.fromtimestamp(action['target_time']).date() + timedelta(days=1)
+    next_target = datetime.combine(next_date, t_time).timestamp()
+    while next_target <= now:
+        next_date += timedelta(days=1)
+        next_target = datetime.combine(next_date, t_time).timestamp()
+    return next_target
+
+
+class TimerScheduler:
+    """
+    画像ごとのタイマーアクションを保持するスケジューラ。
+
+    パスごとに target_time 順の待ち行列を持ち、各パスの先頭アクションの
+    ロック開始時刻（target_time - approach_time）をヒープで管理する。
+    ヒープは遅延無効化方式で、先頭アクションが変わるたびに新しい世代を積む。
+    """
+
+    def __init__(self, schedule: Optional[Dict[str, Dict[str, Any]]] = None, *, clock: Callable[[], float] = time.time):
+        self.clock = clock
+        self._schedule: Dict[str, Dict[str, Any]] = {}
+        self._lock_heap: List[tuple] = []
+        self._generation: Dict[str, int] = {}
+        self._locked: Set[str] = set()
+        for path, entry in (schedule or {}).items():
+            self.add(path, entry)
+
+    # --- dict 互換の参照（既存コードからの in / [] / bool 判定用） ---
+    def __bool__(self) -> bool:
+        return bool(self._schedule)
+
+    def __len__(self) -> int:
+        return len(self._schedule)
+
+    def __contains__(self, path) -> bool:
+        return path in self._schedule
+
+    def __getitem__(self, path) -> Dict[str, Any]:
+        return self._schedule[path]
+
+    def get(self, path, default=None):
+        return self._schedule.get(path, default)
+
+    def items(self):
+        return self._schedule.items()
+
+    # --- 構築 ---
+    def add(self, path: str, entry: Dict[str, Any]) -> None:
+        """approach_time / sequence_interval / actions を持つエントリを登録する。"""
+        actions = sorted(entry.get('actions', []), key=lambda a: a['target_time'])
+        self._schedule[path] = {
+            'approach_time': float(entry.get('approach_time', 300)),
+            'sequence_interval': float(entry.get('sequence_interval', 1.0)),
+            'actions': actions,
+        }
+        self._push_head(path)
+
+    def _push_head(self, path: str) -> None:
+        self._locked.discard(path)
+        gen = self._generation.get(path, 0) + 1
+        self._generation[path] = gen
+        entry = self._schedule.get(path)
+        if not entry or not entry['actions']:
+            return
+        lock_start = entry['actions'][0]['target_time'] - entry['approach_time']
+        heapq.heappush(self._lock_heap, (lock_start, gen, path))
+
+    # --- 参照 ---
+    def next_action(self, path: str) -> Optional[Dict[str, Any]]:
+        """パスの次に実行すべきアクション（O(1)）。"""
+        entry = self._schedule.get(path)
+        if not entry or not entry['actions']:
+            return None
+        return entry['actions'][0]
+
+    def next_due(self):
+        """全体で最も早くロックが始まるパスと、その (lock_start, next_action) を返す。"""
+        while self._lock_heap:
+            lock_start, gen, path = self._lock_heap[0]
+            if self._generation.get(path) != gen:
+                heapq.heappop(self._lock_heap)
+                continue
+            return path, lock_start, self.next_action(path)
+        return None
+
+    def locked_paths(self, now: Optional[float] = None) -> Set[str]:
+        """接近時間内に入っている（タイマーでロックすべき）パスの集合。"""
+        if now is None:
+            now = self.clock()
+        while self._lock_heap and self._lock_heap[0][0] <= now:
+            _lock_start, gen, path = heapq.heappop(self._lock_heap)
+            if self._generation.get(path) == gen:
+                self._locked.add(path)
+        return self._locked
+
+    def is_locked(self, path: str, now: Optional[float] = None) -> bool:
+        return path in self.locked_paths(now)
+
+    # --- 更新 ---
+    def complete(self, path: str, now: Optional[float] = None) -> None:
+        """先頭アクションを実行済み（または期限切れ）として翌日に回す。"""
+        entry = self._schedule.get(path)
+        if not entry or not entry['actions']:
+            return
+        if now is None:
+            now = self.clock()
+        action = entry['actions'].pop(0)
+        action['executed'] = True
+        next_target = _next_occurrence(action, now)
+        rolled = action.copy()
+        rolled['target_time'] = next_target
+        rolled['executed'] = False
+        # 同一パス内のアクション数は少ないため、挿入位置は線形探索で十分
+        idx = len(entry['actions'])
+        for i, a in enumerate(entry['actions']):
+            if a['target_time'] > next_target:
+                idx = i
+                break
+        entry['actions'].insert(idx, rolled)
+        self._push_head(path)
 
 
 def build_timer_schedule_cache(
@@ -17,10 +160,11 @@ def build_timer_schedule_cache(
     normal_template_cache: dict,
     backup_template_cache: dict,
     logger,
-) -> Dict[str, Dict[str, Any]]:
-    schedule: Dict[str, Dict[str, Any]] = {}
+    clock: Callable[[], float] = time.time,
+) -> TimerScheduler:
+    schedule = TimerScheduler(clock=clock)
     all_caches = list((normal_template_cache or {}).items()) + list((backup_template_cache or {}).items())
-    now = datetime.now()
+    now = datetime.fromtimestamp(clock())
 
     for path, data in all_caches:
         # 壊れた設定（None/想定外型）を安全にスキップして、キャッシュ再構築全体を落とさない
@@ -76,11 +220,11 @@ def build_timer_schedule_cache(
 
         actions.sort(key=lambda x: x['target_time'])
         if actions:
-            schedule[path] = {
+            schedule.add(path, {
                 "approach_time": timer_conf.get('approach_time', 5) * 60,
                 "sequence_interval": timer_conf.get('sequence_interval', 1.0),
                 "actions": actions,
-            }
+            })
 
     if schedule:
         try:
@@ -0,0 +1,113 @@
+# tracing.py
+# ★★★ (追加) サブシステム別の構造化トレース（無効時はフラグ参照1回のみ） ★★★
+"""
+監視ループ用の軽量トレース。
+
+サブシステム (capture / match / ocr / action) ごとに実行中に ON/OFF でき、
+イベントは1行1 JSON（JSON Lines）で出力される。
+
+呼び出し側は必ずフラグを先に確認し、無効時には引数の組み立て自体を行わない:
+
+    if TRACE.ocr:
+        trace("ocr", "ocr_start", path=name, parent=(x, y))
+
+初期値は環境変数 IMECK_TRACE（例: "ocr,match" / "all"）で指定できる。既定はすべて OFF。
+出力先は標準出力。IMECK_TRACE_FILE を指定するとファイルに追記する。
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import sys
+import threading
+import time
+
+SUBSYSTEMS = ("capture", "match", "ocr", "action")
+
+
+class _TraceFlags:
+    """サブシステムごとの有効フラグ（属性参照のみで判定できるようにする）。"""
+    __slots__ = SUBSYSTEMS
+
+    def __init__(self):
+        for name in SUBSYSTEMS:
+            setattr(self, name, False)
+
+
+TRACE = _TraceFlags()
+
+_sink_lock = threading.Lock()
+_sink_file = None
+
+
+def _initial_subsystems():
+    value = os.environ.get("IMECK_TRACE", "").strip().lower()
+    if not value:
+        return set()
+    if value in ("1", "all"):
+        return set(SUBSYSTEMS)
+    return {name.strip() for name in value.split(",") if name.strip() in SUBSYSTEMS}
+
+
+def set_enabled(subsystem: str, enabled: bool):
+    if subsystem not in SUBSYSTEMS:
+        raise ValueError(f"Unknown trace subsystem: {subsystem}")
+    setattr(TRACE, subsystem, bool(enabled))
+
+
+def is_enabled(subsystem: str) -> bool:
+    return bool(getattr(TRACE, subsystem, False))
+
+
+def enabled_subsystems() -> list:
+    return [name for name in SUBSYSTEMS if getattr(TRACE, name)]
+
+
+def set_trace_file(path):
+    """トレースの出力先ファイルを設定します（None で標準出力に戻す）。"""
+    global _sink_file
+    with _sink_lock:
+        if _sink_file is not None:
+            try:
+                _sink_file.close()
+            except Exception:
+                pass
+            _sink_file = None
+        if path:
+            _sink_file = open(path, "a", encoding="utf-8")
+
+
+def _default(obj):
+    # numpy の数値・Path などは文字列/数値に変換して出力する
+    if hasattr(obj, "item"):
+        try:
+            return obj.item()
+        except Exception:
+            pass
+    return str(obj)
+
+
+def trace(subsystem: str, event: str, **fields):
+    """イベントを1行の JSON として出力します。呼び出し前に TRACE.<subsystem> を確認すること。"""
+    record = {"ts": round(time.time(), 6), "sub": subsystem, "event": event}
+    record.update(fields)
+    try:
+        line = json.dumps(record, ensure_ascii=False, default=_default)
+    except Exception as e:
+        line = json.dumps({"ts": record["ts"], "sub": subsystem, "event": event, "error": str(e)})
+    with _sink_lock:
+        if _sink_file is not None:
+            _sink_file.write(line + "\n")
+            _sink_file.flush()
+        else:
+            sys.stdout.write("[TRACE] " + line + "\n")
+
+
+for _name in _initial_subsystems():
+    set_enabled(_name, True)
+if os.environ.get("IMECK_TRACE_FILE"):
+    try:
+        set_trace_file(os.environ["IMECK_TRACE_FILE"])
+    except Exception as _e:
+        print(f"[WARN] Failed to open trace file: {_e}")
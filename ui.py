@@ -28,6 +28,8 @@ from PySide6.QtCore import (
 
 import qtawesome as qta
 
+from tracing import SUBSYSTEMS as TRACE_SUBSYSTEMS, is_enabled as is_trace_enabled, set_enabled as set_trace_enabled
+
 from ui_tree_panel import LeftPanel
 from ui_app_settings import AppSettingsPanel
 
@@ -218,6 +220,7 @@ class UIManager(QMainWindow):
             roi_mode_fixed=self.item_settings_widgets['roi_mode_fixed'],
             roi_mode_variable=self.item_settings_widgets['roi_mode_variable'],
             right_click_cb=self.item_settings_widgets.get('right_click'),
+            feature_match_cb=self.item_settings_widgets.get('feature_match'),
             locale_manager=self.locale_manager
         )
 
@@ -499,6 +502,8 @@ class UIManager(QMainWindow):
         layout = QVBoxLayout(log_widget)
         self.log_text = QTextEdit()
         self.log_text.setReadOnly(True)
+        # ★★★ (改善) ログ表示は直近の行のみ保持（長時間監視でメモリ・描画負荷が増えないように） ★★★
+        self.log_text.document().setMaximumBlockCount(int(os.environ.get("LOG_VIEW_MAX_LINES", "2000")))
         self.log_text.setStyleSheet("""
             QTextEdit {
                 background-color: #263238; 
@@ -509,6 +514,21 @@ class UIManager(QMainWindow):
             }
         """)
         layout.addWidget(self.log_text)
+
+        # ★★★ (追加) サブシステム別トレース（capture / match / ocr / action）の実行中切替 ★★★
+        trace_layout = QHBoxLayout()
+        trace_layout.setContentsMargins(0, 0, 0, 0)
+        self.trace_label = QLabel()
+        trace_layout.addWidget(self.trace_label)
+        self.trace_checkboxes = {}
+        for subsystem in TRACE_SUBSYSTEMS:
+            chk = QCheckBox(subsystem)
+            chk.setChecked(is_trace_enabled(subsystem))
+            chk.toggled.connect(lambda checked, name=subsystem: set_trace_enabled(name, checked))
+            trace_layout.addWidget(chk)
+            self.trace_checkboxes[subsystem] = chk
+        trace_layout.addStretch()
+        layout.addLayout(trace_layout)
         self.preview_tabs.addTab(log_widget, "")
 
     def _setup_tab_usage(self):
@@ -601,6 +621,10 @@ class UIManager(QMainWindow):
         # 右クリックON（画像ごと）
         self.item_settings_widgets['right_click'] = QCheckBox()
         click_type_layout.addWidget(self.item_settings_widgets['right_click'])
+
+        # 特徴点照合ON（画像ごと）
+        self.item_settings_widgets['feature_match'] = QCheckBox()
+        click_type_layout.addWidget(self.item_settings_widgets['feature_match'])
         
         # スペーサーを入れて右に寄せる
         click_type_layout.addStretch()
@@ -748,6 +772,9 @@ class UIManager(QMainWindow):
         self.item_settings_widgets['right_click'].toggled.connect(
              lambda checked, w=self.item_settings_widgets['right_click']: self.preview_mode_manager.handle_ui_toggle(w, checked)
         )
+        self.item_settings_widgets['feature_match'].toggled.connect(
+             lambda checked, w=self.item_settings_widgets['feature_match']: self.preview_mode_manager.handle_ui_toggle(w, checked)
+        )
         self.item_settings_widgets['random_click'].stateChanged.connect(
              lambda state, w=self.item_settings_widgets['random_click']: self.preview_mode_manager.handle_ui_toggle(w, bool(state))
         )
@@ -960,6 +987,8 @@ class UIManager(QMainWindow):
 
         log_tab_index = self.preview_tabs.indexOf(self.log_text.parentWidget())
         if log_tab_index != -1: self.preview_tabs.setTabText(log_tab_index, lm("tab_log"))
+        self.trace_label.setText(lm("log_trace_label"))
+        self.trace_label.setToolTip(lm("log_trace_tooltip"))
 
         # クイックタイマー
         if hasattr(self, "quick_timer_scroll") and self.quick_timer_scroll:
@@ -1009,6 +1038,9 @@ class UIManager(QMainWindow):
         if 'right_click' in self.item_settings_widgets:
             self.item_settings_widgets['right_click'].setText(lm("item_setting_right_click"))
             self.item_settings_widgets['right_click'].setToolTip(lm("item_setting_right_click_tooltip"))
+        if 'feature_match' in self.item_settings_widgets:
+            self.item_settings_widgets['feature_match'].setText(lm("item_setting_feature_match"))
+            self.item_settings_widgets['feature_match'].setToolTip(lm("item_setting_feature_match_tooltip"))
         self.item_settings_widgets['roi_enabled'].setText(lm("item_setting_roi_enable"))
         self.item_settings_widgets['roi_enabled'].setToolTip(lm("item_setting_roi_enable_tooltip"))
         self.item_settings_widgets['roi_mode_fixed'].setText(lm("item_setting_roi_mode_fixed"))
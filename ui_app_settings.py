@@ -11,9 +11,13 @@ from PySide6.QtWidgets import (
 from PySide6.QtCore import QObject, Qt
 
 try:
-    from capture import DXCAM_AVAILABLE
+    from capture import DXCAM_AVAILABLE, XSHM_AVAILABLE
 except ImportError:
     DXCAM_AVAILABLE = False
+    XSHM_AVAILABLE = False
+
+# 高速キャプチャのチェックボックスが選ぶ方式（Windows: DXCam / Linux(X11): XShm）
+FAST_CAPTURE_METHOD = 'dxcam' if DXCAM_AVAILABLE else ('xshm' if XSHM_AVAILABLE else 'dxcam')
 
 # ★★★ 追加: OCR関連のインポート ★★★
 try:
@@ -238,7 +242,7 @@ class AppSettingsPanel(QObject):
         self.strict_color_desc_label = QLabel()
         add_desc(self.strict_color_desc_label, gen_layout)
         
-        add_checkbox('capture_method', gen_layout, enabled=DXCAM_AVAILABLE)
+        add_checkbox('capture_method', gen_layout, enabled=DXCAM_AVAILABLE or XSHM_AVAILABLE)
         self.dxcam_desc_label = QLabel()
         add_desc(self.dxcam_desc_label, gen_layout)
         
@@ -376,8 +380,12 @@ class AppSettingsPanel(QObject):
         self.gs_desc_label.setText(lm("app_setting_grayscale_desc"))
         self.app_settings_widgets['strict_color_matching'].setText(lm("app_setting_strict_color"))
         self.strict_color_desc_label.setText(lm("app_setting_strict_color_desc"))
-        self.app_settings_widgets['capture_method'].setText(lm("app_setting_dxcam"))
-        self.dxcam_desc_label.setText(lm("app_setting_dxcam_desc"))
+        if FAST_CAPTURE_METHOD == 'xshm':
+            self.app_settings_widgets['capture_method'].setText(lm("app_setting_xshm"))
+            self.dxcam_desc_label.setText(lm("app_setting_xshm_desc"))
+        else:
+            self.app_settings_widgets['capture_method'].setText(lm("app_setting_dxcam"))
+            self.dxcam_desc_label.setText(lm("app_setting_dxcam_desc"))
         self.app_settings_widgets['eco_mode_enabled'].setText(lm("app_setting_eco_mode"))
         self.eco_desc_label.setText(lm("app_setting_eco_mode_desc"))
         self.fs_label.setText(lm("app_setting_frame_skip"))
@@ -457,7 +465,7 @@ class AppSettingsPanel(QObject):
         self.auto_scale_widgets['range'].setValue(as_conf.get('range', 0.2))
         self.auto_scale_widgets['steps'].setValue(as_conf.get('steps', 5))
         
-        self.app_settings_widgets['capture_method'].setChecked(self.app_config.get('capture_method', 'dxcam') == 'dxcam')
+        self.app_settings_widgets['capture_method'].setChecked(self.app_config.get('capture_method', 'dxcam') == FAST_CAPTURE_METHOD)
         self.app_settings_widgets['frame_skip_rate'].setValue(self.app_config.get('frame_skip_rate', 2))
         self.app_settings_widgets['grayscale_matching'].setChecked(self.app_config.get('grayscale_matching', False))
         self.app_settings_widgets['strict_color_matching'].setChecked(self.app_config.get('strict_color_matching', False))
@@ -508,13 +516,14 @@ class AppSettingsPanel(QObject):
     def on_app_settings_changed(self):
         lm = self.locale_manager.tr
         self.app_config['auto_scale'] = self.get_auto_scale_settings()
-        self.app_config['capture_method'] = 'dxcam' if self.app_settings_widgets['capture_method'].isChecked() else 'mss'
+        self.app_config['capture_method'] = FAST_CAPTURE_METHOD if self.app_settings_widgets['capture_method'].isChecked() else 'mss'
         self.app_config['frame_skip_rate'] = self.app_settings_widgets['frame_skip_rate'].value()
         self.app_config['grayscale_matching'] = self.app_settings_widgets['grayscale_matching'].isChecked()
         self.app_config['strict_color_matching'] = self.app_settings_widgets['strict_color_matching'].isChecked()
         self.app_config['use_opencl'] = self.app_settings_widgets['use_opencl'].isChecked()
         self.app_config['eco_mode'] = {"enabled": self.app_settings_widgets['eco_mode_enabled'].isChecked()}
         self.app_config['screen_stability_check'] = {
+            **self.app_config.get('screen_stability_check', {}),
             "enabled": self.app_settings_widgets['stability_check_enabled'].isChecked(),
             "threshold": self.app_settings_widgets['stability_threshold'].value()
         }
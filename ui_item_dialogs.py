@@ -86,6 +86,9 @@ def open_ocr_settings_dialog(ui) -> None:
         config.invert = cfg_data.get("invert", False)
         config.numeric_mode = cfg_data.get("numeric_mode", False)
         config.lang = cfg_data.get("lang", "eng")
+        config.engine = cfg_data.get("engine", "tesseract")
+        config.preprocess = cfg_data.get("preprocess", "global")
+        config.color_key = cfg_data.get("color_key")
 
     roi = ocr_conf_dict.get('roi', None)
     condition = ocr_conf_dict.get('condition', None)
@@ -121,7 +124,10 @@ def open_ocr_settings_dialog(ui) -> None:
                 'threshold': new_conf.threshold,
                 'invert': new_conf.invert,
                 'lang': new_conf.lang,
-                'numeric_mode': new_conf.numeric_mode
+                'numeric_mode': new_conf.numeric_mode,
+                'engine': new_conf.engine,
+                'preprocess': new_conf.preprocess,
+                'color_key': new_conf.color_key
             },
             'condition': new_condition
         }
@@ -56,6 +56,8 @@ def update_ui_from_preview_manager(ui, settings: dict) -> None:
         ui.item_settings_widgets['roi_enabled'].setChecked(settings.get('roi_enabled', False))
         if 'right_click' in ui.item_settings_widgets:
             ui.item_settings_widgets['right_click'].setChecked(bool(settings.get('right_click', False)))
+        if 'feature_match' in ui.item_settings_widgets:
+            ui.item_settings_widgets['feature_match'].setChecked(bool(settings.get('feature_match', False)))
 
         roi_mode = settings.get('roi_mode', 'fixed')
         if roi_mode == 'variable':
@@ -235,6 +235,7 @@ def open_quick_timer_dialog(ui, payload: object) -> None:
         "template_bgr": template_bgr,
         "template_gray": template_gray,
         "click_offset": (dx, dy),
+        "template_origin": (int(rx), int(ry)),
         "right_click": bool(right_click),
     }
 
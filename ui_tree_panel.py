@@ -571,6 +571,9 @@ class LeftPanel(QObject):
             config.invert = cfg_data.get("invert", False)
             config.numeric_mode = cfg_data.get("numeric_mode", False)
             config.lang = cfg_data.get("lang", "eng")
+            config.engine = cfg_data.get("engine", "tesseract")
+            config.preprocess = cfg_data.get("preprocess", "global")
+            config.color_key = cfg_data.get("color_key")
             
         current_roi = saved_ocr_settings.get("roi", None)
         current_condition = saved_ocr_settings.get("condition", None)
@@ -624,7 +627,10 @@ class LeftPanel(QObject):
                 "threshold": new_config.threshold,
                 "invert": new_config.invert,
                 "numeric_mode": new_config.numeric_mode,
-                "lang": new_config.lang
+                "lang": new_config.lang,
+                "engine": new_config.engine,
+                "preprocess": new_config.preprocess,
+                "color_key": new_config.color_key
             },
             "condition": new_condition
         }
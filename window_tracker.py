@@ -0,0 +1,116 @@
+# window_tracker.py
+# ★★★ (追加) ウィンドウを認識範囲にしている場合に、ウィンドウの移動・リサイズへ追従する ★★★
+"""
+ウィンドウ指定の認識範囲をウィンドウの位置に追従させる。
+
+- Linux(X11): XWindowTracker で ConfigureNotify を受け取り、変化があったときだけ位置を取り直す
+  （イベントを取りこぼしても FALLBACK_POLL_SEC ごとに位置を確認する）
+- Windows   : GetClientRect / ClientToScreen を POLL_SEC ごとに確認する
+
+キャプチャバックエンドは再初期化せず、呼び出し側が認識範囲を書き換えるだけで次のフレームから反映される。
+"""
+
+from __future__ import annotations
+
+import sys
+import time
+
+try:
+    from capture_x11 import XSHM_AVAILABLE as X11_AVAILABLE, XWindowTracker, X11CaptureError
+except ImportError:
+    X11_AVAILABLE = False
+
+if sys.platform == 'win32':
+    try:
+        import win32gui
+    except ImportError:
+        win32gui = None
+else:
+    win32gui = None
+
+
+class WindowGeometryTracker:
+    # Windows のポーリング間隔
+    POLL_SEC = 0.25
+    # X11 でイベントを取りこぼした場合の確認間隔
+    FALLBACK_POLL_SEC = 1.0
+
+    def __init__(self, window_id, screen_size=None):
+        self.window_id = window_id
+        if screen_size is None:
+            # ウィンドウ選択時と同じく、画面サイズで右下をクリップする
+            try:
+                import pyautogui
+                screen_size = tuple(pyautogui.size())
+            except Exception:
+                screen_size = None
+        self.screen_size = screen_size
+        self._x11 = None
+        self._next_poll = 0.0
+        self.last_rect = None
+        if X11_AVAILABLE and sys.platform != 'win32':
+            try:
+                self._x11 = XWindowTracker(int(window_id))
+            except (X11CaptureError, ValueError, TypeError):
+                self._x11 = None
+
+    @property
+    def supported(self) -> bool:
+        return self._x11 is not None or win32gui is not None
+
+    def _read_rect(self):
+        """クライアント領域の (x1, y1, x2, y2)（画面座標、画面内にクリップ）。取得できなければ None。"""
+        if self._x11 is not None:
+            geo = self._x11.geometry()
+            if geo is None:
+                return None
+            left, top, width, height = geo
+            right, bottom = left + width, top + height
+        elif win32gui is not None:
+            try:
+                if not win32gui.IsWindow(self.window_id):
+                    return None
+                _l, _t, width, height = win32gui.GetClientRect(self.window_id)
+                left, top = win32gui.ClientToScreen(self.window_id, (0, 0))
+                right, bottom = left + width, top + height
+            except Exception:
+                return None
+        else:
+            return None
+        rect = (max(0, left), max(0, top), right, bottom)
+        if self.screen_size:
+            rect = (rect[0], rect[1], min(self.screen_size[0], rect[2]), min(self.screen_size[1], rect[3]))
+        if rect[2] <= rect[0] or rect[3] <= rect[1]:
+            return None
+        return rect
+
+    def poll(self, now: float = None):
+        """
+        位置が変わっていれば新しい矩形を返します。変化なし・取得不可なら None。
+        ウィンドウが閉じられた場合は is_gone が True になる。
+        """
+        now = time.monotonic() if now is None else now
+        if self._x11 is not None:
+            changed = self._x11.poll()
+            if not changed and now < self._next_poll:
+                return None
+            self._next_poll = now + self.FALLBACK_POLL_SEC
+        else:
+            if now < self._next_poll:
+                return None
+            self._next_poll = now + self.POLL_SEC
+
+        rect = self._read_rect()
+        if rect is None or rect == self.last_rect:
+            return None
+        self.last_rect = rect
+        return rect
+
+    @property
+    def is_gone(self) -> bool:
+        return self._x11 is not None and not self._x11.alive
+
+    def close(self):
+        if self._x11 is not None:
+            self._x11.close()
+            self._x11 = None